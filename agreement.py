@@ -0,0 +1,405 @@
+# agreement.py
+"""
+Değerlendiriciler arası uyum ve öz-bildirime göre doğruluk analizi.
+
+Sonuçlardan değerlendirici (oturum) x hedef (set_index) x madde tensörü
+kurulur ve TIPI özellik puanlarına çevrilir (scoring.py ile aynı anahtar).
+Tüm ölçüler NumPy ile vektörel hesaplanır: değerlendirici başına nicelikler
+bir kez çıkarılır, her bootstrap örneklemi değerlendirici ağırlıklarından
+(çekilme sayıları) oluşan bir satırdır ve örneklem parçaları bir süreç
+havuzunda matris çarpımlarıyla hesaplanır.
+
+Ölçüler (özellik başına; 'profil' ölçüleri tek değer):
+  icc2k              ICC(2,k): iki yönlü rastgele, ortalama ölçüler; hedefler x
+                     değerlendiriciler tam çaprazlı olmalıdır, bu yüzden yalnızca
+                     tüm hedefleri değerlendirenler kullanılır
+  uzlasi             değerlendirici çiftlerinin hedefler üzerindeki korelasyonlarının
+                     (ortak hedeflerle) havuzlanmış ortalaması
+  profil_uzlasi      aynı hedef için değerlendirici çiftlerinin 10 maddelik profil
+                     korelasyonlarının ortalaması
+  dogruluk           değerlendirici başına hedefler üzerinde yargı ile öz-bildirim
+                     korelasyonu (Fisher z ortalaması)
+  toplu_dogruluk     değerlendiricilerin ortalama yargısı ile öz-bildirim korelasyonu
+  profil_dogrulugu   değerlendirici x hedef başına 5 özelliklik profil korelasyonu
+                     (Fisher z ortalaması)
+
+Gruplar: tüm değerlendiriciler, Meslek alanı --psych-pattern ile eşleşenler
+('psikolog') ve diğerleri; 'fark' = psikolog - diğer. Güven aralıkları
+yüzdelik bootstrap ile hesaplanır:
+  - icc2k: hedefler (fotoğraf setleri) iadeli yeniden örneklenir, grubun
+    değerlendiricileri sabittir (ICC güven aralığının olağan birimi; aynı
+    değerlendiricinin kopyaları ICC'yi yapay olarak yükseltirdi). İki grup
+    aynı hedef örneklemini kullanır.
+  - diğer ölçüler: değerlendiriciler grup içinde iadeli yeniden örneklenir,
+    hedefler sabittir; bir değerlendiricinin kopyaları kendisiyle eşlenmez.
+Eksik veri varsa uzlasi/profil_uzlasi ikili r'lerin ortalaması değil, ortak
+gözlemlerle havuzlanmış tahmindir (tam veride ikisi eşittir); çıktıdaki
+'yontem' sütunu her satırın tahmin ve bootstrap yöntemini yazar.
+
+Öz-bildirim dosyası (CSV): set_index sütunu ve ya madde_1..madde_10 (1-7 ham
+yanıtlar; anahtarla puanlanır) ya da özellik sütunları (disadonukluk, ...).
+
+Kullanım:
+    python agreement.py --self-report hedefler_oz.csv
+    python agreement.py --self-report hedefler_oz.csv --bootstrap 5000 --workers 8 --out uyum.csv
+    python agreement.py --store                       # ingest.py deposundan
+"""
+import re, csv, time, argparse, warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import get_data_dir
+from scoring import (TRAITS, TIPI_KEYS, N_ITEMS, find_result_files, read_results,
+                     session_info, likert_tensor, score_tipi, format_value)
+
+PSYCH_PATTERN = 'psikolo'     # Meslek alanında aranır (psikolog, psikoloji ...)
+BOOT_CHUNK = 250              # süreç başına bir seferde hesaplanan bootstrap örneklemi
+CI_LEVEL = 0.95
+
+
+# ------------------ Vektörel ölçüler ------------------
+# Her ölçü, değerlendirici başına bir kez hesaplanan niceliklerin (prepare)
+# ağırlıklı toplamlarıdır. Ağırlık w (b, R): nokta tahmininde grup üyeliği
+# (0/1), bootstrap'ta değerlendiricinin örneklemde kaç kez çekildiği. Böylece
+# b örneklem (b, R) @ (R, ...) matris çarpımlarıyla hesaplanır ve aynı
+# değerlendiricinin kopyaları birbirleriyle çift sayılmaz.
+
+def _standardize(a):
+    """Son eksende NaN'ları yok sayarak z-puanı; eksikler ve sabit satırlar 0 olur"""
+    m = ~np.isnan(a)
+    n = m.sum(-1, keepdims=True)
+    mean = np.where(m, a, 0).sum(-1, keepdims=True) / np.maximum(n, 1)
+    d = np.where(m, a - mean, 0)
+    sd = np.sqrt((d ** 2).sum(-1, keepdims=True) / np.maximum(n - 1, 1))
+    ok = m & (sd > 0)
+    return np.where(ok, d / np.where(sd > 0, sd, 1), 0), ok
+
+
+def nan_corr(a, b, axis=-1):
+    """Ortak (NaN olmayan) gözlemlerle Pearson korelasyonu; a ve b yayınlanır"""
+    a, b = np.broadcast_arrays(a, b)
+    m = ~(np.isnan(a) | np.isnan(b))
+    n = m.sum(axis, keepdims=True)
+    da = np.where(m, a - np.where(m, a, 0).sum(axis, keepdims=True) / np.maximum(n, 1), 0)
+    db = np.where(m, b - np.where(m, b, 0).sum(axis, keepdims=True) / np.maximum(n, 1), 0)
+    cov = (da * db).sum(axis)
+    var = (da ** 2).sum(axis) * (db ** 2).sum(axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((var > 0) & (n.squeeze(axis) >= 3), cov / np.sqrt(var), np.nan)
+
+
+def _ratio(num, den):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def _fisher(r):
+    """Korelasyonları Fisher z'ye çevirir; (z, geçerli) döndürür (NaN'lar 0/False)"""
+    ok = ~np.isnan(r)
+    return np.where(ok, np.arctanh(np.clip(np.where(ok, r, 0), -0.9999, 0.9999)), 0), ok
+
+
+def _pair_terms(a):
+    """a (R, G, O): G grubunda, O gözlem üzerinde ikili korelasyon toplamları için terimler"""
+    z, ok = _standardize(a)
+    R = len(a)
+    return {'z': z.reshape(R, -1), 'zz': (z ** 2).sum(-1),
+            'ok': ok.reshape(R, -1).astype(np.float64), 'nok': ok.sum(-1).astype(np.float64),
+            'h': (ok.sum(-1) > 1).astype(np.float64), 'shape': a.shape[1:]}
+
+
+def pair_corr(t, w):
+    """Ağırlıklı değerlendirici çiftlerinin havuzlanmış korelasyonu (b, G).
+
+    Σ_{r≠s} w_r w_s z_r·z_s = |Σ_r w_r z_r|² - Σ_r w_r² |z_r|² özdeşliğiyle
+    çiftler dolaşılmadan hesaplanır; payda çiftlerin ortak gözlem sayılarının
+    (-1) toplamıdır. Eksiksiz veride ve w=1 iken ikili Pearson
+    korelasyonlarının ortalamasına eşittir.
+    """
+    G, O = t['shape']
+    w2 = w ** 2
+    num = ((w @ t['z']).reshape(-1, G, O) ** 2).sum(-1) - w2 @ t['zz']
+    overlap = ((w @ t['ok']).reshape(-1, G, O) ** 2).sum(-1) - w2 @ t['nok']
+    pairs = (w @ t['h']) ** 2 - w2 @ t['h']
+    return _ratio(num, overlap - pairs)
+
+
+def prepare(S, X, complete, self_scores=None):
+    """Ağırlıklardan bağımsız, değerlendirici başına nicelikler"""
+    R, T, F = S.shape
+    Sc = np.where(complete[:, None, None], S, 0).astype(np.float64)
+    pre = {'T': T, 'F': F, 'complete': complete.astype(np.float64),
+           # ICC(2,k): yalnızca tam değerlendiriciler
+           'Y': Sc, 'Y2': (Sc ** 2).reshape(R, T * F),
+           'uzlasi': _pair_terms(np.moveaxis(S, 1, 2)),     # (R, F, T): hedefler üzerinde
+           'profil_uzlasi': _pair_terms(X)}                 # (R, T, I): maddeler üzerinde
+    if self_scores is not None:
+        filled = np.isnan(S)
+        pre['S0'] = np.where(filled, 0, S).reshape(R, T * F).astype(np.float64)
+        pre['Sn'] = (~filled).reshape(R, T * F).astype(np.float64)
+        pre['self'] = self_scores
+        pre['dogruluk'] = _fisher(nan_corr(S, self_scores, axis=1))               # (R, F)
+        z, ok = _fisher(nan_corr(S, self_scores[None], axis=-1))                 # (R, T)
+        pre['profil_dogrulugu'] = (z.sum(1), ok.sum(1).astype(np.float64))
+    return pre
+
+
+def icc2k(pre, w, v=None):
+    """Tam değerlendiricilerle ICC(2,k), özellik başına (b, F).
+
+    w (b, R): grup üyeliği (0/1), v (b, T): hedeflerin çekilme sayıları
+    (None: her hedef bir kez). Hedef bootstrap'ı v ile yapılır; kareler
+    toplamları çekilen hedeflerle kurulan tabloyla aynıdır.
+    """
+    Y = pre['Y']
+    R, T, F = Y.shape
+    w = w * pre['complete']
+    v = np.ones((len(w), T)) if v is None else v
+    k, n = w.sum(1)[:, None], v.sum(1)[:, None]
+    target_sum = (w @ Y.reshape(R, T * F)).reshape(-1, T, F)         # (b, T, F)
+    total = np.einsum('bt,btf->bf', v, target_sum)
+    rater_sum = np.einsum('bt,rtf->brf', v, Y)                        # (b, R, F)
+    square_sum = np.einsum('bt,btf->bf', v, (w @ pre['Y2']).reshape(-1, T, F))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        g = total / (k * n)
+        ssr = k * np.einsum('bt,btf->bf', v, (target_sum / k[:, None] - g[:, None]) ** 2)
+        ssc = n * np.einsum('br,brf->bf', w, (rater_sum / n[:, None] - g[:, None]) ** 2)
+        sst = square_sum - 2 * g * total + k * n * g ** 2
+        sse = sst - ssr - ssc
+        msr, msc, mse = ssr / (n - 1), ssc / (k - 1), sse / ((n - 1) * (k - 1))
+        icc = (msr - mse) / (msr + (msc - mse) / n)
+    return np.where((k >= 2) & (n >= 2), icc, np.nan)
+
+
+def weighted_stats(pre, w, v=None, members=None):
+    """w (b, R) ağırlıklarıyla tüm ölçüler; ölçü -> (b, F) ya da (b,).
+
+    v verilirse ICC(2,k) hedef örneklemiyle ve 'members' (grup üyeliği,
+    0/1) değerlendiricileriyle hesaplanır; verilmezse w ile.
+    """
+    profile = pair_corr(pre['profil_uzlasi'], w)
+    valid = ~np.isnan(profile)
+    out = {'icc2k': icc2k(pre, w if members is None else members, v),
+           'uzlasi': pair_corr(pre['uzlasi'], w),
+           'profil_uzlasi': _ratio(np.where(valid, profile, 0).sum(1), valid.sum(1))}
+    if 'self' in pre:
+        z, ok = pre['dogruluk']
+        out['dogruluk'] = np.tanh(_ratio(w @ z, w @ ok.astype(np.float64)))
+        T, F = pre['T'], pre['F']
+        mean_judgment = _ratio(w @ pre['S0'], w @ pre['Sn']).reshape(-1, T, F)
+        out['toplu_dogruluk'] = nan_corr(mean_judgment, pre['self'], axis=1)
+        zsum, n = pre['profil_dogrulugu']
+        out['profil_dogrulugu'] = np.tanh(_ratio(w @ zsum, w @ n))
+    return out
+
+
+# ------------------ Veri ------------------
+def normalize_text(text):
+    """Büyük/küçük harf ve noktalı/noktasız i farkını kaldırır"""
+    return text.replace('İ', 'i').replace('I', 'i').casefold().replace('ı', 'i').replace('i̇', 'i')
+
+
+def build_tensors(table, key='uygulanan', psych_pattern=PSYCH_PATTERN):
+    """Sonuç tablosundan analiz verisi: X, S, hedefler ve grup indeksleri"""
+    X, targets = likert_tensor(table)
+    rated = ~np.isnan(X).all(axis=(1, 2))          # hiç Likert yanıtı olmayan oturumlar atılır
+    X = X[rated]
+    S = score_tipi(X, key)
+    meslek = session_info(table)['Meslek'][rated]
+    pattern = re.compile(normalize_text(psych_pattern))
+    psych = np.array([bool(pattern.search(normalize_text(str(m)))) for m in meslek])
+    complete = ~np.isnan(S).any(axis=(1, 2))
+    return {'X': X, 'S': S, 'targets': targets, 'complete': complete,
+            'groups': {'tum': np.arange(len(S)),
+                       'psikolog': np.flatnonzero(psych),
+                       'diger': np.flatnonzero(~psych)}}
+
+
+def read_self_reports(path, targets, key='uygulanan'):
+    """Öz-bildirim CSV'sini hedef sırasına göre (T, F) özellik puanlarına çevirir"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    out = np.full((len(targets), len(TRAITS)), np.nan, dtype=np.float32)
+    if not rows:
+        return out
+    pos = {int(t): i for i, t in enumerate(targets.tolist())}
+    item_cols = [f"madde_{i}" for i in range(1, N_ITEMS + 1)]
+    use_items = all(c in rows[0] for c in item_cols)
+    if not use_items and not all(t in rows[0] for t in TRAITS):
+        raise ValueError(f"{path}: set_index ile madde_1..madde_{N_ITEMS} ya da "
+                         f"{', '.join(TRAITS)} sütunları gerekli")
+
+    def num(v):
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return np.nan
+
+    for row in rows:
+        target = num(row.get('set_index'))
+        i = pos.get(int(target)) if target == target else None
+        if i is None:
+            continue
+        if use_items:
+            items = np.array([num(row[c]) for c in item_cols], dtype=np.float32)
+            out[i] = score_tipi(items, key)
+        else:
+            out[i] = [num(row[t]) for t in TRAITS]
+    return out
+
+
+# ------------------ Bootstrap ------------------
+_PRE = None
+
+def _init_worker(pre):
+    global _PRE
+    _PRE = pre
+
+
+def _group_weights(groups, R):
+    """Nokta tahmini için grup üyeliği ağırlıkları; grup -> (1, R)"""
+    out = {}
+    for name, members in groups.items():
+        w = np.zeros((1, R))
+        w[0, members] = 1
+        out[name] = w
+    return out
+
+
+def _resample(rng, members, R, b):
+    """Grup içinde iadeli çekiliş: değerlendirici başına çekilme sayıları (b, R)"""
+    w = np.zeros((b, R))
+    w[:, members] = rng.multinomial(len(members), np.full(len(members), 1 / len(members)), size=b)
+    return w
+
+
+def _with_difference(stats):
+    if 'psikolog' in stats and 'diger' in stats:
+        stats['fark'] = {k: stats['psikolog'][k] - stats['diger'][k] for k in stats['psikolog']}
+    return stats
+
+
+def _boot_chunk(args):
+    """Bir parça bootstrap örneklemi; grup -> ölçü -> (b, ...) dizi.
+
+    Değerlendiriciler grup içinde, hedefler (ICC için) tüm gruplarda ortak
+    bir çekilişle yeniden örneklenir.
+    """
+    seed, b, groups, R = args
+    rng = np.random.default_rng(seed)
+    T = _PRE['T']
+    v = rng.multinomial(T, np.full(T, 1 / T), size=b).astype(np.float64)
+    member_weights = _group_weights(groups, R)
+    return _with_difference({name: weighted_stats(_PRE, _resample(rng, members, R, b), v,
+                                                  np.broadcast_to(member_weights[name], (b, R)))
+                             for name, members in groups.items()})
+
+
+def bootstrap(pre, groups, R, n_boot, workers=None, seed=None, chunk=BOOT_CHUNK):
+    """n_boot örneklemi parçalar halinde süreç havuzunda hesaplar; grup -> ölçü -> (n_boot, ...)"""
+    sizes = [min(chunk, n_boot - i) for i in range(0, n_boot, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(ss, n, groups, R) for ss, n in zip(seeds, sizes)]
+    if workers == 1:
+        _init_worker(pre)
+        parts = list(map(_boot_chunk, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pre,)) as pool:
+            parts = list(pool.map(_boot_chunk, jobs))
+    return {g: {k: np.concatenate([p[g][k] for p in parts]) for k in parts[0][g]}
+            for g in parts[0]}
+
+
+def analyze(data, n_boot=2000, workers=None, seed=None):
+    """Nokta tahminleri ve bootstrap güven aralıklarıyla sonuç satırları"""
+    R = len(data['S'])
+    groups = {name: m for name, m in data['groups'].items() if len(m) >= 2}
+    pre = prepare(data['S'], data['X'], data['complete'], data.get('self'))
+    point = _with_difference({name: weighted_stats(pre, w)
+                              for name, w in _group_weights(groups, R).items()})
+    boots = bootstrap(pre, groups, R, n_boot, workers, seed) if n_boot > 0 and groups else {}
+
+    lo, hi = (1 - CI_LEVEL) / 2 * 100, (1 + CI_LEVEL) / 2 * 100
+    rows = []
+    for group, stats in point.items():
+        g = data['groups']
+        n_raters = (f"{len(g['psikolog'])}/{len(g['diger'])}" if group == 'fark'
+                    else len(g[group]))
+        for measure, values in stats.items():
+            values = np.atleast_1d(values[0])
+            samples = boots.get(group, {}).get(measure)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                if samples is not None:
+                    samples = samples.reshape(len(samples), -1)
+                    ci_lo, ci_hi = np.nanpercentile(samples, [lo, hi], axis=0)
+                    se = np.nanstd(samples, axis=0, ddof=1)
+                else:
+                    ci_lo = ci_hi = se = np.full(len(values), np.nan)
+            traits = TRAITS if len(values) == len(TRAITS) else ['']
+            for i, trait in enumerate(traits):
+                rows.append({'olcu': measure, 'ozellik': trait, 'grup': group,
+                             'deger': values[i], 'ci_alt': ci_lo[i], 'ci_ust': ci_hi[i],
+                             'se': se[i], 'n_degerlendiren': n_raters,
+                             'n_hedef': len(data['targets']), 'yontem': METHODS[measure]})
+    return rows
+
+
+METHODS = {
+    'icc2k': "ICC(2,k), tam değerlendiriciler; GA: hedef bootstrap",
+    'uzlasi': "havuzlanmış ikili r (eksik veride ikili r ortalaması değil); GA: değerlendirici bootstrap",
+    'profil_uzlasi': "hedef başına havuzlanmış ikili profil r'si, hedefler üzerinde ortalama; "
+                     "GA: değerlendirici bootstrap",
+    'dogruluk': "değerlendirici başına r, Fisher z ortalaması; GA: değerlendirici bootstrap",
+    'toplu_dogruluk': "ortalama yargı ile öz-bildirim r'si; GA: değerlendirici bootstrap",
+    'profil_dogrulugu': "değerlendirici x hedef profil r'si, Fisher z ortalaması; "
+                        "GA: değerlendirici bootstrap",
+}
+
+
+def write_rows(rows, path):
+    names = ['olcu', 'ozellik', 'grup', 'deger', 'ci_alt', 'ci_ust', 'se',
+             'n_degerlendiren', 'n_hedef', 'yontem']
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        w = csv.writer(f)
+        w.writerow(names)
+        w.writerows([format_value(r[n]) for n in names] for r in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Değerlendiriciler arası uyum ve doğruluk")
+    parser.add_argument('--data-dir', default=None, help="Sonuç klasörü (varsayılan: DeneyVerileri)")
+    parser.add_argument('--store', nargs='?', const='', default=None,
+                        help="CSV'ler yerine sütunlu depodan oku (önce yeni oturumları aktarır)")
+    parser.add_argument('--self-report', default=None, metavar='CSV',
+                        help="Hedeflerin öz-bildirimleri (set_index + madde_1..10 ya da özellikler)")
+    parser.add_argument('--key', choices=sorted(TIPI_KEYS), default='uygulanan')
+    parser.add_argument('--psych-pattern', default=PSYCH_PATTERN,
+                        help="Psikolog grubunu belirleyen Meslek deseni (düzenli ifade)")
+    parser.add_argument('--bootstrap', type=int, default=2000, help="Bootstrap örneklem sayısı (0 = yok)")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı (1 = aynı süreç)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default='uyum_sonuclari.csv')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or get_data_dir()
+    if args.store is not None:
+        from ingest import ColumnStore, default_store, load_table
+        store = ColumnStore(args.store or default_store(data_dir))
+        store.ingest(data_dir)
+        table = load_table(store)
+    else:
+        table = read_results(find_result_files(data_dir))
+
+    t0 = time.perf_counter()
+    data = build_tensors(table, args.key, args.psych_pattern)
+    if args.self_report:
+        data['self'] = read_self_reports(args.self_report, data['targets'], args.key)
+    rows = analyze(data, args.bootstrap, args.workers, args.seed)
+    write_rows(rows, args.out)
+    g = data['groups']
+    print(f"[Uyum] {len(data['S'])} değerlendirici (psikolog={len(g['psikolog'])}, "
+          f"tam={int(data['complete'].sum())}), {len(data['targets'])} hedef, "
+          f"{args.bootstrap} örneklem, {time.perf_counter() - t0:.1f} sn -> {args.out}")
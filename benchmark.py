@@ -0,0 +1,306 @@
+# benchmark.py
+"""
+Uçtan uca performans ölçümü (simüle katılımcı + sahte pencere).
+
+Her senaryo ayrı bir süreçte çalışır; böylece içe aktarma süresi ve tepe
+bellek senaryolar arasında karışmaz. Ölçülenler:
+  - main modülünün içe aktarılma süresi ve başlangıç (main() -> ilk flip)
+  - fotoğraf başına çözme / bekleme / bağlama süreleri (oturum günlüğünden)
+  - ekran başına çizim maliyeti (ilk çizim -> flip, gerçek süre)
+  - sonuç yazma: sunum iş parçacığındaki süre ve arka plan yazıcısının sayaçları
+  - doku havuzu sayaçları (yükleme, çıkarma, GPU'da tutulan bayt)
+  - statik ekran kipi ile her karede yeniden çizmenin gerçek zamanlı CPU,
+    flip ve çizim çağrısı karşılaştırması (GPU yükünün yerine çizim sayısı)
+  - tepe bellek (RSS)
+--bundle ile her havuz önce tek bir paket dosyasına yazılır ve senaryo,
+klasörü olmayan bir köke karşı çalıştırılır (tüm okumalar paketten).
+
+Kullanım:
+    python benchmark.py                          # stimuli/ ile 10 setlik oturum
+    python benchmark.py --pools 100 1000         # + sentetik 100 ve 1000 setlik havuzlar
+    python benchmark.py --out yeni.json --compare eski.json
+    python benchmark.py --bundle                 # setler klasör yerine uyaran paketinden
+"""
+import sys, os, re, ast, json, time, tempfile, argparse, subprocess
+
+import numpy as np
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ------------------ Sentetik uyaran havuzu ------------------
+def make_pool(root, n_sets, images_per_set=3, size=(640, 800), seed=0):
+    """n_sets adet setNNNN klasörü ve içinde sentetik JPEG'ler üretir (varsa yeniden kullanır)"""
+    marker = os.path.join(root, '.tamam')
+    if os.path.exists(marker):
+        return root
+    rng = np.random.default_rng(seed)
+    w, h = size
+    yy, xx = np.mgrid[0:h, 0:w]
+    for si in range(1, n_sets + 1):
+        folder = os.path.join(root, f"set{si:04d}")
+        os.makedirs(folder, exist_ok=True)
+        for ii in range(images_per_set):
+            base = rng.integers(0, 256, 3)
+            grad = (xx * rng.uniform(-0.2, 0.2) + yy * rng.uniform(-0.2, 0.2))[..., None]
+            noise = rng.normal(0, 12, (h, w, 3))
+            arr = np.clip(base + grad + noise, 0, 255).astype(np.uint8)
+            Image.fromarray(arr, 'RGB').save(os.path.join(folder, f"img{ii+1}.jpg"), quality=85)
+    open(marker, 'w').close()
+    return root
+
+
+def make_bundle(stim_root, out_dir):
+    """Havuzu out_dir/stimuli.bundle olarak paketler; paketin kökünü döndürür"""
+    sys.path.insert(0, HERE)
+    import main as app
+    root = os.path.join(out_dir, 'stimuli')
+    if not os.path.exists(root + app.BUNDLE_EXT):
+        os.makedirs(out_dir, exist_ok=True)
+        app.pack_bundle(stim_root or app.STIM_ROOT, root + app.BUNDLE_EXT)
+    return root
+
+
+# ------------------ Tek senaryo (alt süreç) ------------------
+def percentiles(values):
+    if not values:
+        return None
+    arr = np.asarray(values, dtype=float)
+    return {'n': int(arr.size), 'p50': round(float(np.percentile(arr, 50)), 3),
+            'p95': round(float(np.percentile(arr, 95)), 3),
+            'max': round(float(arr.max()), 3), 'toplam': round(float(arr.sum()), 3)}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except Exception:
+        return None
+
+
+def run_scenario(stim_root, seed, refresh_hz, cache, time_scale=0.0):
+    """Bir oturumu bu süreçte çalıştırıp ölçümleri sözlük olarak döndürür"""
+    t0 = time.perf_counter()
+    import simulation
+    app = simulation.load_app()
+    import_sec = time.perf_counter() - t0
+
+    write_ms = []
+    real_write = app.ResultWriter.write
+    def timed_write(self, rows):
+        t = time.perf_counter()
+        real_write(self, rows)
+        write_ms.append((time.perf_counter() - t) * 1000)
+    app.ResultWriter.write = timed_write  # sunum iş parçacığının sonuç yazma maliyeti
+
+    with tempfile.TemporaryDirectory(prefix='deney_bench_') as tmp:
+        data_dir = os.path.join(tmp, 'veri')
+        os.makedirs(data_dir)
+        cache_dir = None
+        if cache != 'kapali':
+            cache_dir = os.path.join(tmp, 'onbellek')
+            os.makedirs(cache_dir)
+            if cache == 'sicak':
+                app.CACHE_DIR = cache_dir
+                app.build_cache(tuple(simulation.STATE.win_size), stim_root=stim_root)
+        participant = simulation.SimulatedParticipant(seed)
+        t_main = time.perf_counter()
+        cpu0 = time.process_time()
+        code, results = simulation.run_session(app, participant, data_dir, stim_root,
+                                               cache_dir, refresh_hz=refresh_hz,
+                                               time_scale=time_scale)
+        wall = time.perf_counter() - t_main
+        cpu = time.process_time() - cpu0
+        state = simulation.STATE
+
+    decode, wait, bind = [], [], []
+    textures = writer = None
+    pattern = re.compile(r"decode=([\d.]+)ms .*bekleme=([\d.]+)ms bind=([\d.]+)ms")
+    for level, msg in state.log:
+        m = pattern.search(str(msg))
+        if m:
+            decode.append(float(m.group(1)))
+            wait.append(float(m.group(2)))
+            bind.append(float(m.group(3)))
+        elif str(msg).startswith('[Dokular] '):
+            textures = ast.literal_eval(str(msg)[len('[Dokular] '):])
+        elif str(msg).startswith('[Sonuçlar] '):
+            writer = ast.literal_eval(str(msg)[len('[Sonuçlar] '):])
+            writer.pop('bicim', None)
+
+    frames = state.frames
+    onset_ms = [work * 1000 for _, _, work, onset in frames if onset]
+    frame_ms = [work * 1000 for _, _, work, _ in frames]
+    return {
+        'cikis_kodu': code,
+        'set_sayisi': len(app.list_sets(stim_root or app.STIM_ROOT)),
+        'ice_aktarma_sn': round(import_sec, 4),
+        'baslangic_sn': round(state.first_flip_perf - t_main, 4) if state.first_flip_perf else None,
+        'oturum_sn': round(wall, 3),
+        'oturum_cpu_sn': round(cpu, 3),
+        'sanal_oturum_sn': round(state.now, 1),
+        'foto_cozme_ms': percentiles(decode),
+        'foto_bekleme_ms': percentiles(wait),
+        'foto_baglama_ms': percentiles(bind),
+        'ekran_cizim_ms': percentiles(onset_ms),
+        'kare_cizim_ms': percentiles(frame_ms),
+        'sonuc_yazma_ms': percentiles(write_ms),
+        'sonuc_yazici': writer,
+        'dokular': textures,
+        'flip_sayisi': len(frames),
+        'tepe_bellek_mb': peak_rss_mb(),
+    }
+
+
+def run_static_compare(seconds=3.0, refresh_hz=60.0, real=False):
+    """Bir fotoğraf ekranını gerçek zamanda iki kipte gösterip CPU ve çizim yükünü ölçer.
+
+    Sahte pencerede çizim ve flip'in kendisi CPU harcamaz; ölçülen yalnızca
+    uygulamanın döngü maliyetidir. real=True ise gerçek PsychoPy penceresi
+    açılır ve sürücünün çizim/flip maliyeti de ölçüme girer.
+    """
+    if real:
+        import main as app
+        app.import_psychopy()
+        win = app.visual.Window(size=(1024, 768), fullscr=False, color=app.BG_COLOR,
+                                units='height', checkTiming=True)
+    else:
+        import simulation
+        app = simulation.load_app()
+    out = {}
+    for name, static in (('surekli', False), ('statik', True)):
+        if not real:
+            simulation.STATE.reset(None, refresh_hz=refresh_hz, time_scale=1.0)
+            win = app.visual.Window()
+        stims = [app.visual.ImageStim(win, image=Image.new('RGB', (640, 800)), size=(0.72, 0.9)),
+                 app.visual.TextStim(win, text=app.PHOTO_HINT, height=0.03, pos=(0, -0.47))]
+        counts = {'flip': 0, 'cizim': 0}
+        flip = win.flip
+        def counted_flip(*a, **kw):
+            counts['flip'] += 1
+            return flip(*a, **kw)
+        win.flip = counted_flip
+        def draw():
+            for stim in stims:
+                stim.draw()
+                counts['cizim'] += 1
+        scheduler = app.FrameScheduler(win)
+        n_frames = scheduler.frames(seconds)
+        t0, c0 = time.perf_counter(), time.process_time()
+        scheduler.present(draw, n_frames, poll=lambda: None, static=static)
+        win.flip()  # sonraki ekran: süre bu flip'te biter
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        win.flip = flip
+        out[name] = dict(counts, duvar_sn=round(wall, 3), cpu_sn=round(cpu, 4),
+                         cpu_yuzde=round(cpu / wall * 100, 2) if wall else None)
+    if real:
+        win.close()
+    return out
+
+
+# ------------------ Ana akış ------------------
+def run_in_subprocess(stim_root, seed, refresh_hz, cache, time_scale, static_sec=None,
+                      real=False):
+    cmd = [sys.executable, os.path.abspath(__file__), '--_tek', '--seed', str(seed),
+           '--refresh', str(refresh_hz), '--cache', cache, '--time-scale', str(time_scale)]
+    if stim_root:
+        cmd += ['--stimuli', stim_root]
+    if static_sec is not None:
+        cmd += ['--static-sec', str(static_sec), '--_statik']
+        if real:
+            cmd += ['--real']
+    out = subprocess.run(cmd, capture_output=True, text=True, cwd=HERE)
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"Senaryo başarısız:\n{out.stdout}\n{out.stderr}")
+
+
+def flatten(d, prefix=''):
+    flat = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            flat.update(flatten(v, f"{prefix}{k}."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            flat[f"{prefix}{k}"] = v
+    return flat
+
+
+def print_report(report, baseline=None):
+    for name, res in report['senaryolar'].items():
+        print(f"\n== {name} ==")
+        base = flatten(baseline['senaryolar'].get(name, {})) if baseline else {}
+        for key, val in flatten(res).items():
+            line = f"  {key:32s} {val:>12}"
+            old = base.get(key)
+            if old not in (None, 0):
+                line += f"   ({(val - old) / old * 100:+.1f}%)"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uçtan uca performans ölçümü")
+    parser.add_argument('--pools', type=int, nargs='*', default=[],
+                        help="Ek sentetik havuz boyutları (ör. 100 1000)")
+    parser.add_argument('--pool-dir', default=os.path.join(tempfile.gettempdir(), 'deney_bench_havuz'),
+                        help="Sentetik havuzların saklanacağı klasör")
+    parser.add_argument('--cache', choices=['kapali', 'soguk', 'sicak'], default='soguk',
+                        help="Doku önbelleği durumu")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--refresh', type=float, default=60.0)
+    parser.add_argument('--time-scale', type=float, default=0.0,
+                        help="Sanal saniye başına gerçek bekleme; 0'da önyükleme bekleme "
+                             "süreleri gerçekte olduğundan uzun görünür")
+    parser.add_argument('--static-sec', type=float, default=3.0,
+                        help="Statik/sürekli çizim karşılaştırmasında kip başına gerçek süre (0 = atla)")
+    parser.add_argument('--bundle', action='store_true',
+                        help="Senaryoları uyaran paketinden çalıştır (klasörler okunmaz)")
+    parser.add_argument('--stimuli', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--real', action='store_true',
+                        help="Statik karşılaştırmayı gerçek PsychoPy penceresiyle yap (ekran gerekir)")
+    parser.add_argument('--_statik', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--_tek', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--out', default=None, help="Sonuçları JSON olarak kaydet")
+    parser.add_argument('--compare', default=None, help="Önceki JSON ile karşılaştır")
+    args = parser.parse_args()
+
+    if args._tek and args._statik:
+        print(json.dumps(run_static_compare(args.static_sec, args.refresh, args.real)))
+        sys.exit(0)
+    if args._tek:
+        print(json.dumps(run_scenario(args.stimuli, args.seed, args.refresh, args.cache,
+                                      args.time_scale)))
+        sys.exit(0)
+
+    scenarios = {'stimuli': None}
+    for n in args.pools:
+        root = os.path.join(args.pool_dir, f"havuz_{n}")
+        print(f"[Benchmark] {n} setlik sentetik havuz hazırlanıyor: {root}")
+        scenarios[f"havuz_{n}"] = make_pool(root, n)
+    if args.bundle:
+        scenarios = {f"{name}+paket": make_bundle(root, os.path.join(args.pool_dir, f"paket_{name}"))
+                     for name, root in scenarios.items()}
+
+    report = {'tarih': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': sys.version.split()[0],
+              'onbellek': args.cache, 'senaryolar': {}}
+    for name, root in scenarios.items():
+        print(f"[Benchmark] {name} çalışıyor...")
+        report['senaryolar'][name] = run_in_subprocess(root, args.seed, args.refresh,
+                                                       args.cache, args.time_scale)
+    if args.static_sec > 0:
+        print(f"[Benchmark] statik ekran karşılaştırması ({args.static_sec:g} sn x 2)...")
+        report['senaryolar']['statik_ekran'] = run_in_subprocess(
+            None, args.seed, args.refresh, args.cache, 0.0, static_sec=args.static_sec,
+            real=args.real)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,178 @@
+# collector.py
+"""
+Laboratuvar istasyonlarından gelen sonuç satırlarını toplayan yerel servis.
+
+İstasyonlar (main.py --collector URL ya da DENEY_TOPLAYICI) satırları
+toplu halde POST /satirlar ile gönderir:
+    {"station": ..., "session": ..., "rows": [[sıra_no, participant, ...], ...]}
+Yanıt, o oturum için kesintisiz kaydedilmiş son sıra numarasıdır:
+    {"acked": N}
+Satırlar SQLite (WAL) veritabanında (istasyon, oturum, sıra_no) birincil
+anahtarıyla tutulur; yeniden gönderilen satırlar yok sayılır. Her toplu
+gönderim tek bir işlemde yazılır. Bağlantılar HTTP/1.1 ile açık tutulur.
+
+Kullanım:
+    python collector.py --port 8765                 # servis
+    python collector.py --export DeneyVerileri      # oturumları *_sonuclar.csv olarak dışa aktar
+    GET /durum                                      # istasyon/oturum sayıları ve hız
+"""
+import os, csv, json, time, sqlite3, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from main import RESULT_HEADER, get_data_dir
+
+DEFAULT_PORT = 8765
+DB_NAME = 'toplayici.sqlite'
+MAX_BODY = 8 * 1024 * 1024
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS satirlar (
+    station TEXT NOT NULL, session TEXT NOT NULL, seq INTEGER NOT NULL,
+    {', '.join(f'{c} TEXT' for c in RESULT_HEADER)},
+    received REAL NOT NULL,
+    PRIMARY KEY (station, session, seq)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    """Tek yazıcı bağlantılı SQLite deposu (iş parçacıkları kilitle sıralanır)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.rows_in = 0
+        self.duplicates = 0
+        self.batches = 0
+
+    def add(self, station, session, rows):
+        """Satırları ekler; oturum için kesintisiz son sıra numarasını döndürür"""
+        width = len(RESULT_HEADER)
+        now = time.time()
+        values = [(station, session, int(r[0]),
+                   *[str(v) for v in (list(r[1:width + 1]) + [''] * width)[:width]], now)
+                  for r in rows]
+        placeholders = ', '.join('?' * (width + 4))
+        with self.lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany(f"INSERT OR IGNORE INTO satirlar VALUES ({placeholders})", values)
+            added = self.db.total_changes - before
+            self.rows_in += added
+            self.duplicates += len(values) - added
+            self.batches += 1
+            return self._acked(station, session)
+
+    def _acked(self, station, session):
+        # 1'den başlayan sıra numaralarında boşluk yoksa son numara = satır sayısı
+        count, last = self.db.execute(
+            "SELECT COUNT(*), MAX(seq) FROM satirlar WHERE station=? AND session=?",
+            (station, session)).fetchone()
+        if not count or count == last:
+            return last or 0
+        if not self.db.execute("SELECT 1 FROM satirlar WHERE station=? AND session=? AND seq=1",
+                               (station, session)).fetchone():
+            return 0
+        # Kesintisiz dizinin sonu: ardılı olmayan en küçük sıra numarası
+        return self.db.execute(
+            "SELECT MIN(seq) FROM satirlar a WHERE station=? AND session=? AND NOT EXISTS "
+            "(SELECT 1 FROM satirlar b WHERE b.station=a.station AND b.session=a.session "
+            "AND b.seq=a.seq+1)", (station, session)).fetchone()[0]
+
+    def stats(self):
+        with self.lock:
+            stations, sessions, total = self.db.execute(
+                "SELECT COUNT(DISTINCT station), COUNT(DISTINCT station || '/' || session), COUNT(*) "
+                "FROM satirlar").fetchone()
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {'istasyon': stations, 'oturum': sessions, 'satir': total,
+                'alinan': self.rows_in, 'tekrar': self.duplicates, 'toplu': self.batches,
+                'satir_sn': round(self.rows_in / elapsed, 2)}
+
+    def export(self, out_dir):
+        """Her oturumu main.py ile aynı biçimde {oturum}_sonuclar.csv olarak yazar"""
+        os.makedirs(out_dir, exist_ok=True)
+        with self.lock:
+            sessions = self.db.execute(
+                "SELECT DISTINCT station, session FROM satirlar ORDER BY session").fetchall()
+        written = []
+        for station, session in sessions:
+            with self.lock:
+                rows = self.db.execute(
+                    f"SELECT {', '.join(RESULT_HEADER)} FROM satirlar "
+                    "WHERE station=? AND session=? ORDER BY seq", (station, session)).fetchall()
+            path = os.path.join(out_dir, f"{session}_sonuclar.csv")
+            with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+                w = csv.writer(f)
+                w.writerow(RESULT_HEADER)
+                w.writerows(rows)
+            written.append(path)
+        return written
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # istasyonlar bağlantıyı açık tutar
+
+    def _reply(self, status, obj):
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/').rsplit('/', 1)[-1] != 'satirlar':
+            return self._reply(404, {'hata': 'bilinmeyen yol'})
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_BODY:
+            return self._reply(400, {'hata': 'geçersiz uzunluk'})
+        try:
+            data = json.loads(self.rfile.read(length))
+            acked = self.server.store.add(str(data['station']), str(data['session']), data['rows'])
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            return self._reply(400, {'hata': str(e)})
+        self._reply(200, {'acked': acked})
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/durum':
+            return self._reply(404, {'hata': 'bilinmeyen yol'})
+        self._reply(200, self.server.store.stats())
+
+    def log_message(self, fmt, *args):
+        pass  # her istek için konsola yazma
+
+
+def serve(store, host='0.0.0.0', port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), CollectorHandler)
+    server.daemon_threads = True
+    server.store = store
+    print(f"[Toplayıcı] {host}:{server.server_address[1]} dinleniyor, veritabanı: {store.path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[Toplayıcı] kapandı: {store.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sonuç toplayıcı servis")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default=None, help="Veritabanı (varsayılan: <veri>/toplayici.sqlite)")
+    parser.add_argument('--export', default=None, metavar='KLASOR',
+                        help="Servisi başlatmak yerine oturumları CSV olarak dışa aktar")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db or os.path.join(get_data_dir(), DB_NAME))
+    if args.export:
+        paths = store.export(args.export)
+        print(f"[Toplayıcı] {len(paths)} oturum -> {args.export}")
+    else:
+        serve(store, args.host, args.port)
@@ -0,0 +1,231 @@
+# features.py
+"""
+Uyaranların görsel düzeyindeki alt-düzey özellikleri (analizde ortak değişken).
+
+Her görsel ANALYSIS_PX x ANALYSIS_PX boyutuna küçültülerek çözülür (JPEG
+draft modu); görseller BATCH_SIZE'lık yığınlar halinde süreç havuzuna
+dağıtılır ve özellikler yığın boyunca tek NumPy geçişinde hesaplanır:
+  parlaklik          ortalama parlaklık (Rec. 601 luma, 0-1)
+  kontrast           RMS kontrast (luma standart sapması, 0-1)
+  renklilik          Hasler & Süsstrunk (2003) renklilik ölçüsü
+  entropi            luma histogramının Shannon entropisi (bit)
+  ten_orani          YCbCr ten rengi aralığındaki piksellerin oranı (yüz varlığı vekili)
+  merkez_ten_orani   aynı oran, görselin ortadaki yarısında
+  genislik, yukseklik, megapiksel, en_boy   özgün çözünürlük (EXIF yönü uygulanmış)
+
+Kare boyuta küçültme en-boy oranını bozar; yukarıdaki istatistikler piksel
+dağılımına dayandığından bundan etkilenmez.
+
+Sonuçlar dosya içeriğinin SHA-1 özetine göre önbelleğe yazılır; yalnızca yeni
+ya da değişen görseller yeniden hesaplanır. Değişmemiş dosyalar boyut ve
+değişiklik zamanıyla tanınır, yeniden okunup özetlenmez (paketteki görsellerin
+özeti paket dizinindedir). Çıktılar sonuçlardaki set_index ile aynı anahtarı
+kullanır (set klasör numarası) ve scoring.py / agreement.py tablolarına
+doğrudan birleştirilebilir.
+
+Kullanım:
+    python features.py                                  # stimuli/ -> <veri>/gorsel_ozellikleri.csv, set_ozellikleri.csv
+    python features.py --stimuli havuz --out-dir ciktilar --workers 8
+    python features.py --refresh                        # önbelleği yok say, hepsini yeniden hesapla
+"""
+import os, csv, time, argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import main as app
+from scoring import format_value, read_json, write_json
+
+FEATURE_VERSION = 1           # hesaplama değişirse artırılır; eski önbellek kayıtları geçersiz olur
+ANALYSIS_PX = 256             # özelliklerin hesaplandığı kare boyut
+BATCH_SIZE = 16               # süreç başına bir seferde işlenen görsel
+CACHE_NAME = 'gorsel_ozellikleri.json'
+IMAGE_TABLE = 'gorsel_ozellikleri.csv'
+SET_TABLE = 'set_ozellikleri.csv'
+
+PIXEL_FEATURES = ['parlaklik', 'kontrast', 'renklilik', 'entropi', 'ten_orani', 'merkez_ten_orani']
+SIZE_FEATURES = ['genislik', 'yukseklik', 'megapiksel', 'en_boy']
+FEATURES = PIXEL_FEATURES + SIZE_FEATURES
+
+SKIN_CB = (77, 127)           # Chai & Ngan (1999) ten rengi aralığı
+SKIN_CR = (133, 173)
+
+
+# ------------------ Özellikler (alt süreç) ------------------
+def pixel_features(batch):
+    """batch (B, H, W, 3) uint8 -> özellik -> (B,) dizi"""
+    rgb = batch.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    luma = 0.299 * r + 0.587 * g + 0.114 * b
+    axes = (1, 2)
+
+    rg = r - g
+    yb = 0.5 * (r + g) - b
+    colorfulness = (np.sqrt(rg.var(axes) + yb.var(axes))
+                    + 0.3 * np.sqrt(rg.mean(axes) ** 2 + yb.mean(axes) ** 2))
+
+    # Görsel başına 256 kutulu histogram: görsel indeksi kaydırılarak tek bincount
+    n, h, w = luma.shape
+    levels = np.clip(np.rint(luma), 0, 255).astype(np.int64).reshape(n, -1)
+    hist = np.bincount((levels + 256 * np.arange(n)[:, None]).ravel(),
+                       minlength=256 * n).reshape(n, 256) / levels.shape[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(hist > 0, hist * np.log2(hist), 0).sum(1)
+
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+    skin = (cb >= SKIN_CB[0]) & (cb <= SKIN_CB[1]) & (cr >= SKIN_CR[0]) & (cr <= SKIN_CR[1])
+
+    return {'parlaklik': luma.mean(axes) / 255,
+            'kontrast': luma.std(axes) / 255,
+            'renklilik': colorfulness,
+            'entropi': entropy,
+            'ten_orani': skin.mean(axes),
+            'merkez_ten_orani': skin[:, h // 4:h - h // 4, w // 4:w - w // 4].mean(axes)}
+
+
+def extract_batch(paths, size=ANALYSIS_PX):
+    """Bir yığın görseli çözer; yol -> özellikler (ya da {'hata': ...})"""
+    out, arrays, ok = {}, [], []
+    for path in paths:
+        try:
+            width, height = app.get_image_size(path)
+            arrays.append(np.asarray(app.decode_image(path, (size, size)), dtype=np.uint8))
+            ok.append(path)
+            out[path] = {'genislik': width, 'yukseklik': height,
+                         'megapiksel': width * height / 1e6, 'en_boy': width / height}
+        except Exception as e:
+            out[path] = {'hata': f"{type(e).__name__}: {e}"}
+    if arrays:
+        values = pixel_features(np.stack(arrays))
+        for i, path in enumerate(ok):
+            out[path].update({k: float(v[i]) for k, v in values.items()})
+    return out
+
+
+# ------------------ Önbellek ------------------
+def default_cache():
+    cache_dir = app.get_cache_dir()
+    base = os.path.dirname(cache_dir) if cache_dir else app.get_data_dir()
+    return os.path.join(base, CACHE_NAME)
+
+
+def load_cache(path):
+    cache = read_json(path, {})
+    if cache.get('surum') != FEATURE_VERSION or cache.get('boyut') != ANALYSIS_PX:
+        cache = {'surum': FEATURE_VERSION, 'boyut': ANALYSIS_PX, 'ozellikler': {}, 'dosyalar': {}}
+    return cache
+
+
+def digest(path, stamps):
+    """İçerik özeti; boyutu ve değişiklik zamanı aynı kalan dosyalar yeniden okunmaz"""
+    _, entry = app.bundle_entry(path)
+    if entry is not None:
+        return entry['sha1']
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    stamp = stamps.get(key)
+    if stamp and stamp[:2] == [st.st_size, st.st_mtime_ns]:
+        return stamp[2]
+    sha1 = app.file_digest(path)
+    stamps[key] = [st.st_size, st.st_mtime_ns, sha1]
+    return sha1
+
+
+# ------------------ Ana akış ------------------
+def collect(stim_root):
+    """(set_index, set adı, sıra, yol) listesi; set numarası olmayan setler atlanır"""
+    items = []
+    for name in app.index_sets(stim_root):
+        no = app.set_number(name)
+        if no is None:
+            print(f"[Uyarı] {name}: set numarası yok, atlandı")
+            continue
+        for i, path in enumerate(app.list_images(os.path.join(stim_root, name))):
+            items.append((no, name, i + 1, path))
+    return items
+
+
+def extract(stim_root, cache_path=None, workers=None, refresh=False, batch=BATCH_SIZE):
+    """Tüm görsellerin özellik satırları; önbellekte olmayanlar süreç havuzunda hesaplanır"""
+    t0 = time.perf_counter()
+    cache_path = cache_path or default_cache()
+    cache = load_cache(cache_path)
+    if refresh:
+        cache['ozellikler'] = {}
+    items = collect(stim_root)
+    digests = {}
+    for *_, path in items:
+        try:
+            digests[path] = digest(path, cache['dosyalar'])
+        except OSError as e:
+            print(f"[Uyarı] {path}: {e}")
+
+    todo = sorted({path for path, sha1 in digests.items() if sha1 not in cache['ozellikler']})
+    jobs = [todo[i:i + batch] for i in range(0, len(todo), batch)]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=app.get_bundle,
+                                 initargs=(stim_root,)) as pool:
+            for result in pool.map(extract_batch, jobs):
+                for path, values in result.items():
+                    if 'hata' in values:
+                        print(f"[Uyarı] {path}: {values['hata']}")
+                    else:
+                        cache['ozellikler'][digests[path]] = values
+        try:
+            write_json(cache_path, cache)
+        except OSError as e:
+            print(f"[Uyarı] Önbellek yazılamadı: {e}")
+
+    rows = []
+    for no, name, order, path in items:
+        values = cache['ozellikler'].get(digests.get(path))
+        if values is not None:
+            rows.append({'set_index': no, 'set': name, 'sira': order,
+                         'gorsel': os.path.basename(path), 'sha1': digests[path], **values})
+    print(f"[Özellikler] {len(items)} görsel, {len(todo)} yeni hesaplandı, "
+          f"{len(items) - len(todo)} önbellekten, süre {time.perf_counter() - t0:.1f} sn")
+    return rows
+
+
+def set_table(rows):
+    """Set başına özellik ortalamaları ve standart sapmaları"""
+    by_set = {}
+    for row in rows:
+        by_set.setdefault((row['set_index'], row['set']), []).append(row)
+    out = []
+    for (no, name), members in sorted(by_set.items()):
+        values = np.array([[m[f] for f in FEATURES] for m in members], dtype=np.float64)
+        row = {'set_index': no, 'set': name, 'n_gorsel': len(members)}
+        row.update(zip(FEATURES, values.mean(0)))
+        row.update(zip([f + '_sd' for f in FEATURES],
+                       values.std(0, ddof=1) if len(members) > 1 else np.full(len(FEATURES), np.nan)))
+        out.append(row)
+    return out
+
+
+def write_table(rows, names, path):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        w = csv.writer(f)
+        w.writerow(names)
+        w.writerows([format_value(r[n]) for n in names] for r in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uyaranların görsel özelliklerini çıkar")
+    parser.add_argument('--stimuli', default=None, help="Uyaran klasörü (varsayılan: stimuli/)")
+    parser.add_argument('--out-dir', default=None, help="Çıktı klasörü (varsayılan: veri klasörü)")
+    parser.add_argument('--cache', default=None, help=f"Önbellek dosyası (varsayılan: {CACHE_NAME})")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı")
+    parser.add_argument('--refresh', action='store_true', help="Önbelleği yok say ve yeniden hesapla")
+    args = parser.parse_args()
+
+    stim_root = os.path.normpath(args.stimuli or app.STIM_ROOT)
+    out_dir = args.out_dir or app.get_data_dir()
+    rows = extract(stim_root, args.cache, args.workers, args.refresh)
+    write_table(rows, ['set_index', 'set', 'sira', 'gorsel', 'sha1'] + FEATURES,
+                os.path.join(out_dir, IMAGE_TABLE))
+    sets = set_table(rows)
+    write_table(sets, ['set_index', 'set', 'n_gorsel'] + FEATURES + [f + '_sd' for f in FEATURES],
+                os.path.join(out_dir, SET_TABLE))
+    print(f"[Özellikler] {len(rows)} görsel, {len(sets)} set -> {out_dir}")
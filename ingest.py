@@ -0,0 +1,227 @@
+# ingest.py
+"""
+DeneyVerileri klasöründeki oturum CSV'lerini artımlı olarak sütunlu bir
+depoya aktarır.
+
+Depo klasörü:
+    manifest.json      aktarılmış dosyalar (yol, boyut, mtime, SHA-1, file_id)
+    sozluk.json        sözlükle kodlanan sütunların değer listeleri
+    parca_NNNNN.npz    her aktarımda eklenen sütun parçaları
+
+Yalnızca yeni ya da değişmiş dosyalar okunur. Değişen bir dosya yeni bir
+file_id ile yeniden eklenir; eski satırlar manifestte artık yer almadığı için
+sorgularda elenir (--compact ile diskten de silinir). Metin sütunları
+(participant, phase, item_text ...) int32 kodlarla saklanır; sorgular
+yalnızca istenen sütunları okur.
+
+Kullanım:
+    python ingest.py                      # varsayılan veri klasörü, depo: DeneyVerileri/_depo
+    python ingest.py --compact
+"""
+import os, time, argparse
+
+import numpy as np
+
+from main import get_data_dir, file_digest
+from scoring import RESULT_COLUMNS, find_result_files, read_results, to_int, read_json, write_json
+
+STORE_DIRNAME = '_depo'
+MANIFEST = 'manifest.json'
+DICTIONARY = 'sozluk.json'
+
+DICT_COLUMNS = ["participant", "timestamp", "phase", "item_text",
+                "response_key", "response_label"]
+# Sütun -> (dtype, boş değer)
+NUMERIC_COLUMNS = {"set_index": (np.int32, -1), "item_index": (np.int16, -1),
+                   "rt_sec": (np.float32, np.nan)}
+
+
+def default_store(data_dir):
+    return os.path.join(data_dir, STORE_DIRNAME)
+
+
+def _to_float(values):
+    values = np.char.strip(values.astype(str))
+    values = np.where(values == '', 'nan', values)
+    try:
+        return values.astype(np.float32)
+    except ValueError:
+        out = np.full(values.shape, np.nan, dtype=np.float32)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except ValueError:
+                pass
+        return out
+
+
+class ColumnStore:
+    """Manifest + sözlük + .npz parçalarından oluşan sütunlu depo"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.manifest = read_json(os.path.join(path, MANIFEST),
+                                   {'files': {}, 'next_file_id': 0, 'shards': []})
+        self.dictionary = read_json(os.path.join(path, DICTIONARY),
+                                     {c: [] for c in DICT_COLUMNS})
+        self._lookup = {c: {v: i for i, v in enumerate(vals)}
+                        for c, vals in self.dictionary.items()}
+
+    # ---- aktarım ----
+    def _encode(self, column, values):
+        """Metin dizisini sözlük kodlarına çevirir (yeni değerleri sözlüğe ekler)"""
+        uniq, inv = np.unique(values, return_inverse=True)
+        lookup, vals = self._lookup[column], self.dictionary[column]
+        codes = np.empty(len(uniq), dtype=np.int32)
+        for i, v in enumerate(uniq.tolist()):
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(vals)
+                vals.append(v)
+            codes[i] = code
+        return codes[inv]
+
+    def ingest(self, data_dir):
+        """Yeni/değişmiş oturumları aktarır; (yeni, değişen, silinen, atlanan) sayıları döndürür"""
+        files = self.manifest['files']
+        seen, todo = set(), []
+        changed = skipped = 0
+        for path in find_result_files(data_dir):
+            name = os.path.relpath(path, data_dir)
+            seen.add(name)
+            st = os.stat(path)
+            entry = files.get(name)
+            if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+                skipped += 1
+                continue
+            digest = file_digest(path)
+            if entry and entry['sha1'] == digest:
+                entry['mtime'] = st.st_mtime  # yalnızca zaman damgası değişmiş
+                skipped += 1
+                continue
+            changed += entry is not None
+            todo.append((name, path, st, digest))
+
+        removed = [n for n in files if n not in seen]
+        for name in removed:
+            del files[name]
+
+        if todo:
+            table = read_results([p for _, p, _, _ in todo])
+            # read_results boş dosyaları atlar: oturum indeksini yola göre eşle
+            file_ids = []
+            for name, path, st, digest in todo:
+                fid = self.manifest['next_file_id']
+                self.manifest['next_file_id'] += 1
+                files[name] = {'size': st.st_size, 'mtime': st.st_mtime, 'sha1': digest,
+                               'file_id': fid, 'rows': 0}
+                file_ids.append(fid)
+            id_of_path = {p: fid for (_, p, _, _), fid in zip(todo, file_ids)}
+            session_ids = np.asarray([id_of_path[p] for p in table['sessions']], dtype=np.int32)
+
+            shard = {'file_id': session_ids[table['session']] if len(table['session'])
+                     else np.zeros(0, dtype=np.int32)}
+            for c in DICT_COLUMNS:
+                shard[c] = self._encode(c, table[c])
+            for c, (dtype, _) in NUMERIC_COLUMNS.items():
+                if dtype is np.float32:
+                    shard[c] = _to_float(table[c])
+                else:
+                    shard[c] = to_int(table[c]).astype(dtype)
+            counts = np.bincount(table['session'], minlength=len(table['sessions']))
+            name_of_path = {p: name for name, p, _, _ in todo}
+            for path, n in zip(table['sessions'], counts.tolist()):
+                files[name_of_path[path]]['rows'] = n
+            self._write_shard(shard)
+
+        self._save()
+        return len(todo) - changed, changed, len(removed), skipped
+
+    def _write_shard(self, columns):
+        name = f"parca_{len(self.manifest['shards']) + 1:05d}_{int(time.time())}.npz"
+        tmp = os.path.join(self.path, name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp, os.path.join(self.path, name))
+        self.manifest['shards'].append(name)
+
+    def _save(self):
+        # Önce sözlük: manifest yeni parçayı gösterdiğinde kodlar zaten kayıtlı olsun
+        write_json(os.path.join(self.path, DICTIONARY), self.dictionary)
+        write_json(os.path.join(self.path, MANIFEST), self.manifest)
+
+    # ---- sorgu ----
+    def active_ids(self):
+        return np.asarray(sorted(e['file_id'] for e in self.manifest['files'].values()),
+                          dtype=np.int32)
+
+    def load(self, columns=None, decode=True):
+        """Yalnızca istenen sütunları okuyup etkin dosyaların satırlarını döndürür.
+
+        decode=True ise sözlük sütunları metne çevrilir, aksi halde int32 kod kalır.
+        """
+        columns = list(columns or (['file_id'] + RESULT_COLUMNS))
+        active = self.active_ids()
+        parts = {c: [] for c in columns}
+        for shard in self.manifest['shards']:
+            with np.load(os.path.join(self.path, shard)) as npz:
+                keep = np.isin(npz['file_id'], active)
+                for c in columns:
+                    parts[c].append(npz[c][keep])
+        out = {}
+        for c in columns:
+            arr = np.concatenate(parts[c]) if parts[c] else np.zeros(0)
+            if decode and c in self.dictionary:
+                arr = np.asarray(self.dictionary[c], dtype=str)[arr] if len(arr) else arr.astype(str)
+            out[c] = arr
+        return out
+
+    def compact(self):
+        """Eski (yerine yenisi gelmiş/silinmiş) satırları atıp tek parçaya yazar"""
+        data = self.load(['file_id'] + DICT_COLUMNS + list(NUMERIC_COLUMNS), decode=False)
+        old = list(self.manifest['shards'])
+        self.manifest['shards'] = []
+        self._write_shard(data)
+        self._save()
+        for name in old:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+
+def load_table(store):
+    """Depoyu scoring.read_results ile aynı biçimde tablo olarak döndürür"""
+    data = store.load(['file_id'] + RESULT_COLUMNS)
+    ids, session = np.unique(data.pop('file_id'), return_inverse=True)
+    names = {e['file_id']: n for n, e in store.manifest['files'].items()}
+    table = {c: data[c] for c in ("participant", "timestamp", "phase", "item_text",
+                                  "response_key", "response_label")}
+    for c in NUMERIC_COLUMNS:
+        vals = data[c]
+        if vals.dtype.kind == 'f':
+            table[c] = np.where(np.isnan(vals), '', np.char.mod('%.4f', vals))
+        else:
+            table[c] = np.where(vals < 0, '', vals.astype(str))
+    table['session'] = session.astype(np.int64)
+    table['sessions'] = [names[i] for i in ids.tolist()]
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Oturum CSV'lerini sütunlu depoya aktar")
+    parser.add_argument('--data-dir', default=None, help="Sonuç klasörü (varsayılan: DeneyVerileri)")
+    parser.add_argument('--store', default=None, help="Depo klasörü (varsayılan: <veri>/_depo)")
+    parser.add_argument('--compact', action='store_true', help="Aktarımdan sonra tek parçaya sıkıştır")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or get_data_dir()
+    store = ColumnStore(args.store or default_store(data_dir))
+    t0 = time.perf_counter()
+    new, changed, removed, skipped = store.ingest(data_dir)
+    print(f"[Aktarım] yeni={new} değişen={changed} silinen={removed} atlanan={skipped} "
+          f"süre={time.perf_counter() - t0:.2f} sn")
+    if args.compact:
+        store.compact()
+        print(f"[Aktarım] sıkıştırıldı: {store.manifest['shards']}")
@@ -1,8 +1,17 @@
 # main.py
 
+import time
+_T0 = time.perf_counter()  # başlangıç sürelerinin referansı (modülün yüklenmeye başladığı an)
+
 # --- EXE (--noconsole) kapanışında logging'in patlamasını engelle ---
-import sys, io, os, csv, glob, datetime
-from PIL import Image
+import sys, io, os, csv, glob, datetime, hashlib, argparse, threading
+import json, mmap, queue, random, socket, struct, sqlite3, zlib, http.client
+from urllib.parse import urlsplit
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from PIL import Image, ImageOps
 
 class _DevNull(io.TextIOBase):
     def write(self, s): return len(s or "")
@@ -13,15 +22,44 @@ if sys.stdout is None: sys.stdout = _DevNull()
 if sys.stderr is None: sys.stderr = _DevNull()
 # --------------------------------------------------------------------
 
-from psychopy import visual, core, event, gui, logging
+# PsychoPy modülleri gecikmeli yüklenir: gui/logging demografik diyalog için
+# hemen, visual/core/event/keyboard (pyglet, GL, arka uç yoklaması) ise diyalog
+# kapandıktan sonra ana iş parçacığında. Yüklenene kadar bu adlar None'dır.
+visual = core = event = gui = logging = keyboard = None
+
 
-# Konsol loglarını kapat, stream'i garanti et
-try:
-    logging.console.setLevel(logging.CRITICAL + 1)
-    if getattr(logging.console, "stream", None) is None:
-        logging.console.stream = _DevNull()
-except Exception:
-    pass
+def _silence_console():
+    # Konsol loglarını kapat, stream'i garanti et
+    try:
+        logging.console.setLevel(logging.CRITICAL + 1)
+        if getattr(logging.console, "stream", None) is None:
+            logging.console.stream = _DevNull()
+    except Exception:
+        pass
+
+
+def import_gui():
+    """Diyalog için gereken psychopy.gui ve logging'i yükler"""
+    global gui, logging
+    from psychopy import gui as _gui, logging as _logging
+    gui, logging = _gui, _logging
+    _silence_console()
+
+
+def import_psychopy():
+    """Pencere ve yanıt için gereken ağır PsychoPy modüllerini yükler"""
+    global visual, core, event, logging, keyboard
+    try:
+        import pyglet
+        # Gizli gölge GL penceresi açılmasın; bağlam deney penceresiyle
+        # birlikte oluşur (tek pencerede etkisi yok)
+        pyglet.options['shadow_window'] = False
+    except ImportError:
+        pass
+    from psychopy import visual as _visual, core as _core, event as _event, logging as _logging
+    from psychopy.hardware import keyboard as _keyboard
+    visual, core, event, logging, keyboard = _visual, _core, _event, _logging, _keyboard
+    _silence_console()
 
 
 def resource_path(*parts):
@@ -68,10 +106,42 @@ def get_data_dir():
     return path
 
 
+def get_cache_dir():
+    """
+    Ön-işlenmiş doku önbelleği klasörü. Windows'ta LOCALAPPDATA, diğerlerinde
+    ~/.cache altında; yazılamazsa veri klasörüne düşer.
+    """
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+
+    for root in (os.path.join(base, "DeneyUygulamasi"), os.path.join(get_data_dir(), ".onbellek")):
+        try:
+            path = os.path.join(root, "dokular")
+            os.makedirs(path, exist_ok=True)
+            return path
+        except Exception:
+            continue
+    return None
+
+
+_exit_hooks = []
+
+def on_exit(func):
+    """safe_exit sırasında (son eklenen önce) çağrılacak kapanış işi ekler"""
+    _exit_hooks.append(func)
+
 def safe_exit(win=None, code=0):
     """core.quit yerine güvenli çıkış; logging flush yazma hatalarını engeller."""
+    while _exit_hooks:
+        try:
+            _exit_hooks.pop()()
+        except Exception:
+            pass
     try:
-        if hasattr(logging, "console"):
+        if logging is not None and hasattr(logging, "console"):
             if getattr(logging.console, "stream", None) is None:
                 logging.console.stream = _DevNull()
             logging.console.setLevel(logging.CRITICAL + 1)
@@ -94,6 +164,9 @@ FULLSCREEN = True
 BG_COLOR = 'black'
 TEXT_COLOR = 'white'
 FONT_NAME = 'Arial'
+FONT_FILES = ['arial.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf', 'DejaVuSans.ttf']  # FONT_NAME için aranan dosyalar
+FONT_ATLAS = True         # metinleri önceden rasterize edilmiş yazı atlasından çiz (yoksa TextStim)
+TEXT_HEIGHTS = (0.02, 0.025, 0.03, 0.035, 0.04, 0.05, 0.06)   # arayüzde kullanılan metin yükseklikleri
 
 PHOTO_MAX_SEC = 10.0
 SKIP_KEY = 's'            # fotoğrafı geçmek için tuş
@@ -102,8 +175,52 @@ EXIT_KEY = 'escape'       # acil çıkış
 LIKERT_KEYS = ['1','2','3','4','5','6','7']  # 7'li Likert
 FRIEND_KEYS = ['e','h']   # e=Evet, h=Hayır
 
+RESPONSE_POLL_SEC = 0.002  # yanıt bekleme döngüsünün uyku aralığı (RT'yi etkilemez)
+STATIC_SCREENS = True      # değişmeyen fotoğraf ekranını bir kez çiz, her karede yeniden çizme
+STATIC_PREPARE_SEC = 0.050 # statik ekranda sıradaki dokuyu yüklemek için bitişten önce uyanma
+STATIC_SPIN_SEC = 0.001    # statik ekranda bitişten önce meşgul beklenen süre (uyku gecikmesine karşı)
+
+PREFETCH_WORKERS = 3      # sonraki setin fotoğraflarını arka planda çözen iş parçacığı sayısı
+TEXTURE_SLOTS = 2         # GPU'da aynı anda tutulan fotoğraf dokusu (gösterilen + sıradaki)
+
+# Zamanlama toleransı: aşılırsa oturum zamanlama özetinde 'uygun=0' olarak işaretlenir
+TIMING_TOLERANCE_FRAMES = 1    # süresi dolan fotoğrafta hedeften izin verilen sapma (kare)
+TIMING_MAX_DROP_RATE = 0.01    # kare kaybı ölçülen ekranlarda izin verilen atlanan kare oranı
+
+# Deneme planı: havuzdan katılımcı başına kaç set/görsel ve hangi sırayla
+SETS_PER_SESSION = 10
+IMAGES_PER_SET = 3
+PLAN_MODE = 'latin'       # 'sirali' | 'rastgele' | 'latin'
+PLAN_SEED = None          # None: rastgele modda her oturumda yeni tohum
+SESSION_NO = int(os.environ['DENEY_OTURUM']) if os.environ.get('DENEY_OTURUM') else None  # latin satırı; None: istasyon + sayaç
+SESSION_COUNTER = 'oturum_sayaci.json'   # istasyonun oturum sayacı (veri klasöründe)
+
+# İsteğe bağlı toplayıcı servis (collector.py); boşsa yalnızca yerel CSV yazılır
+COLLECTOR_URL = os.environ.get('DENEY_TOPLAYICI', '')   # ör. http://192.168.1.10:8765
+STATION_ID = os.environ.get('DENEY_ISTASYON') or socket.gethostname()
+UPLOAD_QUEUE_SIZE = 2000  # gönderim kuyruğu; dolarsa satırlar CSV'den yeniden okunur
+UPLOAD_BATCH_SIZE = 50
+UPLOAD_INTERVAL_SEC = 0.5
+
+# İsteğe bağlı canlı izleme: GET /durum ile oturumun anlık durumu (monitor.py toplar); 0 = kapalı
+STATUS_PORT = int(os.environ.get('DENEY_IZLEME_PORT') or 0)
+STATUS_DEFAULT_PORT = 8766
+STATUS_HOST = os.environ.get('DENEY_IZLEME_ADRES') or '127.0.0.1'   # yalnızca bu makine; ağ için açıkça 0.0.0.0
+STATUS_RECENT_RT = 10     # durumda gösterilen son yanıt süresi sayısı
+
+# Sonuç yazıcı: biçimler ve diske boşaltma politikası
+RESULT_FORMATS = ['csv']   # 'csv', 'jsonl', 'sqlite' (birden fazla seçilebilir)
+RESULT_FLUSH_SEC = 0.0     # 0: her toplu yazımdan sonra boşalt; >0: en geç bu aralıkla
+RESULT_FSYNC = False       # boşaltmada os.fsync / SQLite synchronous=FULL
+
+# Profil kipi: None (kapalı) | 'span' (aşama süreleri) | 'cprofile' (+ sunum iş parçacığının cProfile'ı)
+PROFILE_MODE = None
+
 STIM_ROOT = resource_path('stimuli')
-DATA_DIR = get_data_dir()
+# Klasörler uygulama çalıştırılınca (__main__) çözülür; içe aktarmak (scoring.py,
+# features.py ...) klasör oluşturmaz. simulation.py ve benchmark.py kendileri atar.
+DATA_DIR = None               # get_data_dir()
+CACHE_DIR = None              # get_cache_dir(); None ise önbellek devre dışı
 
 # Sorular (10 adet)
 LIKERT_QUESTIONS = [
@@ -144,25 +261,266 @@ LIKERT_LABELS = {
     '7': 'Tamamen Katılıyorum'
 }
 
+# ------------------ Uyaran paketi ------------------
+# stimuli/ klasörünün yanında stimuli.bundle varsa setler ve görseller tek
+# dosyadan okunur. Biçim:
+#   başlık   BUNDLE_MAGIC + dizin konumu (uint64) + dizin uzunluğu (uint64)
+#   veriler  görsel dosyalarının baytları, art arda (16 bayta hizalı)
+#   dizin    JSON: setler, görsel sırası, konum/uzunluk, piksel boyutu, en-boy, SHA-1
+# Görsel yolları dosya düzenindekiyle aynıdır (STIM_ROOT/set01/01.JPG); böylece
+# önbellek anahtarları ve günlükler değişmez. Klasör de mevcutsa ve paketten
+# sonra değiştiyse (görsel listesi, boyut ya da daha yeni dosya) paket yok
+# sayılır ve klasör kullanılır.
+BUNDLE_EXT = '.bundle'
+BUNDLE_MAGIC = b'DNYPAKET'
+BUNDLE_HEADER = struct.Struct('<8sQQ')
+BUNDLE_ALIGN = 16
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class _BundleFile(io.RawIOBase):
+    """Bellek eşlemli paketteki tek görseli dosya gibi okur (ara bayt kopyası yok)"""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class StimulusBundle:
+    """Bellek eşlemli uyaran paketi; set ve görsel bilgileri dizinden gelir"""
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = os.path.normpath(root)
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = BUNDLE_HEADER.unpack_from(self._map, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} bir uyaran paketi değil")
+        self.index = json.loads(bytes(self._map[index_offset:index_offset + index_length]))
+        self._sets = {s['name']: s['images'] for s in self.index['sets']}
+        self._entries = {(s['name'], e['name']): e
+                         for s in self.index['sets'] for e in s['images']}
+
+    def set_names(self):
+        return [s['name'] for s in self.index['sets']]
+
+    def image_names(self, set_name):
+        return [e['name'] for e in self._sets.get(set_name, [])]
+
+    def entry(self, img_path):
+        rel = os.path.relpath(os.path.normpath(img_path), self.root)
+        set_name, _, name = rel.replace(os.sep, '/').partition('/')
+        return self._entries.get((set_name, name))
+
+    def open(self, entry):
+        view = memoryview(self._map)[entry['offset']:entry['offset'] + entry['length']]
+        return io.BufferedReader(_BundleFile(view))
+
+    def verify(self, entry):
+        """Görselin baytlarının dizindeki SHA-1 ile eşleşip eşleşmediği"""
+        view = memoryview(self._map)[entry['offset']:entry['offset'] + entry['length']]
+        return hashlib.sha1(view).hexdigest() == entry['sha1']
+
+
+_bundles = {}
+_bundle_lock = threading.Lock()
+
+def get_bundle(stim_root):
+    """stim_root + '.bundle' varsa açık paketi döndürür (süreç başına bir kez açılır)"""
+    root = os.path.normpath(stim_root)
+    with _bundle_lock:
+        if root not in _bundles:
+            path = root + BUNDLE_EXT
+            bundle = None
+            if os.path.isfile(path):
+                try:
+                    bundle = StimulusBundle(path, root)
+                except Exception as e:
+                    print(f"[Uyarı] {path} açılamadı, klasör kullanılacak: {e}")
+            if bundle is not None and os.path.isdir(root):
+                reason = bundle_stale_reason(bundle)
+                if reason:
+                    print(f"[Uyarı] {path} eski ({reason}); klasör kullanılacak. "
+                          f"Yeniden paketlemek için: --pack-bundle")
+                    bundle = None
+            _bundles[root] = bundle
+        return _bundles[root]
+
+def bundle_stale_reason(bundle):
+    """Klasör paketten sonra değiştiyse nedeni; eşleşiyorsa None.
+
+    Dizindeki görsel listesi ve bayt uzunlukları klasörle karşılaştırılır;
+    paket dosyasından yeni bir görsel de (aynı boyutta düzenleme) eskimiş sayılır.
+    Yalnızca stat bilgisi okunur.
+    """
+    packed_at = os.path.getmtime(bundle.path)
+    expected = {(s['name'], e['name']): e['length']
+                for s in bundle.index['sets'] for e in s['images']}
+    found = {}
+    for name in index_sets(bundle.root, use_bundle=False):
+        with os.scandir(os.path.join(bundle.root, name)) as it:
+            for e in it:
+                if e.is_file() and e.name.lower().endswith(IMAGE_EXTS):
+                    st = e.stat()
+                    if st.st_mtime > packed_at:
+                        return f"{name}/{e.name} paketten yeni"
+                    found[(name, e.name)] = st.st_size
+    if found.keys() != expected.keys():
+        return f"görsel listesi farklı ({len(found)} / {len(expected)})"
+    changed = [k for k in found if found[k] != expected[k]]
+    if changed:
+        return f"{changed[0][0]}/{changed[0][1]} boyutu farklı"
+    return None
+
+def bundle_entry(img_path):
+    """Görsel bir uyaran paketindeyse (paket, dizin kaydı); değilse (None, None).
+
+    Yalnızca STIM_ROOT ve bu süreçte index_sets/list_images/get_bundle ile
+    açılmış uyaran kökleri altındaki yollara bakılır; başka dosyalar için
+    disk yoklanmaz.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.normpath(img_path)))
+    if root != os.path.normpath(STIM_ROOT) and _bundles.get(root) is None:
+        return None, None
+    bundle = get_bundle(root)
+    return (bundle, bundle.entry(img_path)) if bundle is not None else (None, None)
+
+def open_image(img_path):
+    """Image.open'a verilecek kaynak: paketteki görsel ya da dosya yolu"""
+    bundle, entry = bundle_entry(img_path)
+    return bundle.open(entry) if entry is not None else img_path
+
+def _pack_info(img_path):
+    with open(img_path, 'rb') as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        orientation = exif_orientation(img)
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    return {'name': os.path.basename(img_path), 'width': width, 'height': height,
+            'aspect': round(width / height, 6), 'orientation': orientation,
+            'sha1': hashlib.sha1(data).hexdigest(), 'length': len(data)}
+
+def pack_bundle(stim_root, out_path=None, workers=None):
+    """stim_root altındaki tüm setleri tek bir paket dosyasına yazar"""
+    out_path = out_path or os.path.normpath(stim_root) + BUNDLE_EXT
+    sets = []
+    for name in index_sets(stim_root, use_bundle=False):
+        folder = os.path.join(stim_root, name)
+        images = sorted(p for p in glob.glob(os.path.join(folder, '*'))
+                        if p.lower().endswith(IMAGE_EXTS))
+        sets.append((name, images))
+    paths = [p for _, images in sets for p in images]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        infos = dict(zip(paths, pool.map(_pack_info, paths, chunksize=8)))
+    tmp = out_path + '.tmp'
+    index = {'version': 1, 'sets': []}
+    with open(tmp, 'wb') as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, 0, 0))
+        for name, images in sets:
+            entries = []
+            for img_path in images:
+                f.write(b'\0' * (-f.tell() % BUNDLE_ALIGN))
+                entry = dict(infos[img_path], offset=f.tell())
+                with open(img_path, 'rb') as src:
+                    f.write(src.read())
+                entries.append(entry)
+            index['sets'].append({'name': name, 'images': entries})
+        index_offset = f.tell()
+        blob = json.dumps(index, ensure_ascii=False).encode('utf-8')
+        f.write(blob)
+        f.seek(0)
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, index_offset, len(blob)))
+    os.replace(tmp, out_path)
+    print(f"[Paket] {len(sets)} set, {len(paths)} görsel -> {out_path} "
+          f"({os.path.getsize(out_path) / 2**20:.1f} MB, {time.perf_counter() - t0:.1f} sn)")
+    return out_path
+
+
 # ------------------ Yardımcılar ------------------
 def ensure_dir(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
+def set_number(name):
+    """'set07' -> 7; numarasız klasörler için None"""
+    digits = ''.join(ch for ch in os.path.basename(name) if ch.isdigit())
+    return int(digits) if digits else None
+
+def index_sets(stim_root, use_bundle=True):
+    """Havuzdaki set klasörlerinin adlarını tek bir dizin taramasıyla listeler.
+
+    İçerikler okunmaz; görseller yalnızca plana giren setler için
+    list_images() ile çözülür. set2 < set10 olacak şekilde sayıya göre sıralanır.
+    Uyaran paketi varsa adlar paketin dizininden gelir.
+    """
+    bundle = get_bundle(stim_root) if use_bundle else None
+    if bundle is not None:
+        return bundle.set_names()
+    try:
+        with os.scandir(stim_root) as it:
+            names = [e.name for e in it if e.name.startswith('set') and e.is_dir()]
+    except OSError:
+        return []
+    return sorted(names, key=lambda n: (set_number(n) is None, set_number(n) or 0, n))
+
 def list_sets(stim_root):
-    sets = sorted([d for d in glob.glob(os.path.join(stim_root, 'set*')) if os.path.isdir(d)])
-    return sets
+    return [os.path.join(stim_root, n) for n in index_sets(stim_root)]
 
-def list_images(set_folder):
-    exts = ('.jpg', '.jpeg', '.png', '.bmp')
-    imgs = sorted([p for p in glob.glob(os.path.join(set_folder, '*')) if p.lower().endswith(exts)])
-    return imgs[:3]  # İlk 3 görsel
+def list_images(set_folder, limit=None):
+    """Setin görsellerini sıralı döndürür: ilk IMAGES_PER_SET (ya da limit) tanesi; limit=0 hepsi"""
+    bundle = get_bundle(os.path.dirname(os.path.normpath(set_folder)))
+    if bundle is not None:
+        imgs = [os.path.join(set_folder, n) for n in bundle.image_names(os.path.basename(set_folder))]
+    else:
+        imgs = sorted([p for p in glob.glob(os.path.join(set_folder, '*'))
+                       if p.lower().endswith(IMAGE_EXTS)])
+    limit = IMAGES_PER_SET if limit is None else limit
+    return imgs[:limit] if limit else imgs  # İlk N görsel
+
+def exif_orientation(img):
+    """EXIF yön etiketini (1-8) döndürür; yoksa 1"""
+    try:
+        return img.getexif().get(0x0112, 1) or 1
+    except Exception:
+        return 1
 
 def get_image_size(img_path):
-    """Görüntünün orijinal boyutlarını döndürür"""
+    """Görüntünün (EXIF yönü uygulanmış) boyutlarını döndürür"""
+    _, entry = bundle_entry(img_path)
+    if entry is not None:
+        return (entry['width'], entry['height'])  # paket dizininden, dosya okumadan
     try:
         with Image.open(img_path) as img:
-            return img.size  # (width, height)
+            width, height = img.size
+            if exif_orientation(img) in (5, 6, 7, 8):  # 90°/270° döndürülmüş
+                width, height = height, width
+            return (width, height)
     except Exception:
         return None
 
@@ -189,11 +547,203 @@ def calculate_image_size(img_path, max_width=1.6, max_height=0.9):
     
     return (width, height)
 
+def target_pixel_size(img_path, win_px):
+    """Görüntünün pencerede kaplayacağı piksel boyutu (height units -> piksel)"""
+    width, height = calculate_image_size(img_path, max_width=1.6, max_height=0.9)
+    return (max(1, round(width * win_px[1])), max(1, round(height * win_px[1])))
+
+def decode_image(img_path, target_px=None):
+    """Görüntüyü çözer, EXIF yönünü uygular, RGB'ye çevirir ve (verildiyse) küçültür.
+
+    JPEG'lerde draft modu DCT ölçeklemesiyle hedefe yakın boyutta çözer;
+    böylece tam çözünürlüklü çözme ve büyük yeniden örnekleme yapılmaz.
+    """
+    with Image.open(open_image(img_path)) as img:
+        if target_px:
+            draft_px = target_px
+            if exif_orientation(img) in (5, 6, 7, 8):
+                draft_px = (target_px[1], target_px[0])
+            img.draft('RGB', draft_px)
+        img = ImageOps.exif_transpose(img).convert('RGB')
+    if target_px and img.size != target_px:
+        img = img.resize(target_px, Image.LANCZOS)
+    return img
+
+def image_digest(img_path):
+    """Uyaran görselinin SHA-1 özeti: paketteyse dizinden (okumadan), değilse dosyadan"""
+    _, entry = bundle_entry(img_path)
+    return entry['sha1'] if entry is not None else file_digest(img_path)
+
+def file_digest(path):
+    """Dosya içeriğinin SHA-1 özetini döndürür"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def texture_cache_path(img_path, win_px, cache_dir=None):
+    """Kaynak dosya özeti + pencere piksel boyutuna göre önbellek dosya yolu"""
+    cache_dir = cache_dir or CACHE_DIR
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, f"{image_digest(img_path)}_{win_px[0]}x{win_px[1]}.npy")
+
+def load_texture(img_path, win_px, cache_dir=None):
+    """Ekran boyutuna küçültülmüş RGB dokuyu önbellekten yükler; yoksa üretip kaydeder.
+
+    (PIL Image, önbellekten_mi) döndürür. Önbellekteki .npy dosyası ham
+    uint8 (yükseklik, genişlik, 3) dizisidir; yüklemek için JPEG çözülmez.
+    """
+    target_px = target_pixel_size(img_path, win_px)
+    try:
+        cache_path = texture_cache_path(img_path, win_px, cache_dir)
+    except OSError:
+        cache_path = None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            arr = np.load(cache_path)
+            if arr.shape[:2] == (target_px[1], target_px[0]):
+                return Image.fromarray(arr, 'RGB'), True
+        except Exception:
+            pass  # bozuk kayıt -> yeniden üret
+
+    img = decode_image(img_path, target_px)
+    if cache_path:
+        try:
+            tmp = cache_path + f".{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(np.asarray(img, dtype=np.uint8)))
+            os.replace(tmp, cache_path)
+        except Exception:
+            pass
+    return img, False
+
+
+class ImagePrefetcher:
+    """Bir sonraki setin fotoğraflarını arka planda çözüp ekran boyutuna getirir.
+
+    Fotoğraf döngüsü yalnızca hazır pikselleri ImageStim'e bağlar; JPEG çözme
+    Likert ve arkadaşlık ekranları sırasında iş parçacıklarında yapılır.
+    """
+
+    def __init__(self, win_px, workers=PREFETCH_WORKERS):
+        self.win_px = (int(win_px[0]), int(win_px[1]))
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='onyukleme')
+        self._pending = {}  # set klasörü -> [Future, ...]
+
+    def schedule(self, set_folder):
+        """Setin görsellerini çözme kuyruğuna ekler (zaten eklendiyse bir şey yapmaz)"""
+        if set_folder not in self._pending:
+            self._pending[set_folder] = [self.pool.submit(self._load, p)
+                                         for p in list_images(set_folder)]
+
+    def get(self, set_folder):
+        """Setin çözülmüş fotoğraflarını döndürür; hazır değilse bitmesini bekler"""
+        self.schedule(set_folder)
+        photos = []
+        for f in self._pending.pop(set_folder):
+            # Her fotoğraf için yalnızca kendi sonucunu beklerken geçen süre
+            t0 = time.perf_counter()
+            photo = f.result()
+            photo['wait_sec'] = time.perf_counter() - t0
+            photos.append(photo)
+        return photos
+
+    def _load(self, img_path):
+        t0 = time.perf_counter()
+        size = calculate_image_size(img_path, max_width=1.6, max_height=0.9)
+        cached = False
+        try:
+            image, cached = load_texture(img_path, self.win_px)
+        except Exception as e:
+            print(f"[Uyarı] {img_path} çözülemedi: {e}")
+            image = img_path  # ImageStim dosyadan yüklemeyi denesin
+        return {'path': img_path, 'image': image, 'size': size, 'cached': cached,
+                'decode_sec': time.perf_counter() - t0}
+
+    def shutdown(self):
+        self._pending.clear()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TexturePool:
+    """Sabit sayıda uzun ömürlü ImageStim; dokular yerinde değiştirilir.
+
+    Her fotoğraf için yeni ImageStim (ve yeni GL dokusu) oluşturmak yerine
+    en az kullanılan yuva (LRU) yeni görüntüyle yeniden yüklenir. Böylece
+    GPU'daki doku sayısı ve bellek, oturumdaki set sayısından bağımsızdır.
+    """
+
+    def __init__(self, win, slots=TEXTURE_SLOTS):
+        self.win = win
+        self.slots = max(1, int(slots))
+        self._stims = OrderedDict()   # anahtar -> ImageStim (en eski başta)
+        self._bytes = {}              # anahtar -> doku bayt sayısı
+        self.uploads = 0
+        self.evictions = 0
+        self.hits = 0
+        self.peak_bytes = 0
+        self.upload_sec = 0.0
+
+    @staticmethod
+    def _nbytes(image):
+        size = getattr(image, 'size', None)
+        if isinstance(size, tuple) and len(size) == 2:
+            return int(size[0]) * int(size[1]) * 3   # RGB uint8
+        return 0
+
+    def acquire(self, key, image, size):
+        """key'in dokusunu taşıyan ImageStim'i döndürür (gerekirse LRU yuvaya yükler)"""
+        stim = self._stims.get(key)
+        if stim is not None:
+            self._stims.move_to_end(key)
+            self.hits += 1
+            stim.size = size
+            return stim
+        t0 = time.perf_counter()
+        if len(self._stims) < self.slots:
+            stim = visual.ImageStim(self.win, image=image, size=size, units='height')
+        else:
+            old_key, stim = self._stims.popitem(last=False)
+            del self._bytes[old_key]
+            self.evictions += 1
+            stim.image = image    # aynı GL dokusuna yeniden yükleme
+            stim.size = size
+        self.upload_sec += time.perf_counter() - t0
+        self.uploads += 1
+        self._stims[key] = stim
+        self._bytes[key] = self._nbytes(image)
+        self.peak_bytes = max(self.peak_bytes, self.resident_bytes())
+        return stim
+
+    def resident_bytes(self):
+        return sum(self._bytes.values())
+
+    def release(self):
+        """Tüm dokuları GPU'dan açıkça siler"""
+        for stim in self._stims.values():
+            try:
+                stim.clearTextures()
+            except Exception:
+                pass
+        self._stims.clear()
+        self._bytes.clear()
+
+    def stats(self):
+        return {'yuva': self.slots, 'yukleme': self.uploads, 'cikarma': self.evictions,
+                'isabet': self.hits, 'bellek_mb': round(self.resident_bytes() / 2**20, 1),
+                'tepe_mb': round(self.peak_bytes / 2**20, 1),
+                'yukleme_ms': round(self.upload_sec * 1000, 1)}
+
+
 def draw_centered_text(win, text, height=0.06, pos=(0,0)):
-    stim = visual.TextStim(
-        win, text=text, color=TEXT_COLOR, font=FONT_NAME,
-        height=height, wrapWidth=1.6, pos=pos
-    )
+    registry = getattr(win, 'stim_registry', None)
+    if registry is not None:
+        stim = registry.text(text, height=height, pos=pos)
+    else:
+        stim = make_text(win, text, height=height, pos=pos, wrapWidth=1.6)
     stim.draw()
 
 def wait_key(win, key_list):
@@ -221,10 +771,7 @@ def create_likert_buttons(win):
             pos=(x_pos, -0.25), fillColor='gray', lineColor='white',
             lineWidth=2, units='height'
         )
-        label = visual.TextStim(
-            win, text=key, color=TEXT_COLOR, font=FONT_NAME,
-            height=0.04, pos=(x_pos, -0.25), units='height'
-        )
+        label = make_text(win, key, height=0.04, pos=(x_pos, -0.25))
         # Açıklama metnini kısalt - çok uzun metinleri kısalt
         desc_text = LIKERT_LABELS[key]
         # Uzun metinleri iki satıra böl
@@ -238,11 +785,8 @@ def create_likert_buttons(win):
                 mid_char = len(desc_text) // 2
                 desc_text = desc_text[:mid_char] + '\n' + desc_text[mid_char:]
         
-        desc = visual.TextStim(
-            win, text=desc_text, color=TEXT_COLOR, font=FONT_NAME,
-            height=0.02, pos=(x_pos, -0.36), units='height',
-            wrapWidth=button_width * 0.85, alignText='center'
-        )
+        desc = make_text(win, desc_text, height=0.02, pos=(x_pos, -0.36),
+                         wrapWidth=button_width * 0.85, alignText='center')
         buttons.append({
             'key': key,
             'rect': rect,
@@ -275,11 +819,8 @@ def create_yes_no_buttons(win, evet_text='E: Evet', hayir_text='H: Hayır', y_po
         pos=(-button_width/2 - spacing/2, y_pos), fillColor='gray',
         lineColor='white', lineWidth=2, units='height'
     )
-    evet_label = visual.TextStim(
-        win, text=evet_text, color=TEXT_COLOR, font=FONT_NAME,
-        height=text_height, pos=(-button_width/2 - spacing/2, y_pos), 
-        units='height', wrapWidth=button_width * 0.9, alignText='center'
-    )
+    evet_label = make_text(win, evet_text, height=text_height, pos=(-button_width/2 - spacing/2, y_pos),
+                           wrapWidth=button_width * 0.9, alignText='center')
     buttons.append({
         'key': 'e',
         'rect': evet_rect,
@@ -296,11 +837,8 @@ def create_yes_no_buttons(win, evet_text='E: Evet', hayir_text='H: Hayır', y_po
         pos=(button_width/2 + spacing/2, y_pos), fillColor='gray',
         lineColor='white', lineWidth=2, units='height'
     )
-    hayir_label = visual.TextStim(
-        win, text=hayir_text, color=TEXT_COLOR, font=FONT_NAME,
-        height=text_height, pos=(button_width/2 + spacing/2, y_pos), 
-        units='height', wrapWidth=button_width * 0.9, alignText='center'
-    )
+    hayir_label = make_text(win, hayir_text, height=text_height, pos=(button_width/2 + spacing/2, y_pos),
+                            wrapWidth=button_width * 0.9, alignText='center')
     buttons.append({
         'key': 'h',
         'rect': hayir_rect,
@@ -317,7 +855,409 @@ def create_friend_buttons(win):
     """Arkadaşlık sorusu için Evet/Hayır butonları oluşturur"""
     return create_yes_no_buttons(win, 'E: Evet', 'H: Hayır', -0.25)
 
-def wait_key_or_click(win, key_list, buttons, draw_func=None):
+def button_stims(buttons):
+    """Butonların çizim sırasıyla uyaran listesi"""
+    stims = []
+    for btn in buttons:
+        stims += [btn['rect'], btn['label']]
+        if 'desc' in btn:
+            stims.append(btn['desc'])
+    return stims
+
+
+# ------------------ Yazı atlası ------------------
+FONT_ATLAS_DIRNAME = 'yazi_atlasi'
+FONT_ATLAS_WIDTH = 1024       # atlas dokusunun piksel genişliği
+FONT_EXTRA_CHARS = "çğıöşüÇĞİÖŞÜâîûÂÎÛ…–—‘’“”€₺"
+DEFAULT_WRAP_WIDTH = 1.0      # TextStim'in 'height' biriminde wrapWidth verilmediğindeki satır genişliği
+
+_font_path = None
+_font_atlases = {}
+
+def ui_charset():
+    """Atlasa alınan karakterler: ASCII, Türkçe harfler ve arayüz metinlerindeki her karakter"""
+    texts = [CONSENT_TEXT, LIKERT_INSTRUCTION, LIKERT_SCALE_HINT, FRIENDSHIP_QUESTION, PHOTO_HINT,
+             *LIKERT_QUESTIONS, *LIKERT_LABELS.values()]
+    chars = set(map(chr, range(32, 127))) | set(FONT_EXTRA_CHARS) | set(''.join(texts))
+    return ''.join(sorted(chars - {'\n', '\r', '\t'}))
+
+def glyph_px(height, win_px):
+    """height units metin yüksekliğinin piksel karşılığı (yazı tipi em boyutu)"""
+    return max(1, round(height * win_px[1]))
+
+def find_font_file():
+    """FONT_NAME'in TrueType dosyası (PIL'in sistem yazı tipi klasörü aramasıyla); yoksa None"""
+    global _font_path
+    if _font_path is None:
+        from PIL import ImageFont
+        _font_path = ''
+        for name in FONT_FILES:
+            try:
+                _font_path = ImageFont.truetype(name, 12).path
+                break
+            except OSError:
+                continue
+    return _font_path or None
+
+def font_atlas_name(font_path, win_px):
+    """Atlas dosya adı: yazı tipi dosyasının özeti + pencere çözünürlüğü"""
+    with open(font_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:12]
+    return f"atlas_{digest}_{int(win_px[0])}x{int(win_px[1])}.npz"
+
+def font_atlas_dirs():
+    """Atlasın arandığı klasörler: uygulamayla gelen, sonra kullanıcı önbelleği"""
+    dirs = [resource_path(FONT_ATLAS_DIRNAME)]
+    if CACHE_DIR:
+        dirs.append(os.path.join(os.path.dirname(CACHE_DIR), FONT_ATLAS_DIRNAME))
+    return dirs
+
+def build_font_atlas(win_px, out_dir=None, heights=TEXT_HEIGHTS):
+    """FONT_NAME'i her metin yüksekliğinde bir kez rasterize edip atlas dosyasına yazar.
+
+    Her piksel boyutu için glifler FONT_ATLAS_WIDTH genişliğinde raflara
+    dizilir; dosyada alfa dokusu, glif tablosu (kod noktası, atlas x/y/g/y,
+    çizim ofseti, ilerleme) ve satır metrikleri bulunur.
+    """
+    from PIL import ImageFont, ImageDraw
+    font_path = find_font_file()
+    if font_path is None:
+        print(f"[Uyarı] {FONT_NAME} yazı tipi dosyası bulunamadı ({', '.join(FONT_FILES)})")
+        return None
+    if out_dir is None:
+        out_dir = font_atlas_dirs()[-1 if getattr(sys, 'frozen', False) else 0]
+    ensure_dir(out_dir)
+    chars = ui_charset()
+    t0 = time.perf_counter()
+    arrays, sizes = {}, sorted({glyph_px(h, win_px) for h in heights})
+    for px in sizes:
+        font = ImageFont.truetype(font_path, px)
+        glyphs, x, y, row_h = [], 0, 0, 0
+        for ch in chars:
+            left, top, right, bottom = font.getbbox(ch)
+            w, h = max(0, right - left), max(0, bottom - top)
+            if x + w > FONT_ATLAS_WIDTH:
+                x, y, row_h = 0, y + row_h + 1, 0
+            glyphs.append([ord(ch), x, y, w, h, left, top, font.getlength(ch)])
+            x, row_h = x + w + 1, max(row_h, h)
+        atlas = Image.new('L', (FONT_ATLAS_WIDTH, y + row_h + 1))
+        draw = ImageDraw.Draw(atlas)
+        for code, gx, gy, w, h, left, top, _ in glyphs:
+            if w and h:
+                draw.text((gx - left, gy - top), chr(code), font=font, fill=255)
+        arrays[f'alfa_{px}'] = np.asarray(atlas)
+        arrays[f'glif_{px}'] = np.array(glyphs, dtype=np.float32)
+        arrays[f'metrik_{px}'] = np.array(font.getmetrics(), dtype=np.float32)
+    info = {'yazi_tipi': FONT_NAME, 'dosya': os.path.basename(font_path),
+            'pencere': [int(win_px[0]), int(win_px[1])], 'boyutlar': sizes, 'karakter': len(chars)}
+    arrays['bilgi'] = np.array(json.dumps(info, ensure_ascii=False))
+    path = os.path.join(out_dir, font_atlas_name(font_path, win_px))
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, path)
+    print(f"[Yazı atlası] {FONT_NAME} ({os.path.basename(font_path)}), {len(chars)} karakter, "
+          f"boyutlar {sizes} px -> {path} ({time.perf_counter() - t0:.1f} sn)")
+    return path
+
+class FontAtlas:
+    """Diskteki yazı atlası: piksel boyutu -> (alfa dokusu, glif tablosu, ascent/descent)"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.info = json.loads(str(data['bilgi']))
+            self.sizes = {}
+            for px in self.info['boyutlar']:
+                glyphs = {chr(int(g[0])): (int(g[1]), int(g[2]), int(g[3]), int(g[4]),
+                                           int(g[5]), int(g[6]), float(g[7]))
+                          for g in data[f'glif_{px}']}
+                ascent, descent = data[f'metrik_{px}']
+                self.sizes[px] = (data[f'alfa_{px}'], glyphs, int(ascent), int(descent))
+
+    def covers(self, text, px):
+        size = self.sizes.get(px)
+        return size is not None and all(ch in size[1] for ch in text if ch != '\n')
+
+    def _wrap(self, text, glyphs, wrap_px):
+        """TextStim gibi: \\n'de ve satır genişliğini aşan kelimelerden önce satır kırar"""
+        measure = lambda s: sum(glyphs[ch][6] for ch in s)
+        lines = []
+        for para in text.split('\n'):
+            line = ''
+            for word in para.split(' '):
+                candidate = f"{line} {word}" if line else word
+                if line and measure(candidate) > wrap_px:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return [(line, measure(line)) for line in lines]
+
+    def render(self, text, px, wrap_px, align='center'):
+        """Metni tek bir alfa dizisine dizer (yükseklik, genişlik) uint8"""
+        alpha, glyphs, ascent, descent = self.sizes[px]
+        lines = self._wrap(text, glyphs, wrap_px)
+        pad = max(2, px // 4)   # negatif yan boşluklu glifler (j, ı ...) kırpılmasın
+        line_h = ascent + descent
+        width = int(np.ceil(max(w for _, w in lines))) + 2 * pad
+        canvas = np.zeros((len(lines) * line_h + 2 * pad, width), dtype=np.uint8)
+        for i, (line, line_w) in enumerate(lines):
+            pen = pad + {'left': 0, 'right': width - 2 * pad - line_w}.get(align, (width - 2 * pad - line_w) / 2)
+            top = pad + i * line_h
+            for ch in line:
+                gx, gy, w, h, left, gtop, advance = glyphs[ch]
+                x0, y0 = int(round(pen)) + left, top + gtop
+                x1, y1 = min(x0 + w, width), min(y0 + h, len(canvas))
+                cx, cy = max(0, -x0), max(0, -y0)
+                if x1 > x0 + cx and y1 > y0 + cy:
+                    dst = canvas[y0 + cy:y1, x0 + cx:x1]
+                    np.maximum(dst, alpha[gy + cy:gy + cy + dst.shape[0], gx + cx:gx + cx + dst.shape[1]], out=dst)
+                pen += advance
+        return canvas
+
+def get_font_atlas(win_px):
+    """Yazı tipi dosyasına ve pencere çözünürlüğüne uyan atlas (bir kez yüklenir); yoksa None"""
+    win_px = (int(win_px[0]), int(win_px[1]))
+    if win_px not in _font_atlases:
+        atlas = None
+        font_path = find_font_file()
+        if font_path:
+            name = font_atlas_name(font_path, win_px)
+            for folder in font_atlas_dirs():
+                path = os.path.join(folder, name)
+                if os.path.exists(path):
+                    try:
+                        atlas = FontAtlas(path)
+                        break
+                    except Exception as e:
+                        print(f"[Uyarı] Yazı atlası okunamadı: {path} ({e})")
+        _font_atlases[win_px] = atlas
+    return _font_atlases[win_px]
+
+class AtlasText:
+    """Atlas gliflerinden tek dokuya dizilmiş metin; TextStim gibi draw() ile çizilir"""
+
+    def __init__(self, win, atlas, text, height=0.06, pos=(0, 0), wrapWidth=None, alignText='center'):
+        from PIL import ImageColor
+        win_h = int(win.size[1])
+        alpha = atlas.render(text, glyph_px(height, win.size),
+                             (wrapWidth or DEFAULT_WRAP_WIDTH) * win_h, alignText)
+        rgba = np.empty(alpha.shape + (4,), dtype=np.uint8)
+        rgba[..., :3] = ImageColor.getrgb(TEXT_COLOR)[:3]
+        rgba[..., 3] = alpha
+        self.text = text
+        self.stim = visual.ImageStim(win, image=Image.fromarray(rgba, 'RGBA'), pos=pos,
+                                     size=(alpha.shape[1] / win_h, alpha.shape[0] / win_h),
+                                     units='height', interpolate=False)
+
+    def draw(self):
+        self.stim.draw()
+
+def make_text(win, text, height=0.06, pos=(0, 0), wrapWidth=None, alignText='center'):
+    """Metin uyaranı: atlas metni kapsıyorsa AtlasText, yoksa TextStim (çalışma anında rasterize)"""
+    atlas = get_font_atlas(win.size) if FONT_ATLAS else None
+    if atlas is not None and atlas.covers(text, glyph_px(height, win.size)):
+        return AtlasText(win, atlas, text, height, pos, wrapWidth, alignText)
+    return visual.TextStim(win, text=text, color=TEXT_COLOR, font=FONT_NAME, height=height,
+                           pos=pos, units='height', wrapWidth=wrapWidth, alignText=alignText)
+
+
+# ------------------ Uyaran kayıt defteri ------------------
+LIKERT_SCREEN_RECT = (-0.85, 0.35, 0.85, -0.42)   # height units: sol, üst, sağ, alt
+FRIEND_SCREEN_RECT = (-0.85, 0.20, 0.85, -0.35)
+
+class StimRegistry:
+    """Oturum boyunca metin, buton ve hazır ekranları bir kez oluşturup saklar.
+
+    Anahtar metin + stil (ya da ekran adı) olur; aynı anahtar tekrar istendiğinde
+    önceden oluşturulmuş nesne döner. Hazır ekranlar BufferImageStim olarak
+    tek dokuya çizilir ve sonraki çizimler tek bir blit olur.
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self._stims = {}
+        self.hits = 0
+        self.misses = 0
+        self.build_sec = 0.0
+        win.stim_registry = self  # draw_centered_text buradan okur
+
+    def get(self, key, factory):
+        stim = self._stims.get(key)
+        if stim is None:
+            t0 = time.perf_counter()
+            stim = self._stims[key] = factory()
+            self.build_sec += time.perf_counter() - t0
+            self.misses += 1
+        else:
+            self.hits += 1
+        return stim
+
+    def text(self, text, height=0.06, pos=(0, 0), wrapWidth=1.6):
+        key = ('text', text, height, tuple(pos), wrapWidth)
+        return self.get(key, lambda: make_text(self.win, text, height=height, pos=pos,
+                                               wrapWidth=wrapWidth))
+
+    def buttons(self, name, factory):
+        return self.get(('buttons', name), factory)
+
+    def screen(self, name, stims_factory, rect=None):
+        """Uyaranları arka tampona çizip tek dokuya alır (rect: height units)"""
+        def build():
+            kwargs = {}
+            if rect is not None:
+                kwargs = self._norm_rect(rect)
+            return visual.BufferImageStim(self.win, stim=stims_factory(), **kwargs)
+        return self.get(('screen', name), build)
+
+    def _norm_rect(self, rect):
+        """height units dikdörtgeni BufferImageStim'in norm rect + piksel pos'una çevirir.
+
+        Kenarlar tam piksele yuvarlanır; aksi halde Window._getFrame kenarları
+        int() ile keser ve doku, pos'a göre yarım piksel kayabilir (ekran
+        bulanık ya da bir piksel kaymış çizilir). Geri çevrilen norm değerleri
+        piksel ortasını gösterir, böylece kayan nokta hatası int()'te aşağı
+        yuvarlanıp bir piksel kaybettirmez.
+        """
+        w, h = self.win.size
+        half_aspect = (w / h) / 2
+        left, top, right, bottom = rect
+        clamp = lambda v: max(-1.0, min(1.0, v))
+        # norm -> pencere pikseli (sol/alt kenar 0), tam sayıya yuvarla, geri norm
+        px = lambda v, size: round((clamp(v) + 1) / 2 * size)
+        pl, pr = px(left / half_aspect, w), px(right / half_aspect, w)
+        pt, pb = px(top * 2, h), px(bottom * 2, h)
+        norm = lambda p, size: (p + 0.5) / size * 2 - 1
+        pos = ((pl + pr) / 2 - w / 2, (pt + pb) / 2 - h / 2)
+        return {'rect': (norm(pl, w), norm(pt, h), norm(pr, w), norm(pb, h)), 'pos': pos}
+
+    def stats(self):
+        return {'nesne': len(self._stims), 'isabet': self.hits,
+                'olusturma': self.misses, 'olusturma_ms': round(self.build_sec * 1000, 1)}
+
+
+def get_consent_buttons(registry):
+    return registry.buttons('consent', lambda: create_yes_no_buttons(
+        registry.win, 'E: Onaylıyorum', 'H: Onaylamıyorum', -0.35))
+
+def get_likert_buttons(registry):
+    return registry.buttons('likert', lambda: create_likert_buttons(registry.win))
+
+def get_friend_buttons(registry):
+    return registry.buttons('friend', lambda: create_friend_buttons(registry.win))
+
+def get_consent_screen(registry):
+    return registry.screen('consent', lambda: (
+        [registry.text(CONSENT_TEXT, height=0.025, pos=(0, 0.1))]
+        + button_stims(get_consent_buttons(registry))
+    ))
+
+def get_likert_screen(registry, qi, qtext):
+    return registry.screen(('likert', qi), lambda: (
+        [registry.text(f"Soru {qi}/10\n\n{qtext}", height=0.05, pos=(0, 0.1)),
+         registry.text(LIKERT_INSTRUCTION, height=0.035, pos=(0, -0.05)),
+         registry.text(LIKERT_SCALE_HINT, height=0.03, pos=(0, -0.12))]
+        + button_stims(get_likert_buttons(registry))
+    ), rect=LIKERT_SCREEN_RECT)
+
+def get_friend_screen(registry):
+    return registry.screen('friend', lambda: (
+        [registry.text(FRIENDSHIP_QUESTION, height=0.05, pos=(0, 0.05))]
+        + button_stims(get_friend_buttons(registry))
+    ), rect=FRIEND_SCREEN_RECT)
+
+def get_photo_hint(registry):
+    return registry.get(('text', PHOTO_HINT), lambda: make_text(
+        registry.win, PHOTO_HINT, height=0.03, pos=(0, -0.45)))
+
+def warm_up_stimuli(registry):
+    """Oturumda kullanılacak tüm ekranları deney başlamadan önce hazırlar"""
+    get_consent_screen(registry)
+    for qi, qtext in enumerate(LIKERT_QUESTIONS, start=1):
+        get_likert_screen(registry, qi, qtext)
+    get_friend_screen(registry)
+    get_photo_hint(registry)
+    registry.text("Onay verilmedi. Deney sonlandırılıyor.", height=0.05)
+    registry.text("Teşekkür ederiz.\n\nDeney tamamlandı.", height=0.06)
+
+
+def hit_button(buttons, pos):
+    """Fare konumunun üstünde olduğu butonun tuşunu döndürür; yoksa None"""
+    for btn in buttons:
+        btn_x = btn['x']
+        btn_y = btn.get('y', -0.25)  # Varsayılan y pozisyonu
+        # Buton sınırlarını kontrol et (height units kullanıyoruz)
+        if (btn_x - btn['width']/2 <= pos[0] <= btn_x + btn['width']/2 and
+                btn_y - btn['height']/2 <= pos[1] <= btn_y + btn['height']/2):
+            return btn['key']
+    return None
+
+
+class ResponseEngine:
+    """Klavye ve fare yanıtlarını uyaranın göründüğü flip'e göre zamanlar.
+
+    Klavye psychopy.hardware.keyboard ile okunur (psychtoolbox kuruluysa arka
+    plan kuyruğu ve donanım zaman damgası). Fare basışları pencere olay
+    işleyicisinde damgalanır; tıklama bırakıldığında konum butonlarla
+    karşılaştırılır. Her iki saat de win.callOnFlip ile ekranın göründüğü flip
+    anında sıfırlanır, bu yüzden bekleme döngüsünün uyku aralığı RT'ye girmez.
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self.kb = keyboard.Keyboard()
+        self.mouse = event.Mouse(win=win)
+        self._press_rt = None
+        self._held = False
+        win.response_engine = self
+
+    def arm(self):
+        """Bir sonraki win.flip()'i uyaran başlangıcı yapar (flip'ten önce çağrılır)"""
+        self.kb.clearEvents()
+        self._press_rt = None
+        self._held = bool(self.mouse.getPressed()[0])  # önceki ekrandan basılı kalan tık
+        self.win.callOnFlip(self._on_flip)
+
+    def _on_flip(self):
+        self.kb.clock.reset()
+        self.mouse.clickReset()
+
+    def poll(self, key_list, hit_test=None):
+        """Bekleyen yanıt varsa (tuş, rt) döndürür; yoksa None.
+
+        hit_test: fare konumunu alıp yanıt tuşunu (ya da None) döndüren fonksiyon
+        """
+        for k in self.kb.getKeys(keyList=key_list + [EXIT_KEY], waitRelease=False):
+            if k.name == EXIT_KEY:
+                safe_exit(self.win)
+            if k.name in key_list:
+                return k.name, k.rt
+
+        pressed, times = self.mouse.getPressed(getTime=True)
+        if pressed[0]:
+            if self._press_rt is None and not self._held:
+                self._press_rt = times[0]  # basış anı (onset flip'ine göre)
+        else:
+            self._held = False
+            if self._press_rt is not None:
+                # Tıklama bırakıldı (basılı tutma durumunu önlemek için) -> isabet testi
+                rt, self._press_rt = self._press_rt, None
+                key = hit_test(self.mouse.getPos()) if hit_test else None
+                if key is not None:
+                    return key, rt
+        return None
+
+    def wait(self, key_list, hit_test=None):
+        """Geçerli bir yanıt gelene kadar düşük CPU ile bekler"""
+        while True:
+            resp = self.poll(key_list, hit_test)
+            if resp is not None:
+                return resp
+            core.wait(RESPONSE_POLL_SEC, hogCPUperiod=0)
+
+
+def wait_key_or_click(win, key_list, buttons, draw_func=None, screen=None):
     """Hem klavye hem de buton tıklamalarını bekler
     
     Args:
@@ -325,55 +1265,1076 @@ def wait_key_or_click(win, key_list, buttons, draw_func=None):
         key_list: Geçerli klavye tuşları listesi
         buttons: Buton listesi
         draw_func: Opsiyonel, ekranı çizmek için fonksiyon (soru metni vs. için)
+        screen: Opsiyonel, butonlar dahil önceden çizilmiş ekran (draw_func yerine)
+
+    Returns:
+        (tuş, rt): rt ekranın göründüğü flip'ten itibaren saniye
     """
-    mouse = event.Mouse(win=win)
-    timer = core.Clock()
-    start_time = timer.getTime()
+    responses = getattr(win, 'response_engine', None) or ResponseEngine(win)
     
     # İlk ekranı çiz
-    if draw_func:
-        draw_func()
-    for btn in buttons:
-        btn['rect'].draw()
-        btn['label'].draw()
-        if 'desc' in btn:
-            btn['desc'].draw()
+    if screen is not None:
+        screen.draw()
+    else:
+        if draw_func:
+            draw_func()
+        for stim in button_stims(buttons):
+            stim.draw()
+    responses.arm()
     win.flip()
-    
-    while True:
-        # Klavye kontrolü
-        keys = event.getKeys(keyList=key_list + [EXIT_KEY], timeStamped=True)
-        for k, t in keys:
-            if k == EXIT_KEY:
-                safe_exit(win)
-            if k in key_list:
-                return k, t
-        
-        # Mouse kontrolü - tıklama olayını kontrol et
-        mouse_clicked = mouse.getPressed()[0]
-        if mouse_clicked:
-            # Tıklama bırakılana kadar bekle (basılı tutma durumunu önlemek için)
-            while mouse.getPressed()[0]:
-                core.wait(0.01)
-            mouse_pos = mouse.getPos()
-            for btn in buttons:
-                btn_x = btn['x']
-                btn_y = btn.get('y', -0.25)  # Varsayılan y pozisyonu
-                btn_width = btn['width']
-                btn_height = btn['height']
-                # Buton sınırlarını kontrol et (height units kullanıyoruz)
-                if (btn_x - btn_width/2 <= mouse_pos[0] <= btn_x + btn_width/2 and
-                    btn_y - btn_height/2 <= mouse_pos[1] <= btn_y + btn_height/2):
-                    rt = timer.getTime() - start_time
-                    return btn['key'], rt
-        
-        core.wait(0.01)  # CPU kullanımını azalt
+
+    return responses.wait(key_list, hit_test=lambda pos: hit_button(buttons, pos))
+
+
+# ------------------ Doku önbelleği ------------------
+def get_screen_size():
+    """Birincil ekranın piksel boyutu (tam ekran pencere bu boyutta açılır)"""
+    try:
+        import pyglet
+        screen = pyglet.canvas.get_display().get_default_screen()
+        return (screen.width, screen.height)
+    except Exception:
+        return (1920, 1080)
+
+def _cache_one(img_path, win_px, cache_dir):
+    t0 = time.perf_counter()
+    try:
+        _, cached = load_texture(img_path, win_px, cache_dir)
+        return img_path, cached, time.perf_counter() - t0, None
+    except Exception as e:
+        return img_path, False, time.perf_counter() - t0, str(e)
+
+def build_cache(win_px, stim_root=None, workers=None):
+    """Tüm setlerin dokularını işlemci çekirdeklerine dağıtarak önbelleğe yazar"""
+    stim_root = stim_root or STIM_ROOT
+    paths = [p for s in list_sets(stim_root) for p in list_images(s)]
+    print(f"[Önbellek] {len(paths)} görsel, pencere {win_px[0]}x{win_px[1]}, klasör: {CACHE_DIR}")
+    t0 = time.perf_counter()
+    built = hits = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=get_bundle,
+                             initargs=(stim_root,)) as pool:
+        for img_path, cached, sec, err in pool.map(_cache_one, paths, [win_px] * len(paths),
+                                                   [CACHE_DIR] * len(paths), chunksize=4):
+            if err:
+                print(f"[Uyarı] {img_path}: {err}")
+            elif cached:
+                hits += 1
+            else:
+                built += 1
+    print(f"[Önbellek] {built} yeni, {hits} zaten hazır, "
+          f"süre {time.perf_counter() - t0:.1f} sn")
+    return built, hits
+
+
+# ------------------ Deneme planı ------------------
+def williams_row(n, row):
+    """n koşullu dengelenmiş Latin karesinin (Williams) row. satırı.
+
+    Her set her sırada ve her setin hemen ardından her set eşit sıklıkta
+    gelir; n tekse kare 2n satırdır (ikinci yarı ters sıralı).
+    """
+    base, lo, hi = [0], 1, n - 1
+    while len(base) < n:
+        base.append(lo)
+        lo += 1
+        if len(base) < n:
+            base.append(hi)
+            hi -= 1
+    seq = [(b + row) % n for b in base]
+    if n % 2 and (row // n) % 2:
+        seq.reverse()
+    return seq
+
+
+class TrialPlan:
+    """Katılımcıya gösterilecek setlerin sırası ve yeniden üretim bilgisi.
+
+    'sirali': havuzun ilk N seti, herkese aynı sırayla.
+    'rastgele': tohumla havuzdan N set çekilir ve karıştırılır.
+    'latin': havuz N'lik bloklara bölünür; oturum numarası bloğu ve bloğun
+    içindeki sırayı (Williams karesi satırı) belirler.
+    """
+
+    def __init__(self, stim_root, names, mode, seed):
+        self.stim_root = stim_root
+        self.names = names          # plandaki set klasör adları, gösterim sırasıyla
+        self.mode = mode
+        self.seed = seed            # rastgele: tohum, latin: oturum numarası
+        self.pool_size = 0
+        self.block = self.row = None   # latin: havuz bloğu ve Williams karesi satırı
+
+    @classmethod
+    def create(cls, stim_root, n_sets=None, mode=None, seed=None, session_no=0):
+        n_sets = SETS_PER_SESSION if n_sets is None else n_sets
+        mode = mode or PLAN_MODE
+        pool = index_sets(stim_root)
+        n = min(n_sets, len(pool))
+        if mode == 'rastgele':
+            if seed is None:
+                seed = random.SystemRandom().randrange(2**31)
+            names = random.Random(seed).sample(pool, n)
+        elif mode == 'latin' and n:
+            seed = session_no if seed is None else seed
+            blocks = len(pool) // n
+            block = pool[(seed % blocks) * n:(seed % blocks + 1) * n]
+            names = [block[i] for i in williams_row(n, seed // blocks)]
+        else:
+            mode, names = 'sirali', pool[:n]
+        plan = cls(stim_root, names, mode, seed)
+        plan.pool_size = len(pool)
+        if mode == 'latin':
+            plan.block, plan.row = seed % blocks, (seed // blocks) % (2 * n if n % 2 else n)
+        return plan
+
+    def __len__(self):
+        return len(self.names)
+
+    def folder(self, i):
+        return os.path.join(self.stim_root, self.names[i])
+
+    def target(self, i):
+        """Sonuçlara yazılan hedef numarası: klasör numarası (yoksa havuzdaki sıra)"""
+        num = set_number(self.names[i])
+        return num if num is not None else i + 1
+
+    def rows(self, participant, timestamp):
+        """Planı sonuç satırları olarak döndürür (phase='plan')"""
+        info = f"tohum={self.seed} havuz={self.pool_size} görsel={IMAGES_PER_SET}"
+        if self.row is not None:
+            info += f" blok={self.block} satir={self.row}"
+        rows = [[participant, timestamp, "plan", "", 0, "Plan", self.mode, info, ""]]
+        for i, name in enumerate(self.names):
+            rows.append([participant, timestamp, "plan", self.target(i), i + 1, name, "", "", ""])
+        return rows
+
+
+def session_count(data_dir):
+    """Bu istasyonda daha önce başlatılmış oturum sayısı (sonuç CSV'lerinden)"""
+    try:
+        return sum(1 for n in os.listdir(data_dir) if n.endswith('_sonuclar.csv'))
+    except OSError:
+        return 0
+
+def read_session_counter(data_dir):
+    """İstasyonun kayıtlı oturum sayacı; dosya yoksa önceki sonuç CSV'lerinin
+    sayısı (ilk kullanım), okunamazsa None"""
+    try:
+        with open(os.path.join(data_dir, SESSION_COUNTER), encoding='utf-8') as f:
+            return int(json.load(f).get('sayac', 0))
+    except FileNotFoundError:
+        return session_count(data_dir)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def session_offset(station=None):
+    """İstasyon kimliğinin özetinden türeyen sabit başlangıç (paralel istasyonlar ayrışır)"""
+    station = STATION_ID if station is None else station
+    return zlib.crc32(station.encode('utf-8')) % 997
+
+def next_session_no(data_dir, station=None):
+    """Latin karesi satırını belirleyen oturum numarası (yan etkisi yoktur).
+
+    --session / DENEY_OTURUM verilmişse o kullanılır (laboratuvar genelinde
+    tam dengeleme için). Yoksa istasyonun sabit başlangıcı ile oturum sayacı
+    toplanır; böylece paralel istasyonlar aynı sırayı yürümez. Sayaç ancak
+    onam verilip oturum gerçekten başladığında save_session_counter() ile
+    ilerler; iptal edilen ya da onam verilmeyen başlangıçlar satır harcamaz.
+    Sayaç okunamazsa rastgele bir numara seçilir.
+    """
+    if SESSION_NO is not None:
+        return SESSION_NO
+    count = read_session_counter(data_dir)
+    if count is None:
+        print("[Uyarı] Oturum sayacı okunamadı; rastgele plan satırı seçildi")
+        return random.SystemRandom().randrange(2**31)
+    return session_offset(station) + count
+
+def save_session_counter(data_dir, session_no, station=None):
+    """Onam verilen oturumdan sonra sayacı ilerletir (yalnızca latin planı ve otomatik numarada).
+
+    Sayaç dosyada tutulur, CSV'ler taşınsa da geri gitmez.
+    """
+    if SESSION_NO is not None or PLAN_MODE != 'latin' or read_session_counter(data_dir) is None:
+        return
+    station = STATION_ID if station is None else station
+    path = os.path.join(data_dir, SESSION_COUNTER)
+    try:
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'istasyon': station, 'sayac': session_no - session_offset(station) + 1}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[Uyarı] Oturum sayacı yazılamadı: {e}")
+
+
+# ------------------ Sonuç yazıcı ------------------
+RESULT_HEADER = ["participant","timestamp","phase",
+                 "set_index","item_index","item_text",
+                 "response_key","response_label","rt_sec"]
+RESULT_DB = 'sonuclar.sqlite'   # sqlite biçimi: tüm oturumlar veri klasöründe tek veritabanında
+
+class _FileSink:
+    """Oturum boyunca açık kalan tek sonuç dosyası; alt sınıflar start() ve write() ile biçimi belirler"""
+    suffix = ''
+    newline = None
+    encoding = 'utf-8'
+
+    def __init__(self, base_path):
+        self.path = base_path + self.suffix
+        self.f = open(self.path, 'w', newline=self.newline, encoding=self.encoding)
+        self.start()
+        self.f.flush()
+
+    def start(self):
+        """Dosya açıldığında bir kez yazılan başlık (varsayılan: yok)"""
+
+    def flush(self, fsync=False):
+        self.f.flush()
+        if fsync:
+            os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+
+class CsvSink(_FileSink):
+    """Mevcut {oturum}_sonuclar.csv düzeni; dosya oturum boyunca açık kalır"""
+    suffix = '_sonuclar.csv'
+    newline = ''
+    encoding = 'utf-8-sig'
+
+    def start(self):
+        self.w = csv.writer(self.f)
+        self.w.writerow(RESULT_HEADER)
+
+    def write(self, rows):
+        self.w.writerows(rows)
+
+
+class JsonlSink(_FileSink):
+    """Satır başına bir JSON nesnesi (sütun adı -> metin)"""
+    suffix = '_sonuclar.jsonl'
+
+    def write(self, rows):
+        self.f.write(''.join(json.dumps(dict(zip(RESULT_HEADER, map(str, row))),
+                                        ensure_ascii=False) + '\n' for row in rows))
+
+
+class SqliteSink:
+    """Veri klasöründe ortak SQLite (WAL) veritabanı; her boşaltma tek işlem.
+
+    WAL kipinde başka süreçler (puanlama, izleme) oturum sürerken okuyabilir.
+    """
+
+    def __init__(self, base_path):
+        self.path = os.path.join(os.path.dirname(base_path), RESULT_DB)
+        self.session = os.path.basename(base_path)
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute(f"PRAGMA synchronous={'FULL' if RESULT_FSYNC else 'NORMAL'}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS sonuclar (session TEXT NOT NULL, seq INTEGER NOT NULL, "
+            + ', '.join(f'{c} TEXT' for c in RESULT_HEADER)
+            + ", PRIMARY KEY (session, seq))")
+        self.db.commit()
+        self.seq = 0
+        self.sql = f"INSERT OR REPLACE INTO sonuclar VALUES ({', '.join('?' * (len(RESULT_HEADER) + 2))})"
+
+    def write(self, rows):
+        values = []
+        for row in rows:
+            self.seq += 1
+            values.append((self.session, self.seq, *map(str, row)))
+        self.db.executemany(self.sql, values)   # işlem flush()'ta kapanır
+
+    def flush(self, fsync=False):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+RESULT_SINKS = {'csv': CsvSink, 'jsonl': JsonlSink, 'sqlite': SqliteSink}
+
+
+class ResultWriter:
+    """Sonuç satırlarını arka plan iş parçacığında seçili biçimlere yazar.
+
+    write() yalnızca kuyruğa ekler; sunum iş parçacığı diske dokunmaz. Dosya
+    tanıtıcıları oturum boyunca açık kalır. Kuyrukta biriken satırlar tek
+    seferde yazılır; RESULT_FLUSH_SEC ve RESULT_FSYNC boşaltma politikasını
+    belirler. on_written(satırlar) boşaltmadan sonra çağrılır (toplayıcı gibi
+    diskteki kayda güvenen tüketiciler için).
+    """
+
+    def __init__(self, base_path, formats=None, flush_sec=None, fsync=None, on_written=None):
+        self.flush_sec = RESULT_FLUSH_SEC if flush_sec is None else flush_sec
+        self.fsync = RESULT_FSYNC if fsync is None else fsync
+        self.on_written = on_written
+        self.sinks = [RESULT_SINKS[name](base_path) for name in (formats or RESULT_FORMATS)]
+        self.queue = queue.Queue()
+        self.rows = 0
+        self.batches = 0
+        self.flushes = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.write_sec = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='sonuc_yazici', daemon=True)
+        self._thread.start()
+
+    def write(self, rows):
+        rows = [list(r) for r in rows]
+        self.rows += len(rows)
+        self.queue.put(rows)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def close(self):
+        """Kuyruktaki her şeyi yazıp dosyaları kapatır (birden çok çağrılabilir)"""
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        pending = []      # yazılmış ama henüz boşaltılmamış satırlar
+        last_flush = time.monotonic()
+        stop = False
+        while not stop:
+            timeout = None
+            if pending and self.flush_sec > 0:
+                timeout = max(0.0, last_flush + self.flush_sec - time.monotonic())
+            try:
+                items = [self.queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            try:
+                while True:
+                    items.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            batch = []
+            for item in items:
+                if item is None:
+                    stop = True
+                else:
+                    batch.extend(item)
+            t0 = time.perf_counter()
+            if batch:
+                self._each('write', batch)
+                self.batches += 1
+                pending.extend(batch)
+            if pending and (stop or self.flush_sec <= 0
+                            or time.monotonic() - last_flush >= self.flush_sec):
+                self._each('flush', self.fsync)
+                self.flushes += 1
+                last_flush = time.monotonic()
+                if self.on_written is not None:
+                    self.on_written(pending)
+                pending = []
+            self.write_sec += time.perf_counter() - t0
+        self._each('close')
+
+    def _each(self, method, *args):
+        for sink in self.sinks:
+            try:
+                getattr(sink, method)(*args)
+            except Exception as e:
+                self.errors += 1
+                print(f"[Uyarı] Sonuç yazılamadı ({type(sink).__name__}.{method}): {e}")
+
+    def stats(self):
+        return {'bicim': [type(s).__name__ for s in self.sinks], 'satir': self.rows,
+                'toplu': self.batches, 'bosaltma': self.flushes, 'hata': self.errors,
+                'en_fazla_kuyruk': self.max_depth, 'yazma_ms': round(self.write_sec * 1000, 1)}
+
+
+# ------------------ Toplayıcıya gönderim ------------------
+UPLOAD_STATE_EXT = '.gonderim'   # sonuç CSV'sinin yanında: toplayıcının onayladığı satır sayısı
+
+def read_result_rows(results_csv, start=0):
+    """CSV'deki veri satırlarını (başlık hariç) start'tan itibaren (sıra_no, satır) olarak döndürür"""
+    with open(results_csv, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [(i, row) for i, row in enumerate(reader, start=1) if i > start and row]
+
+
+class ResultUploader:
+    """Sonuç satırlarını arka planda toplayıcıya toplu halde gönderir.
+
+    put() hiçbir zaman beklemez: satır sınırlı bir kuyruğa konur, kuyruk
+    doluysa atlanır. Gönderim iş parçacığı tek ve kalıcı bir HTTP/1.1
+    bağlantısı kullanır. Yerel CSV asıl kayıttır: bağlantı koparsa ya da
+    kuyruk taşarsa onaylanmamış satırlar yeniden bağlanınca CSV'den okunup
+    tekrar gönderilir. Toplayıcı (istasyon, oturum, sıra_no) ile tekrarları ayıklar.
+    """
+
+    def __init__(self, url, station, results_csv, acked=0, resume=False):
+        parts = urlsplit(url if '://' in url else 'http://' + url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = (parts.path.rstrip('/') or '') + '/satirlar'
+        self.station = station
+        self.results_csv = results_csv
+        self.session = os.path.basename(results_csv).replace('_sonuclar.csv', '')
+        self.queue = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        self.seq = acked          # kuyruğa konan son satırın sıra numarası
+        self.acked = acked        # toplayıcının onayladığı son sıra numarası
+        self.resync = resume      # kuyrukta olmayan satırlar CSV'den okunmalı mı
+        self.sent_rows = 0
+        self.batches = 0
+        self.failures = 0
+        self.max_depth = 0
+        self.send_sec = 0.0
+        self._stop = threading.Event()
+        self._conn = None
+        self._save_state()        # durum dosyası ilk satırdan önce var olsun (yeniden gönderim bulur)
+        self._thread = threading.Thread(target=self._run, name='gonderim', daemon=True)
+        self._thread.start()
+
+    def put_rows(self, rows):
+        for row in rows:
+            self.put(row)
+
+    def put(self, row):
+        self.seq += 1
+        try:
+            self.queue.put_nowait((self.seq, [str(v) for v in row]))
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        except queue.Full:
+            self.resync = True
+
+    def close(self, timeout=3.0):
+        """Kalan satırları göndermek için en fazla timeout saniye bekler"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        rate = self.sent_rows / self.send_sec if self.send_sec else 0.0
+        return {'gonderilen': self.sent_rows, 'onaylanan': self.acked, 'toplu': self.batches,
+                'hata': self.failures, 'kuyruk': self.queue.qsize(),
+                'en_fazla_kuyruk': self.max_depth, 'satir_sn': round(rate, 1)}
+
+    def _next_batch(self):
+        batch = []
+        if self.resync:
+            # Kuyruğu boşalt; onaylanmamış her şey CSV'den okunur
+            try:
+                while True:
+                    self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.resync = False
+            return read_result_rows(self.results_csv, self.acked)
+        deadline = time.monotonic() + UPLOAD_INTERVAL_SEC
+        while len(batch) < UPLOAD_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        body = json.dumps({'station': self.station, 'session': self.session,
+                           'rows': [[seq] + row for seq, row in batch]}).encode('utf-8')
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=5)
+        self._conn.request('POST', self.path, body=body,
+                           headers={'Content-Type': 'application/json'})
+        resp = self._conn.getresponse()
+        data = resp.read()
+        if resp.status != 200:
+            raise OSError(f"toplayıcı {resp.status}")
+        return json.loads(data or b'{}')
+
+    def _save_state(self):
+        """Onaylanan satır sayısını CSV'nin yanındaki durum dosyasına yazar"""
+        try:
+            with open(self.results_csv + UPLOAD_STATE_EXT, 'w') as f:
+                f.write(str(self.acked))
+        except OSError:
+            pass
+
+    def _run(self):
+        pending = []
+        backoff = 0.5
+        while True:
+            if not pending:
+                if self._stop.is_set() and self.queue.empty() and not self.resync:
+                    break
+                pending = self._next_batch()
+                if not pending:
+                    continue
+            # Onaylanmış sıranın gerisindeki (CSV'den tekrar okunmuş) satırları atla
+            pending = [(seq, row) for seq, row in pending if seq > self.acked]
+            if not pending:
+                continue
+            t0 = time.perf_counter()
+            try:
+                reply = self._send(pending)
+            except Exception:
+                self.failures += 1
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                if self._stop.is_set():
+                    break  # kapanışta beklemeyelim; CSV asıl kayıt, sonraki açılışta gönderilir
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                self.resync = True  # bağlantı koptu: yeniden bağlanınca CSV'den devam
+                pending = []
+                continue
+            self.send_sec += time.perf_counter() - t0
+            self.sent_rows += len(pending)
+            self.batches += 1
+            # Toplayıcı kesintisiz aldığı son satırı bildirir; gerideyse aradaki satırlar CSV'den gelir
+            self.acked = max(self.acked, int(reply.get('acked', pending[-1][0])))
+            if self.acked < pending[-1][0]:
+                self.resync = True
+            pending = []
+            backoff = 0.5
+            self._save_state()
+        if self._conn is not None:
+            self._conn.close()
+
+
+def resend_pending(url, station, data_dir, exclude=None):
+    """Önceki oturumlardan toplayıcıya tam gönderilememiş satırları arka planda gönderir"""
+    def run():
+        for state in glob.glob(os.path.join(data_dir, '*_sonuclar.csv' + UPLOAD_STATE_EXT)):
+            results_csv = state[:-len(UPLOAD_STATE_EXT)]
+            if results_csv == exclude or not os.path.exists(results_csv):
+                continue
+            try:
+                with open(state) as f:
+                    acked = int(f.read().strip() or 0)
+                if not read_result_rows(results_csv, acked):
+                    continue
+                ResultUploader(url, station, results_csv, acked, resume=True).close(timeout=30.0)
+            except Exception:
+                continue
+    threading.Thread(target=run, name='gonderim_eski', daemon=True).start()
+
+
+# ------------------ Başlangıç ------------------
+STARTUP_CSV = 'baslangic_sureleri.csv'
+
+class StartupTimer:
+    """Başlangıç aşamalarının sürelerini (hangi iş parçacığında) kaydeder.
+
+    Başlangıç zamanları modülün yüklenmeye başladığı andan itibaren saniyedir;
+    dondurulmuş EXE'de soğuk açılışı aşama aşama izlemek için kullanılır.
+    """
+
+    def __init__(self):
+        self.stages = []  # (aşama, iş parçacığı, başlangıç_sn, süre_sn)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, t0, time.perf_counter() - t0)
+
+    def mark(self, name):
+        self._add(name, time.perf_counter(), 0.0)
+
+    def _add(self, name, t0, duration):
+        with self._lock:
+            self.stages.append((name, threading.current_thread().name, t0 - _T0, duration))
+
+    def save(self, data_dir, timestamp):
+        """Aşamaları oturum günlüğüne ve veri klasöründeki ortak CSV'ye ekler"""
+        frozen = bool(getattr(sys, 'frozen', False))
+        for name, thread, start, duration in self.stages:
+            logging.info(f"[Başlangıç] {name}: başlangıç={start*1000:.0f}ms "
+                         f"süre={duration*1000:.0f}ms ({thread})")
+        path = os.path.join(data_dir, STARTUP_CSV)
+        try:
+            new = not os.path.exists(path)
+            with open(path, 'a', newline='', encoding='utf-8-sig') as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(["timestamp", "frozen", "stage", "thread", "start_sec", "duration_sec"])
+                for name, thread, start, duration in self.stages:
+                    w.writerow([timestamp, int(frozen), name, thread,
+                                f"{start:.4f}", f"{duration:.4f}"])
+        except Exception:
+            pass
+
+
+# ------------------ Profil ------------------
+# Profil kipinde süreleri ölçülen sıcak yollar (modül fonksiyonları ve sınıf yöntemleri)
+PROFILE_HOT_PATHS = ['calculate_image_size', 'decode_image', 'bind_photo', 'TexturePool.acquire',
+                     'draw_centered_text', 'make_text', 'warm_up_stimuli', 'ResultWriter.write']
+PROFILE_TOP = 30   # raporda listelenen cProfile fonksiyonu sayısı
+_NO_SPAN = nullcontext()
+
+class Profiler:
+    """--profile kipinde main() aşamalarının ve sıcak yolların sürelerini toplar.
+
+    Kapalıyken span() paylaşılan bir nullcontext döndürür ve hiçbir fonksiyon
+    sarılmaz; ek maliyet aşama başına tek bir with bloğudur. 'cprofile'
+    kipinde sunum iş parçacığı ayrıca cProfile ile izlenir (önyükleme ve
+    yazıcı iş parçacıkları cProfile'a girmez, span'ları girer).
+    """
+
+    def __init__(self, mode=None):
+        self.mode = mode
+        self.enabled = bool(mode)
+        self.spans = {}   # ad -> [süre_sn, ...]
+        self._lock = threading.Lock()
+        self._cprofile = None
+        if mode == 'cprofile':
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def span(self, name):
+        return self._span(name) if self.enabled else _NO_SPAN
+
+    @contextmanager
+    def _span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - t0)
+
+    def record(self, name, duration):
+        """Span dışında ölçülmüş bir süreyi ekler"""
+        if self.enabled:
+            self._add(name, duration)
+
+    def _add(self, name, duration):
+        with self._lock:
+            self.spans.setdefault(name, []).append(duration)
+
+    def wrap(self, name, func):
+        """Kapalıyken func'ın kendisini, açıkken süresini kaydeden sarmalayıcıyı döndürür"""
+        if not self.enabled:
+            return func
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(name, time.perf_counter() - t0)
+        timed.__wrapped__ = func
+        return timed
+
+    def instrument(self, names=PROFILE_HOT_PATHS):
+        """Sıcak yolları bu modülde yerinde sarar ('Sinif.yontem' ya da fonksiyon adı).
+
+        Kapalıyken aynı süreçteki önceki bir oturumun sarmalayıcılarını kaldırır.
+        """
+        module = globals()
+        for name in names:
+            owner_name, _, attr = name.rpartition('.')
+            owner = module[owner_name] if owner_name else None
+            func = getattr(owner, attr) if owner is not None else module[attr]
+            timed = self.wrap(name, getattr(func, '__wrapped__', func))
+            if owner is not None:
+                setattr(owner, attr, timed)
+            else:
+                module[attr] = timed
+
+    def summary(self):
+        """Aşama başına (ad, n, toplam, ort, p50, p95, p99, en büyük) milisaniye; toplama göre"""
+        with self._lock:
+            items = [(k, np.asarray(v) * 1000) for k, v in self.spans.items()]
+        rows = [(name, len(ms), ms.sum(), ms.mean(), *np.percentile(ms, [50, 95, 99]), ms.max())
+                for name, ms in items]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def save(self, base_path):
+        """{base}_profil.csv (aşamalar) ve cprofile kipinde {base}_profil.txt/.prof yazar"""
+        if not self.enabled:
+            return
+        rows = self.summary()
+        with open(base_path + '_profil.csv', 'w', newline='', encoding='utf-8-sig') as f:
+            w = csv.writer(f)
+            w.writerow(["span", "n", "total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            w.writerows([name, n, *(f"{v:.3f}" for v in vals)] for name, n, *vals in rows)
+        for name, n, total, mean, p50, p95, p99, peak in rows[:10]:
+            logging.info(f"[Profil] {name}: n={n} toplam={total:.0f}ms p50={p50:.2f}ms "
+                         f"p95={p95:.2f}ms max={peak:.2f}ms")
+        if self._cprofile is not None:
+            import pstats
+            self._cprofile.disable()
+            self._cprofile.dump_stats(base_path + '_profil.prof')
+            with open(base_path + '_profil.txt', 'w', encoding='utf-8') as f:
+                stats = pstats.Stats(self._cprofile, stream=f).strip_dirs()
+                f.write("== Kendi süresine göre (tottime) ==\n")
+                stats.sort_stats('tottime').print_stats(PROFILE_TOP)
+                f.write("\n== Toplam süreye göre (cumtime) ==\n")
+                stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+
+
+# ------------------ Ekran zamanlaması ------------------
+TIMING_SUMMARY_CSV = 'zamanlama_ozeti.csv'
+TIMING_HEADER = ["participant", "timestamp", "screen", "set_index", "item_index",
+                 "onset_sec", "offset_sec", "exposure_sec", "planned_sec",
+                 "frames", "dropped", "refresh_hz", "measured_hz", "end"]
+
+class ScreenTiming:
+    """Her ekranın gerçek başlangıç/bitiş flip'lerini ve kare kayıplarını kaydeder.
+
+    begin() bir sonraki flip'i ekranın başlangıcı yapar; ekranın bitişi bir
+    sonraki ekranın başlangıç flip'idir. Kareler win.recordFrameIntervals ile
+    sayılır: bir ekranın kareleri, başlangıcından sonraki flip'lerden sonraki
+    ekranın başlangıcına kadar olan aralıklardır. Statik kipte tek flip'le
+    çizilen süreli ekranlarda kayıp, bitiş flip'inin (sıradaki ekranın
+    başlangıcı) planlanan yenilemeden kaç kare geç geldiğidir. Yanıtla biten
+    tek flip'li ekranlarda (Likert vb.) kayıp ölçülemez ve boş yazılır.
+    Kayıtlar {oturum}_timing.csv dosyasına yazılır.
+    """
+
+    def __init__(self, win, path, participant, timestamp):
+        self.win = win
+        self.path = path
+        self.participant = participant
+        self.timestamp = timestamp
+        self.period = getattr(win, 'monitorFramePeriod', 0) or 1.0 / 60
+        self.threshold = getattr(win, 'refreshThreshold', 0) or self.period * 1.2
+        win.recordFrameIntervals = True
+        self._open = []    # bitiş aralığı henüz ölçülmemiş kayıtlar
+        self.records = []  # özet için yazılmış kayıtlar
+        self.current = None             # en son başlatılan ekranın kaydı (canlı izleme)
+        self.frames = self.dropped = 0  # kare kaybı ölçülen ekranların şimdiye kadarki toplamı
+        try:
+            with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+                csv.writer(f).writerow(TIMING_HEADER)
+        except Exception:
+            self.path = None
+
+    def begin(self, screen, set_index='', item_index='', planned=None):
+        """Bir sonraki flip'te başlayacak ekranın kaydını döndürür (flip'ten önce çağrılır)"""
+        self._flush()
+        rec = {'screen': screen, 'set_index': set_index, 'item_index': item_index,
+               'planned': planned, 'end': ''}
+        self.win.callOnFlip(self._on_onset, rec)
+        self.current = rec
+        return rec
+
+    def _on_onset(self, rec):
+        now = core.getTime()
+        idx = len(self.win.frameIntervals)  # bu flip'in aralığı bu indekse eklenecek
+        if self._open and 'end_idx' not in self._open[-1]:
+            self._open[-1].update(offset=now, end_idx=idx)
+        if not self._open and not self.records:
+            idx -= 1  # kayıt açıldıktan sonraki ilk flip'in aralığı tutulmaz
+        rec.update(onset=now, start_idx=idx)
+        self._open.append(rec)
+
+    def _finish(self, rec):
+        intervals = self.win.frameIntervals[rec['start_idx'] + 1:rec['end_idx'] + 1]
+        exposure = rec['offset'] - rec['onset']
+        if len(intervals) > 1:
+            # Sürekli çizim: eşiği aşan her aralık bir kare kaybıdır
+            frames = len(intervals)
+            dropped = sum(1 for iv in intervals if iv > self.threshold)
+        elif rec['planned'] is not None and rec['end'] == 'sure':
+            # Statik ekran: bitiş flip'i onset + planlanan kare sayısı anındaki yenilemeye
+            # hedeflenir; ondan sonraki her yenileme kaçırılmış bir karedir
+            frames = max(1, int(round(rec['planned'] / self.period)))
+            dropped = max(0, int(round((exposure - rec['planned']) / self.period)))
+        else:
+            frames, dropped = len(intervals), None
+        inner = sorted(intervals[:-1])
+        measured = 1.0 / inner[len(inner) // 2] if inner and inner[len(inner) // 2] > 0 else None
+        rec.update(frames=frames, dropped=dropped, measured=measured, exposure=exposure)
+        return rec
+
+    def _flush(self, final=False):
+        n = len(self.win.frameIntervals)
+        done = [r for r in self._open
+                if 'end_idx' in r and (final or r['end_idx'] < n)]
+        if not done:
+            return
+        self._open = [r for r in self._open if r not in done]
+        rows = []
+        for rec in map(self._finish, done):
+            self.records.append(rec)
+            if rec['dropped'] is not None:
+                self.frames += rec['frames']
+                self.dropped += rec['dropped']
+            rows.append([self.participant, self.timestamp, rec['screen'],
+                         rec['set_index'], rec['item_index'],
+                         f"{rec['onset']:.5f}", f"{rec['offset']:.5f}", f"{rec['exposure']:.5f}",
+                         "" if rec['planned'] is None else f"{rec['planned']:.3f}",
+                         rec['frames'], "" if rec['dropped'] is None else rec['dropped'],
+                         f"{1.0 / self.period:.2f}",
+                         "" if rec['measured'] is None else f"{rec['measured']:.2f}", rec['end']])
+        if self.path:
+            try:
+                with open(self.path, 'a', newline='', encoding='utf-8-sig') as f:
+                    csv.writer(f).writerows(rows)
+            except Exception:
+                pass
+
+    def summary(self):
+        """Oturumun zamanlama özeti; toleransın aşılıp aşılmadığını da içerir"""
+        tol = TIMING_TOLERANCE_FRAMES * self.period + 1e-4
+        timed = [r for r in self.records if r['planned'] is not None and r['end'] == 'sure']
+        off = [r for r in timed if abs(r['exposure'] - r['planned']) > tol]
+        checked = [r for r in self.records if r['dropped'] is not None]
+        frames = sum(r['frames'] for r in checked)
+        dropped = sum(r['dropped'] for r in checked)
+        errors = [abs(r['exposure'] - r['planned']) * 1000 for r in timed]
+        drop_rate = dropped / frames if frames else 0.0
+        return {'ekran': len(self.records), 'sureli': len(timed), 'sapan': len(off),
+                'en_buyuk_sapma_ms': round(max(errors), 2) if errors else 0.0,
+                'kare': frames, 'atlanan': dropped, 'atlama_orani': round(drop_rate, 5),
+                'yenileme_hz': round(1.0 / self.period, 2),
+                'uygun': int(not off and drop_rate <= TIMING_MAX_DROP_RATE)}
+
+    def close(self, data_dir):
+        """Açık kayıtları bitirir, özeti günlüğe ve ortak özet CSV'sine ekler"""
+        if self._open and 'end_idx' not in self._open[-1]:
+            self._open[-1].update(offset=core.getTime(), end_idx=len(self.win.frameIntervals))
+        self._flush(final=True)
+        summary = self.summary()
+        logging.info(f"[Zamanlama] {summary}")
+        if not summary['uygun']:
+            print(f"[Uyarı] Zamanlama tolerans dışında: {summary}")
+        path = os.path.join(data_dir, TIMING_SUMMARY_CSV)
+        try:
+            new = not os.path.exists(path)
+            with open(path, 'a', newline='', encoding='utf-8-sig') as f:
+                w = csv.writer(f)
+                if new:
+                    w.writerow(["participant", "timestamp"] + list(summary))
+                w.writerow([self.participant, self.timestamp] + list(summary.values()))
+        except Exception:
+            pass
+        return summary
+
+
+# ------------------ Canlı izleme ------------------
+class SessionStatus:
+    """Sunum iş parçacığının beslediği, izleme sunucusunun okuduğu oturum durumu.
+
+    Sunum iş parçacığı yalnızca atama yapar (update/response); anlık görüntü
+    izleme iş parçacığında kilitsiz kopyalarla alınır. Ekran, set ve madde
+    bilgisi ScreenTiming'in son kaydından, kuyruk derinlikleri kuyrukların
+    iç listelerinden okunur; sunum iş parçacığı hiçbir kilitte beklemez.
+    """
+
+    def __init__(self, station, session, sets_total):
+        # Katılımcı rumuzu yayımlanmaz; oturum yalnızca oturum numarasıyla tanınır
+        self.fields = {'istasyon': station, 'oturum': session,
+                       'faz': 'hazirlik', 'set': 0, 'set_toplam': sets_total}
+        self.started = time.time()
+        self.latencies = deque(maxlen=STATUS_RECENT_RT)
+        self.timing = None
+        self.writer = None
+        self.uploader = None
+
+    def update(self, **fields):
+        self.fields.update(fields)
+
+    def response(self, rt):
+        self.latencies.append(round(rt, 4))
+
+    def snapshot(self):
+        snap = dict(self.fields)
+        now = time.time()
+        snap.update(zaman=round(now, 3), gecen_sn=round(now - self.started, 1))
+        latencies = list(self.latencies)
+        snap['son_rt'] = latencies
+        snap['son_rt_medyan'] = float(np.median(latencies)) if latencies else None
+        timing = self.timing
+        if timing is not None:
+            rec = timing.current
+            if rec is not None:
+                rec = dict(rec)
+                snap.update(faz=rec['screen'], hedef=rec['set_index'], madde=rec['item_index'])
+                if 'onset' in rec:
+                    snap['ekran_sn'] = round(core.getTime() - rec['onset'], 2)
+            snap.update(kare=timing.frames, atlanan=timing.dropped)
+        if self.writer is not None:
+            snap['yazici_kuyrugu'] = len(self.writer.queue.queue)
+        if self.uploader is not None:
+            snap['gonderim_kuyrugu'] = len(self.uploader.queue.queue)
+            snap['gonderim_onay'] = self.uploader.acked
+        return snap
+
+
+class StatusServer:
+    """SessionStatus'u GET /durum ile JSON olarak sunan arka plan HTTP sunucusu"""
+
+    def __init__(self, status, host=STATUS_HOST, port=STATUS_DEFAULT_PORT):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # monitor.py bağlantıyı açık tutar
+
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/durum'):
+                    body, code = b'{}', 404
+                else:
+                    body, code = json.dumps(status.snapshot(), ensure_ascii=False).encode('utf-8'), 200
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.5},
+                                        name='izleme', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FrameScheduler:
+    """Süreleri kare sayısına çevirip ekranı tam o kadar flip boyunca gösterir.
+
+    Yenileme periyodu pencere açılırken PsychoPy'nin ölçtüğü değerdir
+    (win.monitorFramePeriod). Gösterilen kare sayısı flip zaman damgalarından
+    hesaplanır; böylece atlanan bir kare de süreye sayılır ve gecikme birikmez.
+    Statik kipte ekran bir kez çizilir ve bitiş zamanı saatle beklenir (onam,
+    Likert ve arkadaşlık ekranları zaten tek flip'le çizilip yanıt yoklanır).
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self.period = getattr(win, 'monitorFramePeriod', 0) or 1.0 / 60
+
+    @property
+    def refresh_hz(self):
+        return 1.0 / self.period
+
+    def frames(self, duration):
+        return max(1, int(round(duration / self.period)))
+
+    def present(self, draw, n_frames, poll=None, on_final=None, static=None):
+        """draw() ile çizilen ekranı n_frames kare gösterir.
+
+        poll() None dışında bir şey döndürürse ekran erken biter ('gecis').
+        Süre dolarsa on_final() son kare ekrandayken çağrılır (sıradaki
+        uyaranın dokusunu yüklemek için); bir sonraki flip yeni ekranı
+        kesintisiz gösterir. 'sure' ya da 'gecis' döndürür.
+        static (varsayılan STATIC_SCREENS): ekran bir kez çizilir; arada
+        yalnızca yanıt yoklanır ve bitiş zamanına kadar uyunur.
+        """
+        if STATIC_SCREENS if static is None else static:
+            return self._present_static(draw, n_frames, poll, on_final)
+        onset = None
+        while True:
+            draw()
+            t = self.win.flip()
+            if t is None:
+                t = core.getTime()
+            if onset is None:
+                onset = t
+            shown = int(round((t - onset) / self.period)) + 1
+            if poll is not None and poll() is not None:
+                return 'gecis'
+            if shown >= n_frames:
+                if on_final is not None:
+                    on_final()
+                return 'sure'
+
+    def _present_static(self, draw, n_frames, poll, on_final):
+        # Tek flip; görüntü bir sonraki flip'e kadar ekranda kalır. Süre dolunca
+        # dönülür: son karenin içinde yapılan flip yeni ekranı tam
+        # onset + n_frames * periyot anındaki yenilemede gösterir.
+        draw()
+        onset = self.win.flip()
+        if onset is None:
+            onset = core.getTime()
+        release = onset + (n_frames - 1 + 0.2) * self.period
+        prepare = release - STATIC_PREPARE_SEC
+        pending = on_final
+        while True:
+            if poll is not None and poll() is not None:
+                return 'gecis'
+            now = core.getTime()
+            if pending is not None and now >= prepare:
+                pending()
+                pending = None
+                continue
+            if now >= release:
+                return 'sure'
+            # Geçiş karede bir yoklanır (sürekli kipteki flip sıklığı, ama çizimsiz);
+            # bitişe bir kareden az kaldıysa tek bekleme, yalnızca son STATIC_SPIN_SEC
+            # meşgul döngü (bitiş son karenin içinde olduğundan birkaç ms gecikme zararsız)
+            until = prepare if pending is not None else release
+            remaining = until - now
+            if remaining > self.period:
+                core.wait(self.period, hogCPUperiod=0)
+            else:
+                core.wait(remaining, hogCPUperiod=min(remaining, STATIC_SPIN_SEC))
+
+
+def bind_photo(textures, photo, target):
+    """Önceden çözülmüş pikselleri havuzdaki bir dokuya yükler ve süreleri günlüğe yazar"""
+    t0 = time.perf_counter()
+    pic = textures.acquire(photo['path'], photo['image'], photo['size'])
+    bind_sec = time.perf_counter() - t0
+    photo['image'] = None  # GPU'ya yüklendi; ana bellekteki kopyayı bırak
+    logging.info(f"[Görsel] {os.path.basename(photo['path'])} set={target} "
+                 f"decode={photo['decode_sec']*1000:.1f}ms "
+                 f"onbellek={'evet' if photo['cached'] else 'hayır'} "
+                 f"bekleme={photo['wait_sec']*1000:.1f}ms "
+                 f"bind={bind_sec*1000:.1f}ms")
+    return pic
+
+
+def prepare_session(startup, screen_px, session_no=0):
+    """Diyalog açıkken arka planda: deneme planı ve ilk setin önyüklemesi.
+
+    Yalnızca dosya ve görsel çözme işleri yapılır; PsychoPy/pyglet yükleme ve
+    ekran sorgusu pencere sistemine dokunduğu için ana iş parçacığında kalır.
+    """
+    with startup.stage('set_kesfi'):
+        plan = TrialPlan.create(STIM_ROOT, seed=PLAN_SEED, session_no=session_no)
+    # Önbellek ısıtma: ilk setin dokuları önyükleme havuzunda okunmaya başlar
+    prefetcher = ImagePrefetcher(screen_px)
+    if len(plan):
+        prefetcher.schedule(plan.folder(0))
+    return plan, prefetcher
 
 
 # ------------------ Başlat ------------------
 def main():
+    profiler = Profiler(PROFILE_MODE)
+    profiler.instrument()
+    startup = StartupTimer()
+    with startup.stage('gui_import'):
+        import_gui()
+    with startup.stage('ekran_boyutu'):
+        screen_px = get_screen_size()
+
+    # Dosya işleri katılımcı diyaloğu doldururken arka planda yürüsün
+    background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='baslangic')
+    # Oturum numarası bu oturumun CSV'si oluşmadan alınır (Latin karesi satırı);
+    # sayaç onam verildikten sonra ilerler
+    session_no = next_session_no(DATA_DIR)
+    prepared = background.submit(prepare_session, startup, screen_px, session_no)
+    startup.mark('diyalog_acildi')
+
     # --- DEMOGRAFİK BİLGİLER (ZORUNLU) ---  # İngilizce satırı gizler
     # --- DEMOGRAFİK BİLGİLER (ZORUNLU; etiketlerde * var, İngilizce satır gizlenir) ---
+    dialog_t0 = time.perf_counter()
     while True:
         dlg = gui.Dlg(title="Katılımcı Bilgileri")  # İngilizce 'required' uyarısını kaldır
 
@@ -407,6 +2368,12 @@ def main():
         err = gui.Dlg(title="Eksik/Geçersiz Bilgi")
         err.addText("Tüm alanlar ZORUNLUDUR. Lütfen düzeltin:\n- " + "\n- ".join(missing))
         err.show()
+    profiler.record('demografik', time.perf_counter() - dialog_t0)
+    startup.mark('diyalog_kapandi')
+
+    # Pencere modülleri ana iş parçacığında yüklenir (pyglet/GL iş parçacığına bağlıdır)
+    with startup.stage('psychopy_import'):
+        import_psychopy()
 
     timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     ensure_dir(DATA_DIR)
@@ -415,41 +2382,121 @@ def main():
     base = f"{participant}_{timestamp}"
     results_csv = os.path.join(DATA_DIR, f"{base}_sonuclar.csv")
 
-    # CSV'yi oluştur ve başlığı bir kez yaz
-    with open(results_csv, "w", newline="", encoding="utf-8-sig") as f:
-        w = csv.writer(f)
-        w.writerow([
-            "participant","timestamp","phase",
-            "set_index","item_index","item_text",
-            "response_key","response_label","rt_sec"
-        ])
+    # Oturum günlüğü (görsel yükleme süreleri vb.)
+    try:
+        logging.LogFile(os.path.join(DATA_DIR, f"{base}_log.txt"),
+                        level=logging.INFO, filemode='w')
+    except Exception:
+        pass
+
+    # Profil raporu en son yazılır (kapanış işleri de ölçülsün)
+    on_exit(lambda: profiler.save(os.path.join(DATA_DIR, base)))
+
+    # İsteğe bağlı toplayıcı: satırlar yerel CSV'ye yazılıp boşaltıldıktan sonra kuyruğa girer
+    formats = list(RESULT_FORMATS)
+    uploader = None
+    if COLLECTOR_URL:
+        if 'csv' not in formats:
+            formats.insert(0, 'csv')  # toplayıcı yeniden gönderimde CSV'yi okur
+        uploader = ResultUploader(COLLECTOR_URL, STATION_ID, results_csv)
+        resend_pending(COLLECTOR_URL, STATION_ID, DATA_DIR, exclude=results_csv)
+
+    # Sonuç dosyaları (CSV başlığı burada yazılır); satırlar arka planda yazılır
+    writer = ResultWriter(os.path.join(DATA_DIR, base), formats,
+                          on_written=uploader.put_rows if uploader is not None else None)
+
+    # İsteğe bağlı canlı izleme sunucusu (ayrı iş parçacığında; sunumu beklemez)
+    status = SessionStatus(STATION_ID, session_no, SETS_PER_SESSION)
+    status.writer, status.uploader = writer, uploader
+    if STATUS_PORT:
+        try:
+            monitor = StatusServer(status, STATUS_HOST, STATUS_PORT)
+            on_exit(monitor.close)
+            logging.info(f"[İzleme] {STATUS_HOST}:{monitor.port}/durum")
+        except OSError as e:
+            print(f"[Uyarı] İzleme sunucusu açılamadı ({STATUS_PORT}): {e}")
+
+    def finish_results():
+        writer.close()
+        logging.info(f"[Sonuçlar] {writer.stats()}")
+        if uploader is not None:
+            uploader.close()
+            logging.info(f"[Gönderim] {uploader.stats()}")
+    on_exit(profiler.wrap('kapanis/sonuclar', finish_results))  # ESC ile çıkışta da kuyruktaki satırlar yazılır
+
+    # Arka plan hazırlığının bitmesini bekle (çoğunlukla diyalog sırasında biter)
+    with startup.stage('hazirlik_bekleme'):
+        plan, prefetcher = prepared.result()
+    background.shutdown(wait=False)
+
+    # Pencere (GL bağlamı sunum iş parçacığında, diyalog kapandıktan sonra açılır)
+    with startup.stage('pencere'), profiler.span('pencere'):
+        # checkTiming: yenileme hızı açılışta ölçülür (kare sayısıyla süre için)
+        win = visual.Window(fullscr=FULLSCREEN, color=BG_COLOR, units='height',
+                            checkTiming=True)
+        win.mouseVisible = True  # Butonlar için mouse görünür olmalı
+    responses = ResponseEngine(win)
+    textures = TexturePool(win)
+    timing = ScreenTiming(win, os.path.join(DATA_DIR, f"{base}_timing.csv"),
+                          participant, timestamp)
+    status.timing = timing
+    scheduler = FrameScheduler(win)
+    photo_frames = scheduler.frames(PHOTO_MAX_SEC)
+    logging.info(f"[Zamanlama] yenileme={scheduler.refresh_hz:.2f}Hz "
+                 f"fotoğraf={photo_frames} kare")
 
-    # Pencere
-    win = visual.Window(fullscr=FULLSCREEN, color=BG_COLOR, units='height')
-    win.mouseVisible = True  # Butonlar için mouse görünür olmalı
+    # ------------------ Setleri hazırla ------------------
+    if plan.pool_size < SETS_PER_SESSION:
+        print(f"[Uyarı] Bulunan set sayısı: {plan.pool_size} (beklenen: {SETS_PER_SESSION})")
+    total_sets = len(plan)
+    status.update(set_toplam=total_sets)
+    logging.info(f"[Plan] {plan.mode} tohum={plan.seed} havuz={plan.pool_size} "
+                 f"blok={plan.block} satir={plan.row} setler={','.join(plan.names)}")
+
+    # Pencere tahmin edilen ekran boyutundan farklıysa önyüklemeyi doğru boyutla yenile
+    if tuple(int(v) for v in win.size) != prefetcher.win_px:
+        prefetcher.shutdown()
+        prefetcher = ImagePrefetcher(win.size)
+        if total_sets:
+            prefetcher.schedule(plan.folder(0))
+
+    # Metin/buton/ekran nesnelerini oturum başında bir kez oluştur (ilk set bu sırada çözülür)
+    with startup.stage('uyaranlar'), profiler.span('uyaranlar'):
+        registry = StimRegistry(win)
+        warm_up_stimuli(registry)
+    atlas = get_font_atlas(win.size) if FONT_ATLAS else None
+    logging.info(f"[Uyaranlar] hazırlandı: {registry.stats()} "
+                 f"yazı_atlası={'evet' if atlas is not None else 'hayır (TextStim)'}")
 
     # ------------------ Onam ------------------
     event.clearEvents()
-    consent_buttons = create_yes_no_buttons(win, 'E: Onaylıyorum', 'H: Onaylamıyorum', -0.35)
-    def draw_consent_screen():
-        draw_centered_text(win, CONSENT_TEXT, height=0.025, pos=(0, 0.1))
-    key, t = wait_key_or_click(win, ['e','h'], consent_buttons, draw_consent_screen)
+    consent_buttons = get_consent_buttons(registry)
+    win.callOnFlip(startup.mark, 'ilk_ekran')
+    timing.begin('consent')
+    with profiler.span('onam'):
+        key, t = wait_key_or_click(win, ['e','h'], consent_buttons,
+                                   screen=get_consent_screen(registry))
     consent_given = (key == 'e')
+    status.response(t)
+    startup.save(DATA_DIR, timestamp)
 
     # Onam kaydı
-    with open(results_csv, 'a', newline='', encoding='utf-8-sig') as f:
-        w = csv.writer(f)
-        w.writerow([participant, timestamp, "consent",
-                    "", "", "Consent",
-                    key, ("onay" if consent_given else "ret"), f"{t:.4f}"])
+    writer.write([[participant, timestamp, "consent",
+                "", "", "Consent",
+                key, ("onay" if consent_given else "ret"), f"{t:.4f}"]])
 
     if not consent_given:
         event.clearEvents()
         draw_centered_text(win, "Onay verilmedi. Deney sonlandırılıyor.", height=0.05)
+        timing.begin('bitis')
         win.flip()
         core.wait(2.0)
+        timing.close(DATA_DIR)
         safe_exit(win)
 
+    # Oturum başladı: Latin karesi satırı ancak şimdi harcanır
+    save_session_counter(DATA_DIR, session_no)
+
     # --- Onam VERİLDİYSE demografik cevapları kaydet ---
     demographics = [
         ("Rumuz", nickname),
@@ -457,108 +2504,191 @@ def main():
         ("Eğitim durumu", education),
         ("Meslek", profession),
     ]
-    with open(results_csv, 'a', newline='', encoding='utf-8-sig') as f:
-        w = csv.writer(f)
-        for label, value in demographics:
-            w.writerow([participant, timestamp, "demographics",
-                        "", "", label, value, value, ""])
-
-    # ------------------ Setleri hazırla ------------------
-    sets = list_sets(STIM_ROOT)
-    if len(sets) < 10:
-        print(f"[Uyarı] Bulunan set sayısı: {len(sets)} (beklenen: 10)")
+    writer.write([[participant, timestamp, "demographics",
+                "", "", label, value, value, ""]
+               for label, value in demographics])
+    # Yeniden üretilebilirlik: plan kipi, tohum ve gösterilen setlerin sırası
+    writer.write(plan.rows(participant, timestamp))
 
     # ------------------ Deney Döngüsü ------------------
-    total_sets = min(10, len(sets))  # 10 set
-    timer = core.Clock()
-    mouse = event.Mouse(win=win)  # Mouse'u bir kez oluştur
-
     for si in range(total_sets):
-        set_folder = sets[si]
-        images = list_images(set_folder)
-        if len(images) != 3:
-            print(f"[Uyarı] {set_folder} içinde 3 görsel bulunamadı. Bulunan: {len(images)}")
-
-        # --- 3 Fotoğraf (max 10 sn, SKIP ile geç veya tıklayarak geç) ---
-        for img_path in images:
-            # Görüntü boyutunu aspect ratio'yu koruyarak hesapla
-            img_size = calculate_image_size(img_path, max_width=1.6, max_height=0.9)
-            pic = visual.ImageStim(win, image=img_path, size=img_size, units='height')
-            hint = visual.TextStim(win, text=PHOTO_HINT, color=TEXT_COLOR, font=FONT_NAME, height=0.03, pos=(0,-0.45))
-            event.clearEvents()
-            timer.reset()
-            while timer.getTime() < PHOTO_MAX_SEC:
+        set_folder = plan.folder(si)
+        target = plan.target(si)
+        status.update(set=si + 1)
+        photos = prefetcher.get(set_folder)
+        if len(photos) != IMAGES_PER_SET:
+            print(f"[Uyarı] {set_folder} içinde {IMAGES_PER_SET} görsel bulunamadı. "
+                  f"Bulunan: {len(photos)}")
+
+        # --- Fotoğraflar (PHOTO_MAX_SEC kadar kare, SKIP ile geç veya tıklayarak geç) ---
+        # Sıradaki fotoğrafın dokusu öncekinin son karesinde yüklenir; geçişte boş kare olmaz
+        hint = get_photo_hint(registry)
+        pics = [None] * len(photos)
+        for pi, photo in enumerate(photos, start=1):
+            pic = pics[pi - 1] or bind_photo(textures, photo, target)
+            def bind_next():
+                if pi < len(photos) and pics[pi] is None:
+                    pics[pi] = bind_photo(textures, photos[pi], target)
+
+            # Fotoğrafa tıklama (merkez 0,0) geçiş sayılır (boyut aspect ratio korunarak hesaplandı)
+            img_width, img_height = photo['size']
+            def hit_photo(pos):
+                if (-img_width/2 <= pos[0] <= img_width/2 and
+                        -img_height/2 <= pos[1] <= img_height/2):
+                    return 'click'
+                return None
+
+            def draw_photo():
                 pic.draw()
                 hint.draw()
-                win.flip()
-                
-                # Klavye kontrolü
-                keys = event.getKeys(keyList=[SKIP_KEY, EXIT_KEY])
-                if EXIT_KEY in keys:
-                    safe_exit(win)
-                if SKIP_KEY in keys:
-                    break
-                
-                # Mouse tıklama kontrolü - fotoğrafa tıklanınca geç
-                if mouse.getPressed()[0]:  # Sol tık
-                    # Tıklama bırakılana kadar bekle
-                    while mouse.getPressed()[0]:
-                        core.wait(0.01)
-                    mouse_pos = mouse.getPos()
-                    # Fotoğrafın sınırlarını kontrol et (merkez 0,0)
-                    img_width, img_height = img_size
-                    if (-img_width/2 <= mouse_pos[0] <= img_width/2 and
-                        -img_height/2 <= mouse_pos[1] <= img_height/2):
-                        break
+
+            event.clearEvents()
+            responses.arm()
+            shown = timing.begin('photo', target, pi, PHOTO_MAX_SEC)
+            with profiler.span('fotograf'):
+                shown['end'] = scheduler.present(
+                    draw_photo, photo_frames,
+                    poll=lambda: responses.poll([SKIP_KEY], hit_test=hit_photo),
+                    on_final=bind_next)
+
+        # Katılımcı soruları yanıtlarken sonraki setin fotoğraflarını çöz
+        if si + 1 < total_sets:
+            prefetcher.schedule(plan.folder(si + 1))
 
         # --- 10 Likert soru (boş bırakılamaz) ---
-        likert_buttons = create_likert_buttons(win)
+        likert_buttons = get_likert_buttons(registry)
         for qi, qtext in enumerate(LIKERT_QUESTIONS, start=1):
             event.clearEvents()
-            # Çizim fonksiyonu
-            def draw_likert_screen():
-                draw_centered_text(win, f"Soru {qi}/10\n\n{qtext}", height=0.05, pos=(0, 0.1))
-                draw_centered_text(win, LIKERT_INSTRUCTION, height=0.035, pos=(0, -0.05))
-                draw_centered_text(win, LIKERT_SCALE_HINT, height=0.03, pos=(0, -0.12))
-            
-            resp_key, rt = wait_key_or_click(win, LIKERT_KEYS, likert_buttons, draw_likert_screen)
-
-            with open(results_csv, 'a', newline='', encoding='utf-8-sig') as f:
-                w = csv.writer(f)
-                w.writerow([
-                    participant, timestamp, "likert",
-                    si+1, qi, qtext,
-                    resp_key, LIKERT_LABELS.get(resp_key, resp_key), f"{rt:.4f}"
-                ])
+            timing.begin('likert', target, qi)['end'] = 'yanit'
+            with profiler.span('likert'):
+                resp_key, rt = wait_key_or_click(win, LIKERT_KEYS, likert_buttons,
+                                                 screen=get_likert_screen(registry, qi, qtext))
+            status.response(rt)
+
+            writer.write([[
+                participant, timestamp, "likert",
+                target, qi, qtext,
+                resp_key, LIKERT_LABELS.get(resp_key, resp_key), f"{rt:.4f}"
+            ]])
 
         # --- Arkadaşlık Sorusu (E/H) ---
         event.clearEvents()
-        friend_buttons = create_friend_buttons(win)
-        # Çizim fonksiyonu
-        def draw_friend_screen():
-            draw_centered_text(win, FRIENDSHIP_QUESTION, height=0.05, pos=(0, 0.05))
-           
-        
-        f_key, f_rt = wait_key_or_click(win, FRIEND_KEYS, friend_buttons, draw_friend_screen)
+        friend_buttons = get_friend_buttons(registry)
+        timing.begin('friendship', target)['end'] = 'yanit'
+        with profiler.span('arkadaslik'):
+            f_key, f_rt = wait_key_or_click(win, FRIEND_KEYS, friend_buttons,
+                                            screen=get_friend_screen(registry))
+        status.response(f_rt)
         friend_resp = "Evet" if f_key == 'e' else "Hayır"
 
-        with open(results_csv, 'a', newline='', encoding='utf-8-sig') as f:
-            w = csv.writer(f)
-            w.writerow([
-                participant, timestamp, "friendship",
-                si+1, "", "Arkadaşlık",
-                f_key, friend_resp, f"{f_rt:.4f}"
-            ])
+        writer.write([[
+            participant, timestamp, "friendship",
+            target, "", "Arkadaşlık",
+            f_key, friend_resp, f"{f_rt:.4f}"
+        ]])
+
+    prefetcher.shutdown()
+    logging.info(f"[Uyaranlar] oturum sonu: {registry.stats()}")
+    logging.info(f"[Dokular] {textures.stats()}")
+    textures.release()
 
     # ------------------ Teşekkür ------------------
     event.clearEvents()
     draw_centered_text(win, "Teşekkür ederiz.\n\nDeney tamamlandı.", height=0.06)
-    win.flip()
-    core.wait(2.5)
+    timing.begin('bitis')
+    with profiler.span('kapanis'):
+        win.flip()
+        core.wait(2.5)
+        timing.close(DATA_DIR)
 
     # Güvenli kapanış
     safe_exit(win, 0)
 
 
+def parse_size(text):
+    """'1920x1080' -> (1920, 1080)"""
+    w, h = text.lower().split('x')
+    return (int(w), int(h))
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import multiprocessing
+    multiprocessing.freeze_support()  # PyInstaller + ProcessPoolExecutor için
+
+    parser = argparse.ArgumentParser(description="Deney uygulaması")
+    parser.add_argument('--build-cache', nargs='?', const='auto', metavar='GENxYÜK',
+                        help="Doku önbelleğini doldur (varsayılan: birincil ekran boyutu)")
+    parser.add_argument('--build-font-atlas', nargs='?', const='auto', default=None, metavar='GENxYÜK',
+                        help="Yazı atlasını oluştur; virgülle birden fazla çözünürlük (varsayılan: birincil ekran)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Önbellek/paket oluşturmada kullanılacak süreç sayısı")
+    parser.add_argument('--pack-bundle', nargs='?', const='', default=None, metavar='CIKTI',
+                        help="stimuli/ klasörünü tek bir paket dosyasına yaz (varsayılan: stimuli.bundle)")
+    parser.add_argument('--collector', default=None, metavar='URL',
+                        help="Sonuçları ayrıca bu toplayıcıya gönder (ör. http://10.0.0.5:8765)")
+    parser.add_argument('--status', nargs='?', type=int, const=STATUS_DEFAULT_PORT, default=None,
+                        metavar='PORT', help=f"Canlı izleme sunucusunu aç (varsayılan port: {STATUS_DEFAULT_PORT})")
+    parser.add_argument('--status-host', default=None, metavar='ADRES',
+                        help="İzleme sunucusunun dinlediği adres (varsayılan 127.0.0.1; "
+                             "laboratuvar ağı için 0.0.0.0; DENEY_IZLEME_ADRES)")
+    parser.add_argument('--sets', type=int, default=None,
+                        help=f"Katılımcı başına set sayısı (varsayılan: {SETS_PER_SESSION})")
+    parser.add_argument('--images', type=int, default=None,
+                        help=f"Set başına görsel sayısı (varsayılan: {IMAGES_PER_SET})")
+    parser.add_argument('--plan', choices=['sirali', 'rastgele', 'latin'], default=None,
+                        help=f"Set seçimi ve sıralama (varsayılan: {PLAN_MODE})")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Planı yeniden üretmek için tohum (latin: oturum numarası)")
+    parser.add_argument('--session', type=int, default=None,
+                        help="Laboratuvar genelinde oturum numarası (latin satırı; DENEY_OTURUM)")
+    parser.add_argument('--results', default=None, metavar='BICIMLER',
+                        help="Sonuç biçimleri, virgülle: csv,jsonl,sqlite (varsayılan: csv)")
+    parser.add_argument('--flush-sec', type=float, default=None,
+                        help="Sonuçları en geç bu aralıkla diske boşalt (0: her yazımda)")
+    parser.add_argument('--fsync', action='store_true',
+                        help="Her boşaltmada işletim sistemi önbelleğini de diske yaz")
+    parser.add_argument('--redraw', action='store_true',
+                        help="Fotoğrafları her karede yeniden çiz (statik ekran kipini kapatır)")
+    parser.add_argument('--no-font-atlas', action='store_true',
+                        help="Metinleri yazı atlası yerine TextStim ile çiz")
+    parser.add_argument('--profile', nargs='?', const='span', choices=['span', 'cprofile'],
+                        default=None, help="Aşama sürelerini ölç (cprofile: ayrıca cProfile raporu)")
+    args, _ = parser.parse_known_args()
+    if args.collector:
+        COLLECTOR_URL = args.collector
+    STATUS_PORT = args.status or STATUS_PORT
+    STATUS_HOST = args.status_host or STATUS_HOST
+    SETS_PER_SESSION = args.sets or SETS_PER_SESSION
+    IMAGES_PER_SET = args.images or IMAGES_PER_SET
+    PLAN_MODE = args.plan or PLAN_MODE
+    PLAN_SEED = args.seed
+    SESSION_NO = args.session if args.session is not None else SESSION_NO
+    STATIC_SCREENS = not args.redraw and STATIC_SCREENS
+    if args.results:
+        RESULT_FORMATS = [f.strip() for f in args.results.split(',') if f.strip()]
+        unknown = [f for f in RESULT_FORMATS if f not in RESULT_SINKS]
+        if unknown:
+            parser.error(f"bilinmeyen sonuç biçimi: {', '.join(unknown)}")
+    if args.flush_sec is not None:
+        RESULT_FLUSH_SEC = args.flush_sec
+    RESULT_FSYNC = args.fsync or RESULT_FSYNC
+    PROFILE_MODE = args.profile or PROFILE_MODE
+    FONT_ATLAS = not args.no_font_atlas and FONT_ATLAS
+    DATA_DIR = get_data_dir()
+    CACHE_DIR = get_cache_dir()
+
+    if args.pack_bundle is not None:
+        pack_bundle(STIM_ROOT, args.pack_bundle or None, workers=args.workers)
+    elif args.build_cache:
+        if not CACHE_DIR:
+            print("[Uyarı] Önbellek klasörü oluşturulamadı.")
+            sys.exit(1)
+        win_px = get_screen_size() if args.build_cache == 'auto' else parse_size(args.build_cache)
+        build_cache(win_px, workers=args.workers)
+    elif args.build_font_atlas:
+        sizes = ([get_screen_size()] if args.build_font_atlas == 'auto'
+                 else [parse_size(s) for s in args.build_font_atlas.split(',')])
+        if not all(build_font_atlas(win_px) for win_px in sizes):
+            sys.exit(1)
+    else:
+        main()
\ No newline at end of file
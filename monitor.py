@@ -0,0 +1,206 @@
+# monitor.py
+"""
+Laboratuvardaki istasyonların canlı durumunu tek sayfada toplar.
+
+Her istasyon main.py --status (ya da DENEY_IZLEME_PORT) ile GET /durum
+sunar; istasyonlar varsayılan olarak yalnızca 127.0.0.1'i dinler, bu yüzden
+ağdan yoklamak için istasyonda --status-host 0.0.0.0 gerekir. Durumda
+katılımcı rumuzu yoktur, oturumlar oturum numarasıyla görünür. Bu servis
+her istasyonu kendi iş parçacığında, açık tutulan tek bir HTTP/1.1
+bağlantısıyla belirli aralıkla yoklar ve son yanıtları bellekte tutar;
+sayfa ve /durum.json istekleri istasyonlara yeni istek göndermez.
+
+Kullanım:
+    python monitor.py 10.0.0.11 10.0.0.12:8766          # http://127.0.0.1:8080
+    python monitor.py --stations istasyonlar.txt --port 8080
+    python monitor.py 10.0.0.11 --once                  # tabloyu bir kez yazdır
+"""
+import sys, json, time, argparse, threading, http.client
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from main import STATUS_DEFAULT_PORT
+
+DEFAULT_PORT = 8080
+POLL_SEC = 1.0
+TIMEOUT_SEC = 1.0
+
+PAGE = """<!doctype html>
+<html lang="tr"><head><meta charset="utf-8"><title>İstasyonlar</title>
+<style>
+ body { font-family: sans-serif; margin: 1em; }
+ table { border-collapse: collapse; }
+ th, td { padding: 4px 10px; border-bottom: 1px solid #ccc; text-align: left; }
+ tr.kapali td { color: #999; }
+ tr.uyari td { background: #fde2e2; }
+</style></head>
+<body><h2>İstasyonlar <small id="saat"></small></h2>
+<table><thead><tr>
+ <th>İstasyon</th><th>Oturum</th><th>Faz</th><th>Set</th><th>Hedef</th><th>Madde</th>
+ <th>Ekranda (sn)</th><th>Geçen (dk)</th><th>Son RT medyan (sn)</th><th>Atlanan kare</th>
+ <th>Yazıcı kuyruğu</th><th>Gönderim kuyruğu</th><th>Yanıt</th>
+</tr></thead><tbody id="satirlar"></tbody></table>
+<script>
+function h(v) { return v === undefined || v === null ? '' : String(v); }
+async function yenile() {
+  try {
+    const r = await fetch('durum.json', {cache: 'no-store'});
+    const d = await r.json();
+    const rows = Object.keys(d).sort().map(function (k) {
+      const s = d[k], x = s.durum || {};
+      const cls = !s.ulasilabilir ? 'kapali' : (x.atlanan > 0 || x.yazici_kuyrugu > 20 ? 'uyari' : '');
+      const cells = [k, x.oturum, x.faz, x.set ? x.set + '/' + x.set_toplam : '', x.hedef, x.madde,
+        x.ekran_sn, x.gecen_sn !== undefined ? (x.gecen_sn / 60).toFixed(1) : '',
+        x.son_rt_medyan !== undefined && x.son_rt_medyan !== null ? x.son_rt_medyan.toFixed(2) : '',
+        x.atlanan, x.yazici_kuyrugu, x.gonderim_kuyrugu,
+        s.ulasilabilir ? s.gecikme_ms + ' ms' : (s.hata || 'yok')];
+      return '<tr class="' + cls + '">' + cells.map(function (c) {
+        return '<td>' + h(c).replace(/</g, '&lt;') + '</td>'; }).join('') + '</tr>';
+    });
+    document.getElementById('satirlar').innerHTML = rows.join('');
+    document.getElementById('saat').textContent = new Date().toLocaleTimeString();
+  } catch (e) {}
+}
+yenile(); setInterval(yenile, POLL_MS);
+</script></body></html>
+"""
+
+
+class StationPoller:
+    """Tek istasyonu açık bir bağlantıyla yoklar; son durumu saklar"""
+
+    def __init__(self, address, interval=POLL_SEC):
+        host, _, port = address.partition(':')
+        self.address = address
+        self.host, self.port = host, int(port or STATUS_DEFAULT_PORT)
+        self.interval = interval
+        self.conn = None
+        self.state = {'ulasilabilir': False, 'hata': 'henüz yoklanmadı'}
+
+    def poll(self):
+        t0 = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=TIMEOUT_SEC)
+            self.conn.request('GET', '/durum')
+            resp = self.conn.getresponse()
+            body = resp.read()
+            if resp.status != 200:
+                raise OSError(f"HTTP {resp.status}")
+            self.state = {'ulasilabilir': True, 'durum': json.loads(body),
+                          'gecikme_ms': round((time.perf_counter() - t0) * 1000, 1),
+                          'son_gorulme': time.time()}
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+            last = self.state.get('durum')
+            self.state = {'ulasilabilir': False, 'hata': str(e) or type(e).__name__,
+                          'son_gorulme': self.state.get('son_gorulme')}
+            if last is not None:
+                self.state['durum'] = last   # son bilinen durum soluk gösterilir
+        return self.state
+
+    def run(self, stop):
+        while not stop.is_set():
+            t0 = time.monotonic()
+            self.poll()
+            stop.wait(max(0.0, self.interval - (time.monotonic() - t0)))
+
+
+class Monitor:
+    """İstasyon yoklayıcılarını çalıştırır; sayfaya son durumları verir"""
+
+    def __init__(self, addresses, interval=POLL_SEC):
+        self.pollers = [StationPoller(a, interval) for a in addresses]
+        self.interval = interval
+        self.stop = threading.Event()
+
+    def start(self):
+        for p in self.pollers:
+            threading.Thread(target=p.run, args=(self.stop,), name=f"yoklama_{p.address}",
+                             daemon=True).start()
+
+    def poll_once(self):
+        with ThreadPoolExecutor(max_workers=min(32, len(self.pollers) or 1)) as pool:
+            list(pool.map(StationPoller.poll, self.pollers))
+        return self.snapshot()
+
+    def snapshot(self):
+        return {p.address: p.state for p in self.pollers}
+
+
+class MonitorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status, body, ctype):
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path in ('', '/index.html'):
+            page = PAGE.replace('POLL_MS', str(int(self.server.monitor.interval * 1000)))
+            return self._reply(200, page.encode('utf-8'), 'text/html; charset=utf-8')
+        if path == '/durum.json':
+            body = json.dumps(self.server.monitor.snapshot(), ensure_ascii=False).encode('utf-8')
+            return self._reply(200, body, 'application/json; charset=utf-8')
+        self._reply(404, b'{}', 'application/json')
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def read_stations(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+
+def print_table(snapshot):
+    cols = ['oturum', 'faz', 'set', 'hedef', 'madde', 'ekran_sn', 'son_rt_medyan',
+            'atlanan', 'yazici_kuyrugu']
+    print('\t'.join(['istasyon'] + cols))
+    for address, state in sorted(snapshot.items()):
+        s = state.get('durum') or {}
+        cells = [address] + ['' if s.get(c) is None else str(s.get(c)) for c in cols]
+        if not state['ulasilabilir']:
+            cells.append(f"[ulaşılamıyor: {state.get('hata')}]")
+        print('\t'.join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="İstasyonların canlı durum sayfası")
+    parser.add_argument('stations', nargs='*', help=f"host[:port] (varsayılan port {STATUS_DEFAULT_PORT})")
+    parser.add_argument('--stations', dest='stations_file', default=None, metavar='DOSYA',
+                        help="Satır başına bir host[:port] içeren dosya")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Sayfanın dinlediği adres (ağdan erişim için açıkça 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--interval', type=float, default=POLL_SEC, help="Yoklama aralığı (sn)")
+    parser.add_argument('--once', action='store_true', help="Bir kez yokla, tabloyu yazdır ve çık")
+    args = parser.parse_args()
+
+    addresses = list(args.stations) + (read_stations(args.stations_file) if args.stations_file else [])
+    if not addresses:
+        parser.error("en az bir istasyon gerekli")
+    monitor = Monitor(addresses, args.interval)
+    if args.once:
+        snapshot = monitor.poll_once()
+        print_table(snapshot)
+        sys.exit(0 if all(s['ulasilabilir'] for s in snapshot.values()) else 1)
+
+    monitor.start()
+    server = ThreadingHTTPServer((args.host, args.port), MonitorHandler)
+    server.daemon_threads = True
+    server.monitor = monitor
+    print(f"[İzleme] {len(addresses)} istasyon, sayfa: http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop.set()
+        server.server_close()
@@ -0,0 +1,250 @@
+# scoring.py
+"""
+TIPI puanlama: tüm *_sonuclar.csv dosyalarını okuyup beş özellik puanını
+(değerlendiren x hedef) tek bir vektörel geçişte hesaplar.
+
+Likert yanıtları katılımcı (oturum) x set x madde boyutlu bir NumPy dizisine
+yerleştirilir; ters maddeler 8 - x ile çevrilir ve özellik puanları madde ->
+özellik gösterge matrisiyle tek bir matris çarpımında ortalanır. Arkadaşlık
+yanıtı ve demografik bilgiler aynı tabloya eklenir.
+
+Kullanım:
+    python scoring.py                       # Documents/DeneyVerileri -> tipi_puanlari.csv
+    python scoring.py --data-dir D --out puanlar.csv --key standart
+    python scoring.py --store               # ingest.py deposundan (artımlı)
+"""
+import os, csv, json, glob, argparse
+
+import numpy as np
+
+from main import get_data_dir, LIKERT_QUESTIONS, LIKERT_KEYS
+
+RESULT_COLUMNS = ["participant", "timestamp", "phase",
+                  "set_index", "item_index", "item_text",
+                  "response_key", "response_label", "rt_sec"]
+
+TRAITS = ["disadonukluk", "uyumluluk", "sorumluluk", "duygusal_denge", "deneyime_aciklik"]
+
+# Madde (1-10) -> (özellik, ters puanlanır mı)
+#
+# 'uygulanan': LIKERT_QUESTIONS'taki ifadelere göre. Bu form yayımlanmış TIPI
+# sırasını izlemiyor: 6-10. maddeler yeniden yazılmış (ör. 7 "tembel" ters
+# sorumluluk, 10 "düzenli, titiz" düz sorumluluk), bu yüzden ters maddeler
+# 2, 4, 6, 7, 8'dir.
+# 'standart': yayımlanmış TIPI anahtarı (Gosling vd., 2003; ters: 2, 4, 6, 8, 10).
+TIPI_KEYS = {
+    'uygulanan': {
+        1: ("disadonukluk", False),       # dışa dönük, sosyal, konuşkan
+        2: ("uyumluluk", True),           # eleştirel, tartışmacı
+        3: ("sorumluluk", False),         # güvenilir, öz-disiplinli
+        4: ("duygusal_denge", True),      # endişeli, kolay üzülen
+        5: ("deneyime_aciklik", False),   # yaratıcı, yeni fikirlere açık
+        6: ("uyumluluk", True),           # ilgili ve yardımsever olmayan
+        7: ("sorumluluk", True),          # tembel
+        8: ("deneyime_aciklik", True),    # yeni deneyimlere açık olmayan, geleneksel
+        9: ("uyumluluk", False),          # kolayca anlaşan, nazik
+        10: ("sorumluluk", False),        # düzenli, titiz
+    },
+    'standart': {
+        1: ("disadonukluk", False), 6: ("disadonukluk", True),
+        2: ("uyumluluk", True), 7: ("uyumluluk", False),
+        3: ("sorumluluk", False), 8: ("sorumluluk", True),
+        4: ("duygusal_denge", True), 9: ("duygusal_denge", False),
+        5: ("deneyime_aciklik", False), 10: ("deneyime_aciklik", True),
+    },
+}
+
+N_ITEMS = len(LIKERT_QUESTIONS)
+SCALE_MAX = len(LIKERT_KEYS)
+DEMOGRAPHIC_LABELS = ["Yaş", "Eğitim durumu", "Meslek"]
+
+
+def find_result_files(data_dir):
+    return sorted(glob.glob(os.path.join(data_dir, '*_sonuclar.csv')))
+
+
+def read_results(paths):
+    """Sonuç CSV'lerini sütun dizilerine okur.
+
+    Dönen sözlükte her sütun bir NumPy dizisidir; 'session' satırın hangi
+    dosyadan (oturumdan) geldiğini gösteren tamsayı indeksidir.
+    """
+    columns = {name: [] for name in RESULT_COLUMNS}
+    session = []
+    sessions = []
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = [r for r in reader if r]
+        if not header or not rows:
+            continue
+        idx = [header.index(c) if c in header else None for c in RESULT_COLUMNS]
+        cols = list(zip(*[r + [''] * (len(header) - len(r)) for r in rows]))
+        for name, i in zip(RESULT_COLUMNS, idx):
+            columns[name].extend(cols[i] if i is not None else [''] * len(rows))
+        session.extend([len(sessions)] * len(rows))
+        sessions.append(path)
+    table = {name: np.asarray(vals, dtype=str) for name, vals in columns.items()}
+    table['session'] = np.asarray(session, dtype=np.int64)
+    table['sessions'] = sessions
+    return table
+
+
+def to_int(values, fill=-1):
+    """Metin dizisini tamsayıya çevirir; sayı olmayanlar fill olur"""
+    values = np.char.strip(values.astype(str))
+    ok = np.char.isdigit(values)
+    out = np.full(values.shape, fill, dtype=np.int64)
+    out[ok] = values[ok].astype(np.int64)
+    return out
+
+
+def session_info(table):
+    """Oturum başına katılımcı, zaman damgası ve demografik bilgiler"""
+    n = len(table['sessions'])
+    info = {'participant': np.full(n, '', dtype=object),
+            'timestamp': np.full(n, '', dtype=object)}
+    sess = table['session']
+    info['participant'][sess] = table['participant']
+    info['timestamp'][sess] = table['timestamp']
+    demo = table['phase'] == 'demographics'
+    for label in DEMOGRAPHIC_LABELS:
+        col = np.full(n, '', dtype=object)
+        m = demo & (table['item_text'] == label)
+        col[sess[m]] = table['response_key'][m]
+        info[label] = col
+    return info
+
+
+def likert_tensor(table):
+    """Likert yanıtlarını (oturum, hedef, madde) float32 dizisine yerleştirir.
+
+    Eksik yanıtlar NaN'dır. Hedefler sonuçlardaki set_index değerleridir;
+    (tensör, hedef set_index dizisi) döndürür.
+    """
+    m = table['phase'] == 'likert'
+    set_index = to_int(table['set_index'][m])
+    item = to_int(table['item_index'][m]) - 1
+    resp = to_int(table['response_key'][m])
+    ok = (set_index >= 0) & (item >= 0) & (item < N_ITEMS) & (resp >= 1) & (resp <= SCALE_MAX)
+    targets, target_idx = np.unique(set_index[ok], return_inverse=True)
+    X = np.full((len(table['sessions']), len(targets), N_ITEMS), np.nan, dtype=np.float32)
+    X[table['session'][m][ok], target_idx, item[ok]] = resp[ok]
+    return X, targets
+
+
+def friendship_matrix(table, targets):
+    """Arkadaşlık yanıtları (oturum, hedef): 1=Evet, 0=Hayır, NaN=yok"""
+    m = table['phase'] == 'friendship'
+    set_index = to_int(table['set_index'][m])
+    F = np.full((len(table['sessions']), len(targets)), np.nan, dtype=np.float32)
+    pos = np.searchsorted(targets, set_index)
+    ok = (pos < len(targets)) & (targets[np.minimum(pos, len(targets) - 1)] == set_index)
+    F[table['session'][m][ok], pos[ok]] = (table['response_key'][m][ok] == 'e')
+    return F
+
+
+def key_arrays(key='uygulanan'):
+    """(ters madde maskesi (madde,), madde -> özellik gösterge matrisi (madde, özellik))"""
+    mapping = TIPI_KEYS[key]
+    reverse = np.zeros(N_ITEMS, dtype=bool)
+    W = np.zeros((N_ITEMS, len(TRAITS)), dtype=np.float32)
+    for item, (trait, rev) in mapping.items():
+        reverse[item - 1] = rev
+        W[item - 1, TRAITS.index(trait)] = 1.0
+    return reverse, W
+
+
+def score_tipi(X, key='uygulanan'):
+    """(..., madde) yanıtlarından (..., özellik) TIPI puanlarını hesaplar.
+
+    Ters maddeler (SCALE_MAX + 1) - x ile çevrilir; her özellik puanı o
+    özelliğe ait yanıtlanmış maddelerin ortalamasıdır (hiç yoksa NaN).
+    """
+    reverse, W = key_arrays(key)
+    X = np.where(reverse, (SCALE_MAX + 1) - X, X)
+    valid = ~np.isnan(X)
+    flat = np.where(valid, X, 0).reshape(-1, N_ITEMS)
+    sums = flat @ W
+    counts = valid.reshape(-1, N_ITEMS).astype(np.float32) @ W
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(counts > 0, sums / counts, np.nan)
+    return scores.reshape(X.shape[:-1] + (len(TRAITS),)).astype(np.float32)
+
+
+def score_results(table, key='uygulanan'):
+    """Tüm oturumlar için puanlanmış tabloyu sütun sözlüğü olarak döndürür"""
+    X, targets = likert_tensor(table)
+    scores = score_tipi(X, key)
+    F = friendship_matrix(table, targets)
+    info = session_info(table)
+
+    n_answered = (~np.isnan(X)).sum(axis=2)
+    sess, tgt = np.nonzero(n_answered > 0)
+    out = {
+        'participant': info['participant'][sess],
+        'timestamp': info['timestamp'][sess],
+        'set_index': targets[tgt],
+        'n_items': n_answered[sess, tgt],
+    }
+    for ti, trait in enumerate(TRAITS):
+        out[trait] = scores[sess, tgt, ti]
+    out['friendship'] = F[sess, tgt]
+    for label in DEMOGRAPHIC_LABELS:
+        out[label] = info[label][sess]
+    return out
+
+
+def format_value(v):
+    """Tablo hücresi: NaN boş, diğer ondalıklar 4 anlamlı basamak"""
+    if isinstance(v, (float, np.floating)):
+        return '' if np.isnan(v) else f"{v:.4g}"
+    return v
+
+
+def read_json(path, default):
+    """JSON dosyasını okur; yoksa ya da bozuksa default"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def write_json(path, obj):
+    """Geçici dosyaya yazıp yerine taşır (yarım dosya kalmaz)"""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def write_table(out, path):
+    names = list(out)
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        w = csv.writer(f)
+        w.writerow(names)
+        w.writerows([format_value(v) for v in row] for row in zip(*(out[n].tolist() for n in names)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TIPI puanlama")
+    parser.add_argument('--data-dir', default=None, help="Sonuç klasörü (varsayılan: DeneyVerileri)")
+    parser.add_argument('--out', default='tipi_puanlari.csv')
+    parser.add_argument('--key', choices=sorted(TIPI_KEYS), default='uygulanan',
+                        help="Puanlama anahtarı")
+    parser.add_argument('--store', nargs='?', const='', default=None,
+                        help="CSV'ler yerine sütunlu depodan oku (önce yeni oturumları aktarır)")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or get_data_dir()
+    if args.store is not None:
+        from ingest import ColumnStore, default_store, load_table
+        store = ColumnStore(args.store or default_store(data_dir))
+        store.ingest(data_dir)
+        table = load_table(store)
+    else:
+        table = read_results(find_result_files(data_dir))
+    out = score_results(table, args.key)
+    write_table(out, args.out)
+    print(f"[Puanlama] {len(table['sessions'])} oturum, {len(out['set_index'])} satır -> {args.out}")
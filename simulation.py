@@ -0,0 +1,540 @@
+# simulation.py
+"""
+Başsız (headless) simüle katılımcı modu.
+
+PsychoPy yerine sahte bir arka uç (visual, core, event, gui, logging,
+hardware.keyboard) yükler ve main.main()'i betiklenmiş bir katılımcıyla
+çalıştırır. Pencere ekranda açılmaz; zaman sanaldır (win.flip bir sonraki
+vsync'e, core.wait istenen süre kadar ilerler), bu yüzden 10 saniyelik
+fotoğraflar beklenmez. Görsel çözme, doku hazırlama ve CSV yazma gibi işler
+ise gerçekten yapılır ve ölçülebilir.
+
+Sonuç, plan ve çizim seçenekleri main.py'deki adlarıyla aktarılır (katılımcı
+tohumu --seed olduğu için plan tohumu --plan-seed'dir).
+
+Kullanım:
+    python simulation.py --data-dir /tmp/veri --seed 1
+    python simulation.py --data-dir /tmp/veri --results csv,sqlite --flush-sec 1 --plan latin --session 4
+"""
+import sys, os, math, random, time, types, argparse, importlib
+
+import numpy as np
+from PIL import Image
+
+
+# ------------------ Simüle katılımcı ------------------
+# Tepki süresi profilleri: (medyan sn, log-normal sigma)
+DEFAULT_RT = {
+    'consent': (20.0, 0.3),
+    'photo': (4.0, 0.5),
+    'likert': (2.5, 0.4),
+    'friend': (1.5, 0.4),
+}
+
+class SimulatedParticipant:
+    """Demografik bilgileri, onamı ve Likert/arkadaşlık yanıtlarını üretir.
+
+    skip_prob: fotoğrafı süre dolmadan geçme olasılığı
+    click_prob: yanıtı klavye yerine fareyle verme olasılığı
+    """
+
+    def __init__(self, seed=None, rt=None, skip_prob=0.3, click_prob=0.3,
+                 consent=True, demographics=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rt = dict(DEFAULT_RT, **(rt or {}))
+        self.skip_prob = skip_prob
+        self.click_prob = click_prob
+        self.consent = consent
+        self.demographics = demographics or [
+            f"sim{self.rng.randrange(10**6):06d}",
+            str(self.rng.randint(18, 65)),
+            self.rng.choice(["Lisans", "Yüksek Lisans", "Lise"]),
+            self.rng.choice(["Psikolog", "Öğrenci", "Mühendis", "Öğretmen"]),
+        ]
+        self._consent_done = False
+
+    def draw_rt(self, kind):
+        median, sigma = self.rt[kind]
+        return median * math.exp(sigma * self.rng.gauss(0.0, 1.0))
+
+    def plan(self, key_list):
+        """Ekrandaki geçerli tuşlara göre (tür, tuş, rt, fareyle_mi) planı döndürür"""
+        via_mouse = self.rng.random() < self.click_prob
+        if 's' in key_list:
+            if self.rng.random() >= self.skip_prob:
+                return ('photo', None, None, False)  # süre dolana kadar bak
+            return ('photo', 's', self.draw_rt('photo'), via_mouse)
+        if '1' in key_list:
+            return ('likert', self.rng.choice(key_list[:7]), self.draw_rt('likert'), via_mouse)
+        if not self._consent_done:
+            self._consent_done = True
+            return ('consent', 'e' if self.consent else 'h', self.draw_rt('consent'), via_mouse)
+        return ('friend', self.rng.choice(['e', 'h']), self.draw_rt('friend'), via_mouse)
+
+
+# ------------------ Sanal zaman ------------------
+class _SimState:
+    def __init__(self):
+        self.reset(None)
+
+    def reset(self, participant, refresh_hz=60.0, win_size=(1920, 1080), time_scale=0.0,
+              drop_prob=0.0, seed=None):
+        self.participant = participant
+        self.refresh_hz = refresh_hz
+        self.drop_prob = drop_prob    # flip başına bir kare kaçırma olasılığı
+        self.rng = random.Random(seed)
+        self.time_scale = time_scale  # sanal saniye başına gerçek uyku (0 = beklemeden)
+        self.win_size = win_size
+        self.now = 0.0
+        self.onset = None        # son uyaran başlangıcı (sanal)
+        self.plan = None
+        self.delivered = False
+        self.key_list = None
+        self.window = None
+        self.log = []
+        self.log_files = []
+        self.first_flip_perf = None
+        self.frames = []         # (sanal zaman, çizim sayısı, çizim->flip gerçek sn, onset mi)
+        self.images_bound = 0
+
+STATE = _SimState()
+
+
+def _new_screen():
+    STATE.onset = STATE.now
+    STATE.plan = None
+    STATE.delivered = False
+
+def _current_plan(key_list):
+    if STATE.plan is None and STATE.participant is not None and key_list:
+        STATE.plan = STATE.participant.plan([k for k in key_list if k != 'escape'])
+        STATE.key_list = key_list
+    return STATE.plan
+
+def _elapsed():
+    return STATE.now - (STATE.onset if STATE.onset is not None else 0.0)
+
+SCREEN_TIMEOUT_SEC = 600.0   # yanıtı hiç gelmeyen ekranda simülasyonu durdur
+
+def _advance(to):
+    """Sanal saati ilerletir; time_scale > 0 ise gerçek zamanda da bekler"""
+    if STATE.time_scale and to > STATE.now:
+        time.sleep((to - STATE.now) * STATE.time_scale)
+    STATE.now = to
+    if _elapsed() > SCREEN_TIMEOUT_SEC:
+        raise RuntimeError(f"Simülasyon takıldı: {SCREEN_TIMEOUT_SEC:.0f} sn yanıt yok "
+                           f"(plan={STATE.plan})")
+
+
+# ------------------ Sahte psychopy.core ------------------
+class Clock:
+    def __init__(self):
+        self._t0 = STATE.now
+
+    def reset(self, newT=0.0):
+        self._t0 = STATE.now + newT
+
+    def getTime(self):
+        return STATE.now - self._t0
+
+def _core_getTime():
+    return STATE.now
+
+def _core_wait(secs, hogCPUperiod=0.2):
+    _advance(STATE.now + max(0.0, secs))
+
+def _core_quit():
+    sys.exit(0)
+
+
+# ------------------ Sahte psychopy.visual ------------------
+class Window:
+    def __init__(self, fullscr=True, color='black', units='height', size=None, **kwargs):
+        self.size = np.array(size or STATE.win_size)
+        self.units = units
+        self.color = color
+        self.mouseVisible = True
+        self._toCall = []
+        self._draw_start = None
+        self._draws = 0
+        self.frames = 0
+        self.monitorFramePeriod = 1.0 / STATE.refresh_hz
+        self.refreshThreshold = self.monitorFramePeriod * 1.2
+        self.recordFrameIntervals = False
+        self.frameIntervals = []
+        self.nDroppedFrames = 0
+        self.lastFrameT = None
+        STATE.window = self
+
+    def _on_draw(self):
+        if self._draw_start is None:
+            self._draw_start = time.perf_counter()
+        self._draws += 1
+
+    def callOnFlip(self, function, *args, **kwargs):
+        self._toCall.append((function, args, kwargs))
+
+    def clearBuffer(self, *args, **kwargs):
+        pass
+
+    def flip(self, clearBuffer=True):
+        work = time.perf_counter() - self._draw_start if self._draw_start else 0.0
+        frame = 1.0 / STATE.refresh_hz
+        missed = 1 if STATE.drop_prob and STATE.rng.random() < STATE.drop_prob else 0
+        _advance((math.floor(STATE.now / frame + 1e-9) + 1 + missed) * frame)
+        onset = bool(self._toCall)
+        calls, self._toCall = self._toCall, []
+        for function, args, kwargs in calls:
+            function(*args, **kwargs)
+        if self.recordFrameIntervals:
+            if self.lastFrameT is not None:
+                self.frameIntervals.append(STATE.now - self.lastFrameT)
+                if self.frameIntervals[-1] > self.refreshThreshold:
+                    self.nDroppedFrames += 1
+            self.lastFrameT = STATE.now
+        STATE.frames.append((STATE.now, self._draws, work, onset))
+        if STATE.first_flip_perf is None:
+            STATE.first_flip_perf = time.perf_counter()
+        self._draw_start = None
+        self._draws = 0
+        self.frames += 1
+        return STATE.now
+
+    def close(self):
+        pass
+
+
+class _Stim:
+    def __init__(self, win, **kwargs):
+        self.win = win
+        self.__dict__.update(kwargs)
+
+    def draw(self):
+        self.win._on_draw()
+
+class TextStim(_Stim):
+    def __init__(self, win, text='', **kwargs):
+        super().__init__(win, text=text, **kwargs)
+
+class Rect(_Stim):
+    pass
+
+class ImageStim(_Stim):
+    """Gerçek PsychoPy gibi görüntüyü dokuya yüklenecek diziye çevirir"""
+
+    def __init__(self, win, image=None, **kwargs):
+        super().__init__(win, **kwargs)
+        self.image = image
+
+    @property
+    def image(self):
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+        if value is None:
+            self._tex = None
+            return
+        if isinstance(value, str):
+            with Image.open(value) as img:
+                value = img.convert('RGB')
+        self._tex = np.ascontiguousarray(
+            np.asarray(value.transpose(Image.FLIP_TOP_BOTTOM), dtype=np.uint8))
+        STATE.images_bound += 1
+
+    def clearTextures(self):
+        self._tex = None
+
+class BufferImageStim(_Stim):
+    def __init__(self, win, stim=(), rect=(-1, 1, 1, -1), pos=(0, 0), **kwargs):
+        super().__init__(win, rect=rect, pos=pos, **kwargs)
+        for s in stim:
+            s.draw()
+        win._draw_start = None
+        win._draws = 0
+
+
+# ------------------ Sahte psychopy.event ------------------
+class Mouse:
+    HOLD_SEC = 0.08
+
+    def __init__(self, win=None, **kwargs):
+        self.win = win
+
+    def clickReset(self, buttons=(0, 1, 2)):
+        _new_screen()
+
+    def _click(self):
+        plan = STATE.plan
+        if plan is None or not plan[3] or plan[2] is None or STATE.delivered:
+            return None
+        return plan
+
+    def getPressed(self, getTime=False):
+        pressed, times = [0, 0, 0], [0.0, 0.0, 0.0]
+        plan = self._click()
+        if plan is not None and plan[2] <= _elapsed() < plan[2] + self.HOLD_SEC:
+            pressed[0], times[0] = 1, plan[2]
+        elif plan is not None and _elapsed() >= plan[2] + self.HOLD_SEC:
+            STATE.delivered = True  # bırakıldı -> getPos ile isabet testi
+            self._release_plan = plan
+        if getTime:
+            return pressed, times
+        return pressed
+
+    def getPos(self):
+        plan = getattr(self, '_release_plan', None)
+        if plan is None:
+            return (0.0, 0.0)
+        self._release_plan = None
+        return _target_pos(plan)
+
+    def setVisible(self, visible):
+        pass
+
+
+def _target_pos(plan):
+    """Fareyle verilen yanıt için tıklanacak konum (buton merkezi ya da fotoğraf)"""
+    kind, key = plan[0], plan[1]
+    if kind == 'photo':
+        return (0.0, 0.0)
+    registry = getattr(STATE.window, 'stim_registry', None)
+    group = {'likert': 'likert', 'friend': 'friend', 'consent': 'consent'}[kind]
+    if registry is not None:
+        for btn in registry._stims.get(('buttons', group), []):
+            if btn['key'] == key:
+                return (btn['x'], btn.get('y', -0.25))
+    return (10.0, 10.0)  # buton bulunamadı -> ıska
+
+
+def _event_clearEvents(eventType=None):
+    pass
+
+def _event_getKeys(keyList=None, timeStamped=False, **kwargs):
+    return []
+
+def _event_waitKeys(maxWait=float('inf'), keyList=None, timeStamped=False, **kwargs):
+    kb = Keyboard()
+    while True:
+        keys = kb.getKeys(keyList=keyList)
+        if keys:
+            return [(k.name, STATE.now) if timeStamped else k.name for k in keys]
+        _core_wait(0.01)
+
+
+# ------------------ Sahte psychopy.hardware.keyboard ------------------
+class _OnsetClock(Clock):
+    def reset(self, newT=0.0):
+        super().reset(newT)
+        _new_screen()
+
+class KeyPress:
+    def __init__(self, name, rt):
+        self.name = name
+        self.rt = rt
+        self.tDown = rt
+        self.duration = None
+
+class Keyboard:
+    def __init__(self, *args, **kwargs):
+        self.clock = _OnsetClock()
+
+    def clearEvents(self, eventType=None):
+        pass
+
+    def getKeys(self, keyList=None, waitRelease=True, clear=True):
+        plan = _current_plan(keyList)
+        if (plan is None or plan[1] is None or plan[3] or STATE.delivered
+                or _elapsed() < plan[2]):
+            return []
+        STATE.delivered = True
+        return [KeyPress(plan[1], plan[2])]
+
+
+# ------------------ Sahte psychopy.gui ------------------
+class Dlg:
+    def __init__(self, title='', **kwargs):
+        self.title = title
+        self.fields = []
+        self.OK = False
+
+    def addField(self, label, initial='', **kwargs):
+        self.fields.append(label)
+
+    def addText(self, text, **kwargs):
+        pass
+
+    def show(self):
+        self.OK = True
+        if not self.fields:
+            return None
+        values = list(STATE.participant.demographics) if STATE.participant else []
+        return (values + [''] * len(self.fields))[:len(self.fields)]
+
+
+# ------------------ Sahte psychopy.logging ------------------
+class _Console:
+    stream = None
+
+    def setLevel(self, level):
+        pass
+
+class LogFile:
+    def __init__(self, f=None, level=20, filemode='a', **kwargs):
+        self.level = level
+        self.stream = open(f, filemode, encoding='utf-8') if f else None
+        STATE.log_files.append(self)
+
+def _make_log(level):
+    def log(msg, t=None, obj=None):
+        STATE.log.append((level, msg))
+        for lf in STATE.log_files:
+            if lf.stream and level >= lf.level:
+                lf.stream.write(f"{STATE.now:.4f} \t{level}\t{msg}\n")
+    return log
+
+def _log_flush():
+    for lf in STATE.log_files:
+        if lf.stream:
+            lf.stream.flush()
+
+
+def build_fake_psychopy():
+    """Sahte psychopy paketini ve alt modüllerini oluşturur"""
+    def mod(name, **attrs):
+        m = types.ModuleType(name)
+        m.__dict__.update(attrs)
+        return m
+
+    core = mod('psychopy.core', Clock=Clock, getTime=_core_getTime,
+               wait=_core_wait, quit=_core_quit)
+    visual = mod('psychopy.visual', Window=Window, TextStim=TextStim, Rect=Rect,
+                 ImageStim=ImageStim, BufferImageStim=BufferImageStim)
+    event = mod('psychopy.event', Mouse=Mouse, clearEvents=_event_clearEvents,
+                getKeys=_event_getKeys, waitKeys=_event_waitKeys)
+    gui = mod('psychopy.gui', Dlg=Dlg)
+    logging = mod('psychopy.logging', CRITICAL=50, ERROR=40, WARNING=30, DATA=25,
+                  EXP=22, INFO=20, DEBUG=10, console=_Console(), LogFile=LogFile,
+                  critical=_make_log(50), error=_make_log(40), warning=_make_log(30),
+                  data=_make_log(25), exp=_make_log(22), info=_make_log(20),
+                  debug=_make_log(10), flush=_log_flush)
+    keyboard = mod('psychopy.hardware.keyboard', Keyboard=Keyboard, KeyPress=KeyPress)
+    hardware = mod('psychopy.hardware', keyboard=keyboard)
+    psychopy = mod('psychopy', core=core, visual=visual, event=event, gui=gui,
+                   logging=logging, hardware=hardware, __path__=[])
+    return {'psychopy': psychopy, 'psychopy.core': core, 'psychopy.visual': visual,
+            'psychopy.event': event, 'psychopy.gui': gui, 'psychopy.logging': logging,
+            'psychopy.hardware': hardware, 'psychopy.hardware.keyboard': keyboard}
+
+
+def load_app():
+    """Sahte arka ucu kurar ve main modülünü ona bağlı olarak yükler"""
+    fakes = build_fake_psychopy()
+    sys.modules.update(fakes)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    app = importlib.import_module('main')
+    # main daha önce gerçek PsychoPy ile yüklendiyse de sahte modüllere yönlendir
+    for name in ('visual', 'core', 'event', 'gui', 'logging'):
+        setattr(app, name, fakes['psychopy.' + name])
+    app.keyboard = fakes['psychopy.hardware.keyboard']
+    return app
+
+
+def run_session(app, participant, data_dir, stim_root=None, cache_dir=None,
+                refresh_hz=60.0, win_size=(1920, 1080), time_scale=0.0, drop_prob=0.0):
+    """Bir simüle oturumu çalıştırır; (çıkış kodu, sonuç CSV yolu) döndürür"""
+    STATE.reset(participant, refresh_hz=refresh_hz, win_size=win_size, time_scale=time_scale,
+                drop_prob=drop_prob, seed=getattr(participant, 'seed', None))
+    app.DATA_DIR = data_dir
+    if stim_root:
+        app.STIM_ROOT = stim_root
+    app.CACHE_DIR = cache_dir
+    before = set(os.listdir(data_dir)) if os.path.isdir(data_dir) else set()
+    code = 0
+    try:
+        app.main()
+    except SystemExit as e:
+        code = e.code or 0
+    finally:
+        for lf in STATE.log_files:
+            if lf.stream:
+                lf.stream.close()
+    new = sorted(set(os.listdir(data_dir)) - before)
+    results = [os.path.join(data_dir, f) for f in new if f.endswith('_sonuclar.csv')]
+    return code, (results[0] if results else None)
+
+
+def parse_rt(text):
+    """'2.5,0.4' -> (2.5, 0.4)"""
+    median, sigma = text.split(',')
+    return (float(median), float(sigma))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simüle katılımcıyla başsız oturum")
+    parser.add_argument('--data-dir', required=True, help="Sonuçların yazılacağı klasör")
+    parser.add_argument('--stimuli', default=None, help="Uyaran klasörü (varsayılan: stimuli/)")
+    parser.add_argument('--cache-dir', default=None, help="Doku önbelleği (varsayılan: kapalı)")
+    parser.add_argument('--sessions', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--skip-prob', type=float, default=0.3)
+    parser.add_argument('--click-prob', type=float, default=0.3)
+    parser.add_argument('--refresh', type=float, default=60.0)
+    parser.add_argument('--time-scale', type=float, default=0.0,
+                        help="Sanal saniye başına gerçek bekleme (1 = gerçek zaman, 0 = beklemeden)")
+    parser.add_argument('--drop-prob', type=float, default=0.0,
+                        help="Flip başına bir kare kaçırma olasılığı (zamanlama kaydını denemek için)")
+    parser.add_argument('--profile', nargs='?', const='span', choices=['span', 'cprofile'],
+                        default=None, help="main.py --profile ile aynı (aşama süreleri / cProfile)")
+    # main.py seçenekleri
+    parser.add_argument('--results', default=None, metavar='BICIMLER',
+                        help="Sonuç biçimleri, virgülle: csv,jsonl,sqlite (main.py --results)")
+    parser.add_argument('--flush-sec', type=float, default=None, help="main.py --flush-sec")
+    parser.add_argument('--fsync', action='store_true', help="main.py --fsync")
+    parser.add_argument('--sets', type=int, default=None, help="main.py --sets")
+    parser.add_argument('--images', type=int, default=None, help="main.py --images")
+    parser.add_argument('--plan', choices=['sirali', 'rastgele', 'latin'], default=None,
+                        help="main.py --plan")
+    parser.add_argument('--plan-seed', type=int, default=None, help="main.py --seed (plan tohumu)")
+    parser.add_argument('--session', type=int, default=None,
+                        help="main.py --session; her simüle oturumda bir artar")
+    parser.add_argument('--redraw', action='store_true', help="main.py --redraw")
+    parser.add_argument('--no-font-atlas', action='store_true', help="main.py --no-font-atlas")
+    for kind, (median, sigma) in DEFAULT_RT.items():
+        parser.add_argument(f'--rt-{kind}', type=parse_rt, default=None,
+                            metavar='MEDYAN,SIGMA',
+                            help=f"{kind} tepki süresi (varsayılan {median},{sigma})")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    app = load_app()
+    app.PROFILE_MODE = args.profile
+    if args.results:
+        app.RESULT_FORMATS = [f.strip() for f in args.results.split(',') if f.strip()]
+        unknown = [f for f in app.RESULT_FORMATS if f not in app.RESULT_SINKS]
+        if unknown:
+            parser.error(f"bilinmeyen sonuç biçimi: {', '.join(unknown)}")
+    if args.flush_sec is not None:
+        app.RESULT_FLUSH_SEC = args.flush_sec
+    app.RESULT_FSYNC = args.fsync or app.RESULT_FSYNC
+    app.SETS_PER_SESSION = args.sets or app.SETS_PER_SESSION
+    app.IMAGES_PER_SET = args.images or app.IMAGES_PER_SET
+    app.PLAN_MODE = args.plan or app.PLAN_MODE
+    app.PLAN_SEED = args.plan_seed
+    app.STATIC_SCREENS = not args.redraw and app.STATIC_SCREENS
+    app.FONT_ATLAS = not args.no_font_atlas and app.FONT_ATLAS
+    rt = {k: getattr(args, f'rt_{k}') for k in DEFAULT_RT if getattr(args, f'rt_{k}')}
+    for i in range(args.sessions):
+        seed = None if args.seed is None else args.seed + i
+        if args.session is not None:
+            app.SESSION_NO = args.session + i
+        participant = SimulatedParticipant(seed, rt=rt, skip_prob=args.skip_prob,
+                                           click_prob=args.click_prob)
+        t0 = time.perf_counter()
+        code, results = run_session(app, participant, args.data_dir, args.stimuli,
+                                    args.cache_dir, refresh_hz=args.refresh,
+                                    time_scale=args.time_scale, drop_prob=args.drop_prob)
+        print(f"[Simülasyon] oturum {i+1}: kod={code} süre={time.perf_counter()-t0:.2f} sn "
+              f"sanal={STATE.now:.1f} sn -> {results}")
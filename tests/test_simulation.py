@@ -0,0 +1,57 @@
+# tests/test_simulation.py
+"""Bir simüle oturumu başsız çalıştırıp sonuç ve zamanlama dosyalarını denetler."""
+import os, csv, sys, glob, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETS, IMAGES = 2, 2
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def run_simulation(data_dir, *extra):
+    env = dict(os.environ, HOME=str(data_dir), XDG_CACHE_HOME=str(data_dir / 'onbellek'))
+    cmd = [sys.executable, os.path.join(ROOT, 'simulation.py'), '--data-dir', str(data_dir),
+           '--seed', '1', '--skip-prob', '0', '--click-prob', '0',
+           '--sets', str(SETS), '--images', str(IMAGES), '--plan', 'sirali', *extra]
+    return subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, timeout=300)
+
+
+def test_simulated_session(tmp_path):
+    proc = run_simulation(tmp_path, '--results', 'csv,jsonl', '--flush-sec', '0.5')
+    assert proc.returncode == 0, proc.stderr
+    assert 'kod=0' in proc.stdout
+
+    results = glob.glob(str(tmp_path / '*_sonuclar.csv'))
+    assert len(results) == 1
+    rows = read_csv(results[0])
+    phases = {}
+    for row in rows:
+        phases.setdefault(row['phase'], []).append(row)
+    assert len(phases['consent']) == 1 and phases['consent'][0]['response_key'] == 'e'
+    assert len(phases['demographics']) == 4
+    assert len(phases['plan']) == 1 + SETS
+    assert len(phases['likert']) == 10 * SETS
+    assert len(phases['friendship']) == SETS
+
+    sets = [row['set_index'] for row in phases['plan'][1:]]
+    assert sorted({row['set_index'] for row in phases['likert']}) == sorted(sets)
+    for row in phases['likert']:
+        assert row['response_key'] in '1234567' and float(row['rt_sec']) > 0
+    for row in phases['friendship']:
+        assert row['response_key'] in ('e', 'h')
+
+    # JSONL aynı satırları taşır
+    with open(results[0][:-len('.csv')] + '.jsonl', encoding='utf-8') as f:
+        assert sum(1 for _ in f) == len(rows)
+
+    # Geçilmeyen fotoğraflar planlanan süre kadar (bir kare toleransla) gösterilir
+    timing = read_csv(glob.glob(str(tmp_path / '*_timing.csv'))[0])
+    photos = [row for row in timing if row['screen'] == 'photo']
+    assert len(photos) == SETS * IMAGES
+    for row in photos:
+        period = 1 / float(row['refresh_hz'])
+        assert abs(float(row['exposure_sec']) - float(row['planned_sec'])) <= period + 1e-6
+        assert row['dropped'] in ('', '0')
@@ -0,0 +1,239 @@
+# validate.py
+"""
+Uyaran havuzunun dağıtım öncesi denetimi.
+
+STIM_ROOT altındaki (ya da stimuli.bundle içindeki) her görsel bir süreç
+havuzunda baştan sona çözülür ve şunlar denetlenir:
+  - set başına görsel sayısı (IMAGES_PER_SET), set adı/numarası çakışmaları
+  - çözülemeyen ya da kesik dosyalar
+  - piksel boyutu, en-boy oranı, EXIF yönü, renk modu
+  - birebir aynı dosyalar (SHA-1) ve görsel olarak benzer dosyalar (64 bitlik dHash)
+
+Sonuç makinece okunabilir bir JSON raporudur; 'hata' düzeyinde bulgu varsa
+çıkış kodu 1'dir (derleme adımında dağıtımı durdurmak için).
+
+Kullanım:
+    python validate.py                               # stimuli/ -> <veri>/uyaran_denetimi.json
+    python validate.py --stimuli havuz --out rapor.json --workers 8
+"""
+import io, os, sys, json, time, argparse, hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageOps
+
+import main as app
+
+REPORT_NAME = 'uyaran_denetimi.json'
+MIN_SIDE_PX = 600             # kısa kenarı bundan küçük görseller ekranda bulanık görünür
+ASPECT_RANGE = (0.5, 2.0)     # genişlik / yükseklik
+IMAGE_MODES = ('RGB', 'L')    # diğer modlar (CMYK, P, RGBA, I;16 ...) RGB'ye çevrilerek gösterilir
+SIMILAR_BITS = 4              # dHash Hamming uzaklığı bu değere eşit/küçükse 'benzer'
+HASH_BANDS = 5                # benzer aday çiftleri için dHash bant sayısı (SIMILAR_BITS + 1)
+
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# ------------------ Görsel denetimi (alt süreç) ------------------
+def dhash(img, size=8):
+    """64 bitlik fark özeti: küçültülmüş gri görüntüde yatay komşu karşılaştırmaları"""
+    small = np.asarray(img.convert('L').resize((size + 1, size), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def check_image(img_path):
+    """Görseli tamamen çözer; boyut, mod, yön ve özetleri döndürür"""
+    t0 = time.perf_counter()
+    rec = {'path': img_path}
+    try:
+        src = app.open_image(img_path)
+        if isinstance(src, str):
+            with open(src, 'rb') as f:
+                data = f.read()
+        else:
+            data = src.read()
+        rec['bytes'] = len(data)
+        rec['sha1'] = hashlib.sha1(data).hexdigest()
+        with Image.open(io.BytesIO(data)) as img:
+            rec['format'] = img.format
+            rec['mode'] = img.mode
+            rec['orientation'] = app.exif_orientation(img)
+            img.load()  # kesik/bozuk veri burada hata verir
+            img = ImageOps.exif_transpose(img)
+            rec['width'], rec['height'] = img.size
+            rec['dhash'] = f"{dhash(img):016x}"
+    except Exception as e:
+        rec['hata'] = f"{type(e).__name__}: {e}"
+    rec['sure_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+    return rec
+
+
+def hamming(a, b):
+    """uint64 özet dizileri arasındaki bit farkı (yayınlanarak)"""
+    x = np.ascontiguousarray(a ^ b)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+
+# ------------------ Bulgular ------------------
+def _issue(level, code, path, detail):
+    return {'duzey': level, 'kod': code, 'yol': path, 'ayrinti': detail}
+
+
+def check_sets(stim_root):
+    """Set listesini ve set başına görsel sayısını denetler; (setler, bulgular)"""
+    issues = []
+    sets = {}
+    numbers = defaultdict(list)
+    for name in app.index_sets(stim_root):
+        folder = os.path.join(stim_root, name)
+        images = app.list_images(folder, limit=0)
+        sets[name] = images
+        no = app.set_number(name)
+        if no is None:
+            issues.append(_issue('uyari', 'set_numarasi_yok', name,
+                                 "set numarası yok; sonuçlarda hedef olarak kullanılamaz"))
+        else:
+            numbers[no].append(name)
+        if len(images) < app.IMAGES_PER_SET:
+            issues.append(_issue('hata', 'eksik_gorsel', name,
+                                 f"{len(images)} görsel (beklenen: {app.IMAGES_PER_SET})"))
+        elif len(images) > app.IMAGES_PER_SET:
+            issues.append(_issue('uyari', 'fazla_gorsel', name,
+                                 f"{len(images)} görsel; yalnızca ilk {app.IMAGES_PER_SET} tanesi gösterilir"))
+    for no, names in numbers.items():
+        if len(names) > 1:
+            issues.append(_issue('hata', 'set_numarasi_cakismasi', ', '.join(names),
+                                 f"aynı set numarası ({no}); sonuçlarda ayırt edilemez"))
+    if not sets:
+        issues.append(_issue('hata', 'set_yok', stim_root, "hiç set bulunamadı"))
+    return sets, issues
+
+
+def check_records(records):
+    """Görsel başına bulgular"""
+    issues = []
+    for rec in records:
+        path = rec['path']
+        if 'hata' in rec:
+            issues.append(_issue('hata', 'cozulemedi', path, rec['hata']))
+            continue
+        w, h = rec['width'], rec['height']
+        if min(w, h) < MIN_SIDE_PX:
+            issues.append(_issue('uyari', 'dusuk_cozunurluk', path, f"{w}x{h} (kısa kenar < {MIN_SIDE_PX})"))
+        aspect = w / h
+        if not ASPECT_RANGE[0] <= aspect <= ASPECT_RANGE[1]:
+            issues.append(_issue('uyari', 'en_boy', path, f"{aspect:.2f} ({w}x{h})"))
+        if rec['mode'] not in IMAGE_MODES:
+            issues.append(_issue('uyari', 'renk_modu', path, f"{rec['mode']} (RGB'ye çevrilerek gösterilir)"))
+        if rec['orientation'] != 1:
+            issues.append(_issue('bilgi', 'exif_yonu', path,
+                                 f"EXIF yönü {rec['orientation']}; gösterimde döndürülür"))
+    return issues
+
+
+def find_duplicates(records, max_bits=SIMILAR_BITS, bands=HASH_BANDS, block=512):
+    """Birebir (SHA-1) ve benzer (dHash) görselleri bulur.
+
+    Tüm çiftleri karşılaştırmak yerine 64 bitlik özet 'bands' banda bölünür;
+    Hamming uzaklığı max_bits olan iki özet (güvercin yuvası ilkesiyle) en az
+    bir bantta birebir aynıdır, bu yüzden yalnızca aynı bant kovasındakiler
+    karşılaştırılır (büyük kovalar 'block' satırlık parçalarla). Her görsel
+    kendisine benzeyen ilk görselle birlikte bir kez raporlanır; rapor çift
+    sayısıyla değil görsel sayısıyla büyür.
+    """
+    issues = []
+    ok = [r for r in records if 'hata' not in r]
+    by_sha = defaultdict(list)
+    for r in ok:
+        by_sha[r['sha1']].append(r['path'])
+    exact = set()
+    for paths in by_sha.values():
+        for other in paths[1:]:
+            issues.append(_issue('hata', 'kopya', other, f"{paths[0]} ile birebir aynı"))
+            exact.add(other)
+
+    uniq = [r for r in ok if r['path'] not in exact]
+    hashes = np.array([int(r['dhash'], 16) for r in uniq], dtype=np.uint64)
+    first = np.full(len(uniq), len(uniq), dtype=np.int64)  # en küçük benzer önceki görsel
+    edges = np.linspace(0, 64, bands + 1).astype(int)
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        keys = (hashes >> np.uint64(lo)) & np.uint64((1 << (hi - lo)) - 1)
+        order = np.argsort(keys, kind='stable')  # kova içinde indeksler artan sırada kalır
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        for a, b in zip(starts, np.r_[starts[1:], len(order)]):
+            group = order[a:b]
+            for r0 in range(0, len(group) - 1, block):
+                rows = group[r0:r0 + block]
+                cols = group[r0 + 1:]
+                near = hamming(hashes[rows][:, None], hashes[cols][None, :]) <= max_bits
+                near &= np.arange(len(cols))[None, :] >= np.arange(len(rows))[:, None]  # i < j
+                hit = near.any(axis=0)
+                np.minimum.at(first, cols[hit], rows[near.argmax(axis=0)[hit]])
+
+    for j in np.flatnonzero(first < len(uniq)).tolist():
+        i = int(first[j])
+        d = int(hamming(hashes[i:i + 1], hashes[j:j + 1])[0])
+        issues.append(_issue('uyari', 'benzer', uniq[j]['path'],
+                             f"{uniq[i]['path']} ile benzer (dHash uzaklığı {d})"))
+    return issues
+
+
+# ------------------ Ana akış ------------------
+def validate(stim_root, workers=None):
+    """Havuzu denetler; JSON raporuna yazılacak sözlüğü döndürür"""
+    t0 = time.perf_counter()
+    sets, issues = check_sets(stim_root)
+    paths = [p for images in sets.values() for p in images]
+    # Alt süreçler paketi açık kökten bulur (stim_root STIM_ROOT dışında olabilir)
+    with ProcessPoolExecutor(max_workers=workers, initializer=app.get_bundle,
+                             initargs=(stim_root,)) as pool:
+        records = list(pool.map(check_image, paths, chunksize=max(1, min(32, len(paths) // 64))))
+    for rec in records:
+        rec['path'] = os.path.relpath(rec['path'], stim_root).replace(os.sep, '/')
+    issues += check_records(records)
+    issues += find_duplicates(records)
+    counts = defaultdict(int)
+    for issue in issues:
+        counts[issue['duzey']] += 1
+    return {
+        'tarih': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'kok': stim_root,
+        'paket': app.get_bundle(stim_root) is not None,
+        'ozet': {'set': len(sets), 'gorsel': len(records),
+                 'hata': counts['hata'], 'uyari': counts['uyari'], 'bilgi': counts['bilgi'],
+                 'sure_sn': round(time.perf_counter() - t0, 2),
+                 'uygun': int(counts['hata'] == 0)},
+        'ayarlar': {'gorsel_sayisi': app.IMAGES_PER_SET, 'en_kisa_kenar': MIN_SIDE_PX,
+                    'en_boy_araligi': list(ASPECT_RANGE), 'renk_modlari': list(IMAGE_MODES),
+                    'benzer_esik_bit': SIMILAR_BITS},
+        'bulgular': issues,
+        'gorseller': records,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uyaran havuzunu dağıtım öncesi denetle")
+    parser.add_argument('--stimuli', default=None, help="Uyaran klasörü (varsayılan: stimuli/)")
+    parser.add_argument('--out', default=None, help=f"Rapor (varsayılan: <veri>/{REPORT_NAME})")
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı")
+    parser.add_argument('--images', type=int, default=None,
+                        help=f"Set başına beklenen görsel sayısı (varsayılan: {app.IMAGES_PER_SET})")
+    args = parser.parse_args()
+
+    app.IMAGES_PER_SET = args.images or app.IMAGES_PER_SET
+    stim_root = os.path.normpath(args.stimuli or app.STIM_ROOT)
+    report = validate(stim_root, args.workers)
+    out = args.out or os.path.join(app.get_data_dir(), REPORT_NAME)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+
+    for issue in report['bulgular']:
+        if issue['duzey'] != 'bilgi':
+            print(f"[{issue['duzey']}] {issue['kod']}: {issue['yol']} - {issue['ayrinti']}")
+    s = report['ozet']
+    print(f"[Denetim] {s['set']} set, {s['gorsel']} görsel, hata={s['hata']} uyarı={s['uyari']} "
+          f"bilgi={s['bilgi']} süre={s['sure_sn']} sn -> {out}")
+    sys.exit(0 if s['uygun'] else 1)